@@ -0,0 +1,134 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from Lib.controller import BrowserController
+from Lib.reader import PageReader
+import time
+
+class ActionStepError(Exception):
+	"""动作步骤执行失败"""
+
+class ActionRunner:
+	"""在服务端按顺序执行一组controller/reader步骤，一次请求完成整个流程"""
+	def __init__(self, controller: BrowserController, reader: PageReader, byTypeResolver: Optional[Callable[[str], By]] = None):
+		self.controller = controller
+		self.reader = reader
+		self.driver = controller.driver
+		self.byTypeResolver = byTypeResolver
+		self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+			"navigate": lambda step: self.controller.NavigateTo(step["url"]),
+			"back": lambda step: self.controller.GoBack(),
+			"forward": lambda step: self.controller.GoForward(),
+			"refresh": lambda step: self.controller.Refresh(),
+			"click": lambda step: self.__check(self.controller.ClickElement(step["selector"], self.__by(step), step.get("timeout", 10))),
+			"click_coordinates": lambda step: self.__check(self.controller.ClickElementByCoordinates(step["x"], step["y"])),
+			"send_keys": lambda step: self.__check(self.controller.SendKeys(step["selector"], step["text"], self.__by(step), step.get("clear_first", True))),
+			"press_key": lambda step: self.__check(self.controller.PressKey(getattr(Keys, str(step["key"]).upper(), step["key"]))),
+			"scroll": lambda step: self.__check(self.controller.ScrollWheel(step["delta_y"], step.get("element_selector"))),
+			"scroll_to": lambda step: self.__check(self.controller.ScrollToElement(step["selector"], self.__by(step))),
+			"hover": lambda step: self.__check(self.controller.HoverElement(step["selector"], self.__by(step))),
+			"drag_and_drop": lambda step: self.__check(self.controller.DragAndDrop(step["source_selector"], step["target_selector"], self.__by(step))),
+			"wait_for_element": lambda step: self.__check(self.controller.WaitForElement(step["selector"], self.__by(step), step.get("timeout", 10))),
+			"wait_for_condition": lambda step: self.__check(self.controller.WaitForCondition(step["condition"], step.get("selector"), self.__by(step), step.get("timeout", 10), step.get("text"), step.get("attribute"), step.get("value"))),
+			"wait_for_text": lambda step: self.__check(self.reader.WaitForTextToAppear(step["text"], step.get("timeout", 10))),
+			"sleep": lambda step: self.controller.Sleep(step.get("seconds", 1)),
+			"get_element_text": lambda step: self.__found(self.reader.GetElementText(step["selector"], self.__by(step))),
+			"get_elements_text": lambda step: self.reader.GetElementsText(step["selector"], self.__by(step)),
+			"get_element_attribute": lambda step: self.__found(self.reader.GetElementAttribute(step["selector"], step["attribute"], self.__by(step))),
+			"is_element_visible": lambda step: self.controller.IsElementVisible(step["selector"], self.__by(step)),
+			"get_page_title": lambda step: self.reader.GetPageTitle(),
+			"get_page_url": lambda step: self.reader.GetPageUrl(),
+			"get_page_text": self.__pageText,
+			"get_all_links": lambda step: self.reader.GetAllLinks(step.get("limit", 0), step.get("offset", 0), step.get("pattern")),
+			"get_all_images": lambda step: self.reader.GetAllImages(step.get("limit", 0), step.get("offset", 0), step.get("pattern")),
+			"get_table_data": lambda step: self.reader.GetTableData(step["selector"], self.__by(step), step.get("row_offset", 0), step.get("row_limit", 0), step.get("columns"), step.get("expand_spans", False)),
+			"get_form_data": lambda step: self.reader.GetFormData(step["selector"], self.__by(step), step.get("detailed", False)),
+			"search_text_in_page": lambda step: self.reader.SearchTextInPage(step["search_text"], step.get("case_sensitive", False), step.get("regex", False), step.get("limit", 100), step.get("context_chars", 40)),
+			"get_page_info": lambda step: self.reader.GetPageInfo(),
+			"get_interactive_elements": lambda step: self.reader.GetInteractiveElements(step.get("scope", "viewport"), step.get("limit", 200), step.get("max_name", 80), step.get("include_hidden", False)),
+			"get_page_changes": lambda step: self.reader.GetPageChanges(step.get("limit", 200), step.get("max_text", 200), step.get("reset", False))
+		}
+
+	def __by(self, step: Dict[str, Any]) -> By:
+		"""解析步骤中的定位方式"""
+		byType = step.get("by_type", "css")
+		return self.byTypeResolver(byType) if self.byTypeResolver else By.CSS_SELECTOR
+
+	def __pageText(self, step: Dict[str, Any]) -> Any:
+		"""给出max_chars、cursor或section时分页读取页面文本"""
+		removeEmpty = step.get("remove_empty", True)
+		if step.get("max_chars", 0) <= 0 and not step.get("cursor") and step.get("section") is None:
+			return self.reader.GetPageText(removeEmpty)
+		return self.reader.GetPageTextPage(step.get("max_chars", 0), step.get("cursor"), step.get("section"), removeEmpty)
+
+	def __check(self, success: bool) -> bool:
+		"""controller方法以False表示失败"""
+		if not success:
+			raise ActionStepError("operation returned failure")
+		return True
+
+	def __found(self, value: Any) -> Any:
+		"""reader方法以None表示未找到"""
+		if value is None:
+			raise ActionStepError("element or attribute not found")
+		return value
+
+	def RunStep(self, step: Dict[str, Any]) -> Tuple[bool, Any, str]:
+		"""执行单个步骤，返回 (是否成功, 结果, 错误信息)"""
+		action = step.get("action")
+		handler = self.handlers.get(action)
+		if handler is None:
+			return False, None, f"unknown action: {action}"
+		try:
+			return True, handler(step), ""
+		except KeyError as e:
+			return False, None, f"missing parameter: {e.args[0]}"
+		except Exception as e:
+			return False, None, str(e)
+
+	@staticmethod
+	def __bounded(step: Dict[str, Any], remaining: float) -> Dict[str, Any]:
+		"""把步骤自身的等待时间限制在批次剩余时间内"""
+		if step.get("action") == "sleep":
+			return dict(step, seconds=max(0, min(step.get("seconds", 1), remaining)))
+		if "timeout" in step or str(step.get("action", "")).startswith(("wait_for", "click")):
+			return dict(step, timeout=max(0, min(step.get("timeout", 10), remaining)))
+		return step
+
+	def Run(self, steps: List[Dict[str, Any]], stopOnError: bool = True, timeout: Optional[float] = None) -> Dict[str, Any]:
+		"""按顺序执行所有步骤，返回每步结果与耗时；给出timeout（秒）时每步开始前检查截止时间，超时即停止并返回已完成步骤的结果"""
+		results = []
+		batchStart = time.perf_counter()
+		deadline = batchStart + timeout if timeout and timeout > 0 else None
+		timedOut = False
+		for index, step in enumerate(steps):
+			stepStart = time.perf_counter()
+			if deadline is not None:
+				remaining = deadline - stepStart
+				if remaining <= 0:
+					timedOut = True
+					break
+				step = self.__bounded(step, remaining)
+			ok, result, error = self.RunStep(step)
+			results.append({
+				"index": index,
+				"action": step.get("action"),
+				"ok": ok,
+				"result": result,
+				"error": error,
+				"elapsed_ms": round((time.perf_counter() - stepStart) * 1000, 2)
+			})
+			if not ok and stopOnError:
+				break
+		return {
+			"ok": len(results) == len(steps) and all(item["ok"] for item in results),
+			"completed": len(results),
+			"total": len(steps),
+			"timed_out": timedOut,
+			"steps": results,
+			"elapsed_ms": round((time.perf_counter() - batchStart) * 1000, 2)
+		}
+
+	def GetActions(self) -> List[str]:
+		"""获取支持的动作名称"""
+		return sorted(self.handlers)
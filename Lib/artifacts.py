@@ -0,0 +1,143 @@
+from typing import Any, Dict, Iterable, List, Optional, Union
+import gzip
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+class ArtifactStore:
+	"""按内容哈希寻址的产物目录，分块写入并可压缩，相同内容只保存一份，按总大小和存活时间淘汰"""
+	def __init__(self, root: str, maxBytes: int = 200 * 1024 * 1024, maxAge: float = 86400, compression: str = "none"):
+		self.root = root
+		self.maxBytes = maxBytes
+		self.maxAge = maxAge
+		self.compression = self.__resolveCompression(compression)
+		self.__lock = threading.Lock()
+		self.__writes = 0
+		self.__deduplicated = 0
+		self.__evicted = 0
+		os.makedirs(root, exist_ok=True)
+
+	@staticmethod
+	def __resolveCompression(compression: Optional[str]) -> str:
+		"""解析压缩方式，未安装zstandard时退回gzip"""
+		compression = (compression or "none").lower()
+		if compression == "zstd" and zstandard is None:
+			return "gzip"
+		return compression if compression in COMPRESSION_SUFFIXES else "none"
+
+	def __openWriter(self, path: str, compression: str):
+		"""按压缩方式打开写入流"""
+		if compression == "gzip":
+			return gzip.open(path, "wb", compresslevel=6)
+		if compression == "zstd":
+			return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+		return open(path, "wb")
+
+	def __entries(self) -> List[os.DirEntry]:
+		"""列出已保存的产物"""
+		return [entry for entry in os.scandir(self.root) if entry.is_file() and not entry.name.endswith(".tmp")]
+
+	def __find(self, artifactId: str) -> Optional[str]:
+		"""按ID查找产物文件"""
+		for entry in self.__entries():
+			if entry.name.startswith(artifactId + "."):
+				return entry.path
+		return None
+
+	def Write(self, kind: str, chunks: Iterable[Union[str, bytes]], extension: str = "html", compression: Optional[str] = None) -> Dict[str, Any]:
+		"""分块写入产物并返回 {id, path, bytes, raw_bytes, ...}，内容相同的产物复用已有文件；compression可为已压缩的内容（如图片）单独指定"""
+		compression = self.compression if compression is None else self.__resolveCompression(compression)
+		digest = hashlib.sha256()
+		rawBytes = 0
+		tempPath = os.path.join(self.root, f"{uuid.uuid4().hex}.tmp")
+		try:
+			with self.__openWriter(tempPath, compression) as writer:
+				for chunk in chunks:
+					data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+					if not data:
+						continue
+					digest.update(data)
+					writer.write(data)
+					rawBytes += len(data)
+			artifactId = f"{kind}-{digest.hexdigest()[:20]}"
+			path = os.path.join(self.root, f"{artifactId}.{extension}{COMPRESSION_SUFFIXES[compression]}")
+			with self.__lock:
+				self.__writes += 1
+				deduplicated = os.path.exists(path)
+				if deduplicated:
+					self.__deduplicated += 1
+					os.remove(tempPath)
+					os.utime(path)
+				else:
+					os.replace(tempPath, path)
+		except BaseException:
+			if os.path.exists(tempPath):
+				os.remove(tempPath)
+			raise
+		self.Evict(keep=path)
+		return {
+			"id": artifactId,
+			"path": path,
+			"bytes": os.path.getsize(path),
+			"raw_bytes": rawBytes,
+			"compression": compression,
+			"sha256": digest.hexdigest(),
+			"deduplicated": deduplicated
+		}
+
+	def Get(self, artifactId: str) -> Optional[Dict[str, Any]]:
+		"""获取产物信息"""
+		path = self.__find(artifactId)
+		if path is None:
+			return None
+		stat = os.stat(path)
+		return {"id": artifactId, "path": path, "bytes": stat.st_size, "modified_at": stat.st_mtime}
+
+	def Evict(self, keep: Optional[str] = None) -> int:
+		"""淘汰超过存活时间的产物，再按最久未写入的顺序淘汰直至总大小不超过上限，keep指定的文件不会被淘汰"""
+		now = time.time()
+		removed = 0
+		with self.__lock:
+			entries = sorted(self.__entries(), key=lambda entry: entry.stat().st_mtime)
+			total = sum(entry.stat().st_size for entry in entries)
+			for entry in entries:
+				if entry.path == keep:
+					continue
+				stat = entry.stat()
+				expired = self.maxAge > 0 and now - stat.st_mtime > self.maxAge
+				oversized = self.maxBytes > 0 and total > self.maxBytes
+				if not expired and not oversized:
+					continue
+				try:
+					os.remove(entry.path)
+				except OSError:
+					continue
+				total -= stat.st_size
+				removed += 1
+			self.__evicted += removed
+		return removed
+
+	def GetStats(self) -> Dict[str, Any]:
+		"""获取产物目录统计"""
+		with self.__lock:
+			entries = self.__entries()
+			return {
+				"root": self.root,
+				"artifacts": len(entries),
+				"bytes": sum(entry.stat().st_size for entry in entries),
+				"max_bytes": self.maxBytes,
+				"max_age": self.maxAge,
+				"compression": self.compression,
+				"writes": self.__writes,
+				"deduplicated": self.__deduplicated,
+				"evicted": self.__evicted
+			}
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+import threading
+
+class SnapshotCache:
+	"""按页面文档标识与DOM代数缓存读取结果的LRU缓存，可在多个会话间共享"""
+	def __init__(self, maxEntries: int = 256):
+		self.maxEntries = maxEntries
+		self.__entries: OrderedDict = OrderedDict()
+		self.__lock = threading.Lock()
+		self.__hits = 0
+		self.__misses = 0
+		self.__evictions = 0
+
+	def Get(self, key: Hashable) -> Tuple[bool, Any]:
+		"""查询缓存，返回 (是否命中, 值)"""
+		with self.__lock:
+			if key in self.__entries:
+				self.__entries.move_to_end(key)
+				self.__hits += 1
+				return True, self.__entries[key]
+			self.__misses += 1
+			return False, None
+
+	def Peek(self, key: Hashable) -> Tuple[bool, Any]:
+		"""查询缓存但不计入命中统计，也不调整淘汰顺序"""
+		with self.__lock:
+			if key in self.__entries:
+				return True, self.__entries[key]
+			return False, None
+
+	def CountMiss(self) -> None:
+		"""记录一次未经Get查询的未命中"""
+		with self.__lock:
+			self.__misses += 1
+
+	def Put(self, key: Hashable, value: Any) -> None:
+		"""写入缓存，超出容量时淘汰最久未使用的条目"""
+		if self.maxEntries <= 0:
+			return
+		with self.__lock:
+			self.__entries[key] = value
+			self.__entries.move_to_end(key)
+			while len(self.__entries) > self.maxEntries:
+				self.__entries.popitem(last=False)
+				self.__evictions += 1
+
+	def Clear(self) -> None:
+		"""清空缓存"""
+		with self.__lock:
+			self.__entries.clear()
+
+	def GetStats(self) -> dict:
+		"""获取命中率等统计信息"""
+		with self.__lock:
+			total = self.__hits + self.__misses
+			return {
+				"entries": len(self.__entries),
+				"max_entries": self.maxEntries,
+				"hits": self.__hits,
+				"misses": self.__misses,
+				"evictions": self.__evictions,
+				"hit_rate": round(self.__hits / total, 4) if total else 0.0
+			}
@@ -0,0 +1,216 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import itertools
+import json
+import threading
+import urllib.request
+import websocket
+
+class CdpError(RuntimeError):
+	"""DevTools协议调用失败"""
+
+class _PendingCall(Future):
+	"""记录请求id的Future，超时后可据此从等待表中移除"""
+	def __init__(self, messageId: int):
+		super().__init__()
+		self.messageId = messageId
+
+class CdpClient:
+	"""直连页面DevTools WebSocket的客户端，请求按id多路复用，可流水线批量发送"""
+	def __init__(self, webSocketUrl: str, targetId: Optional[str] = None, connectTimeout: float = 2.0, callTimeout: float = 30.0):
+		self.webSocketUrl = webSocketUrl
+		self.targetId = targetId
+		self.callTimeout = callTimeout
+		self.__socket = websocket.create_connection(webSocketUrl, timeout=connectTimeout, suppress_origin=True, enable_multithread=True)
+		self.__socket.settimeout(None)
+		self.__ids = itertools.count(1)
+		self.__pending: Dict[int, _PendingCall] = {}
+		self.__listeners: Dict[str, List[Callable[[dict], None]]] = {}
+		self.__lock = threading.Lock()
+		self.__closed = False
+		self.__calls = 0
+		self.__batches = 0
+		self.__errors = 0
+		self.__thread = threading.Thread(target=self.__readLoop, name="selenium-cdp-reader", daemon=True)
+		self.__thread.start()
+
+	@staticmethod
+	def GetDebuggerAddress(driver) -> Optional[str]:
+		"""从驱动能力中读取Chrome调试地址"""
+		try:
+			return (driver.capabilities or {}).get("goog:chromeOptions", {}).get("debuggerAddress")
+		except Exception:
+			return None
+
+	@classmethod
+	def ForDriver(cls, driver, timeout: float = 2.0) -> Optional["CdpClient"]:
+		"""连接到驱动当前窗口对应的页面目标，调试地址不可用时返回None"""
+		address = cls.GetDebuggerAddress(driver)
+		if not address:
+			return None
+		with urllib.request.urlopen(f"http://{address}/json/list", timeout=timeout) as response:
+			targets = json.loads(response.read().decode("utf-8"))
+		pages = [target for target in targets if target.get("type") == "page" and target.get("webSocketDebuggerUrl")]
+		if not pages:
+			return None
+		# ChromeDriver的窗口句柄即DevTools目标ID
+		handle = driver.current_window_handle
+		target = next((page for page in pages if page.get("id") == handle), None)
+		if target is None:
+			return None
+		return cls(target["webSocketDebuggerUrl"], target["id"], timeout)
+
+	def __readLoop(self):
+		"""接收线程：按id分发响应，其余消息作为事件派发"""
+		try:
+			while not self.__closed:
+				message = self.__socket.recv()
+				if not message:
+					break
+				data = json.loads(message)
+				messageId = data.get("id")
+				if messageId is None:
+					for listener in list(self.__listeners.get(data.get("method"), [])):
+						try:
+							listener(data.get("params", {}))
+						except Exception:
+							pass
+					continue
+				with self.__lock:
+					future = self.__pending.pop(messageId, None)
+				if future is None or future.done():
+					continue
+				if "error" in data:
+					future.set_exception(CdpError(data["error"].get("message", str(data["error"]))))
+				else:
+					future.set_result(data.get("result", {}))
+		except Exception:
+			pass
+		finally:
+			self.__closed = True
+			self.__failPending(CdpError("DevTools连接已断开"))
+
+	def __failPending(self, error: Exception) -> None:
+		"""使所有未完成的请求失败"""
+		with self.__lock:
+			pending = list(self.__pending.values())
+			self.__pending.clear()
+		for future in pending:
+			if not future.done():
+				future.set_exception(error)
+
+	def Send(self, method: str, params: Optional[dict] = None) -> Future:
+		"""发送请求但不等待响应"""
+		if self.__closed:
+			raise CdpError("DevTools连接已关闭")
+		messageId = next(self.__ids)
+		future = _PendingCall(messageId)
+		with self.__lock:
+			self.__pending[messageId] = future
+			self.__calls += 1
+		try:
+			self.__socket.send(json.dumps({"id": messageId, "method": method, "params": params or {}}))
+		except Exception as e:
+			with self.__lock:
+				self.__pending.pop(messageId, None)
+			raise CdpError(f"发送DevTools请求失败: {e}")
+		return future
+
+	def __forget(self, futures: List[_PendingCall]) -> None:
+		"""放弃等待未完成的请求：响应可能永远不会到达，不移除会使等待表持续增长"""
+		with self.__lock:
+			for future in futures:
+				if not future.done():
+					self.__pending.pop(future.messageId, None)
+					future.cancel()
+
+	def __wait(self, future: _PendingCall, timeout: Optional[float]) -> dict:
+		"""等待响应"""
+		try:
+			return future.result(self.callTimeout if timeout is None else timeout)
+		except FutureTimeoutError:
+			self.__forget([future])
+			with self.__lock:
+				self.__errors += 1
+			raise CdpError("DevTools请求超时")
+		except CdpError:
+			with self.__lock:
+				self.__errors += 1
+			raise
+
+	def Call(self, method: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+		"""发送请求并等待响应"""
+		return self.__wait(self.Send(method, params), timeout)
+
+	def CallMany(self, calls: List[Tuple[str, Optional[dict]]], timeout: Optional[float] = None) -> List[dict]:
+		"""流水线发送一组请求后统一等待，总耗时约为一次往返"""
+		futures = [self.Send(method, params) for method, params in calls]
+		with self.__lock:
+			self.__batches += 1
+		try:
+			return [self.__wait(future, timeout) for future in futures]
+		except CdpError:
+			self.__forget(futures)
+			raise
+
+	@staticmethod
+	def BuildEvaluate(script: str, args: tuple = ()) -> Tuple[str, dict]:
+		"""将execute_script风格的脚本（使用arguments）包装为Runtime.evaluate请求"""
+		expression = f"(function(){{{script}\n}}).apply(null, {json.dumps(list(args))})"
+		return ("Runtime.evaluate", {"expression": expression, "returnByValue": True, "awaitPromise": False})
+
+	@staticmethod
+	def __evaluateResult(result: dict) -> Any:
+		"""提取Runtime.evaluate的返回值"""
+		if "exceptionDetails" in result:
+			details = result["exceptionDetails"]
+			message = details.get("exception", {}).get("description") or details.get("text", "script error")
+			raise CdpError(message)
+		return result.get("result", {}).get("value")
+
+	def Evaluate(self, script: str, *args, timeout: Optional[float] = None) -> Any:
+		"""以JSON参数执行脚本并按值返回结果"""
+		method, params = self.BuildEvaluate(script, args)
+		return self.__evaluateResult(self.Call(method, params, timeout))
+
+	def EvaluateMany(self, scripts: List[Tuple[str, tuple]], timeout: Optional[float] = None) -> List[Any]:
+		"""流水线执行多段脚本"""
+		results = self.CallMany([self.BuildEvaluate(script, args) for script, args in scripts], timeout)
+		return [self.__evaluateResult(result) for result in results]
+
+	def GetOuterHTML(self, timeout: Optional[float] = None) -> str:
+		"""通过DOM域获取整个文档的HTML"""
+		root = self.Call("DOM.getDocument", {"depth": 0}, timeout)["root"]
+		return self.Call("DOM.getOuterHTML", {"nodeId": root["nodeId"]}, timeout)["outerHTML"]
+
+	def On(self, event: str, listener: Callable[[dict], None]) -> None:
+		"""订阅DevTools事件"""
+		self.__listeners.setdefault(event, []).append(listener)
+
+	def IsClosed(self) -> bool:
+		"""判断连接是否已关闭"""
+		return self.__closed
+
+	def GetStats(self) -> dict:
+		"""获取调用统计"""
+		with self.__lock:
+			return {
+				"target_id": self.targetId,
+				"calls": self.__calls,
+				"batches": self.__batches,
+				"errors": self.__errors,
+				"pending": len(self.__pending),
+				"closed": self.__closed
+			}
+
+	def Close(self) -> None:
+		"""关闭连接"""
+		if self.__closed:
+			return
+		self.__closed = True
+		try:
+			# 直接关闭底层连接，不等待对端的关闭握手
+			self.__socket.shutdown()
+		except Exception:
+			pass
+		self.__failPending(CdpError("DevTools连接已关闭"))
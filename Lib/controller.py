@@ -4,25 +4,62 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from Lib.waiter import DomWaiter
+from Lib.elements import ElementCache
 from typing import Optional, Tuple
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 class BrowserController:
-	def __init__(self, driver: webdriver.Chrome):
+	def __init__(self, driver: webdriver.Chrome, elementCache: Optional[ElementCache] = None):
 		self.driver = driver
 		self.actionChains = ActionChains(driver)
 		self.wait = WebDriverWait(driver, 10)
+		self.waiter = DomWaiter(driver)
+		self.elements = elementCache or ElementCache(driver)
+	
+	def NavigateTo(self, url: str) -> None:
+		"""导航到指定URL"""
+		self.elements.Invalidate()
+		self.driver.get(url)
+	
+	def GoBack(self) -> None:
+		"""浏览器后退"""
+		self.elements.Invalidate()
+		self.driver.back()
+	
+	def GoForward(self) -> None:
+		"""浏览器前进"""
+		self.elements.Invalidate()
+		self.driver.forward()
+	
+	def Refresh(self) -> None:
+		"""刷新页面"""
+		self.elements.Invalidate()
+		self.driver.refresh()
 	
 	def ClickElement(self, selector: str, byType: By = By.CSS_SELECTOR, timeout: int = 10) -> bool:
-		"""点击页面元素"""
+		"""点击页面元素，缓存中有句柄时直接点击，否则等待元素可点击后点击并缓存句柄"""
 		try:
-			element = WebDriverWait(self.driver, timeout).until(
-				EC.element_to_be_clickable((byType, selector))
-			)
+			element = self.elements.Get(byType, selector)
+			if element is not None:
+				try:
+					element.click()
+					return True
+				except WebDriverException:
+					# 句柄已失效或元素暂不可交互，丢弃后按未缓存处理
+					self.elements.Drop(byType, selector)
+			element = self.waiter.WaitFor("clickable", selector, byType, timeout)
+			if element is None:
+				raise TimeoutException(f"元素在{timeout}秒内未变为可点击: {selector}")
 			element.click()
+			self.elements.Put(byType, selector, element)
 			return True
 		except Exception as e:
-			print(f"点击元素失败: {e}")
+			logger.warning(f"点击元素失败: {e}")
 			return False
 	
 	def ClickElementByCoordinates(self, x: int, y: int) -> bool:
@@ -32,63 +69,61 @@ class BrowserController:
 			self.driver.execute_script(f"document.elementFromPoint({x}, {y}).click();")
 			return True
 		except Exception as e:
-			print(f"坐标点击失败: {e}")
+			logger.warning(f"坐标点击失败: {e}")
 			return False
 	
 	def ScrollWheel(self, deltaY: int, element: Optional[str] = None) -> bool:
 		"""滑动滚轮"""
 		try:
 			if element:
-				targetElement = self.driver.find_element(By.CSS_SELECTOR, element)
-				self.actionChains.move_to_element(targetElement).perform()
+				self.elements.Use(By.CSS_SELECTOR, element, lambda target: self.actionChains.move_to_element(target).perform())
 			
 			self.driver.execute_script(f"window.scrollBy(0, {deltaY});")
 			return True
 		except Exception as e:
-			print(f"滚轮滑动失败: {e}")
+			logger.warning(f"滚轮滑动失败: {e}")
 			return False
 	
 	def ScrollToElement(self, selector: str, byType: By = By.CSS_SELECTOR) -> bool:
 		"""滚动到指定元素"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+			self.elements.Use(byType, selector, lambda element: self.driver.execute_script("arguments[0].scrollIntoView(true);", element))
 			return True
 		except Exception as e:
-			print(f"滚动到元素失败: {e}")
+			logger.warning(f"滚动到元素失败: {e}")
 			return False
 	
 	def HoverElement(self, selector: str, byType: By = By.CSS_SELECTOR) -> bool:
 		"""悬停在元素上"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			self.actionChains.move_to_element(element).perform()
+			self.elements.Use(byType, selector, lambda element: self.actionChains.move_to_element(element).perform())
 			return True
 		except Exception as e:
-			print(f"元素悬停失败: {e}")
+			logger.warning(f"元素悬停失败: {e}")
 			return False
 	
 	def DragAndDrop(self, sourceSelector: str, targetSelector: str, byType: By = By.CSS_SELECTOR) -> bool:
 		"""拖拽元素"""
 		try:
-			sourceElement = self.driver.find_element(byType, sourceSelector)
-			targetElement = self.driver.find_element(byType, targetSelector)
-			self.actionChains.drag_and_drop(sourceElement, targetElement).perform()
+			self.elements.Use(byType, sourceSelector, lambda sourceElement: self.elements.Use(
+				byType, targetSelector, lambda targetElement: self.actionChains.drag_and_drop(sourceElement, targetElement).perform()
+			))
 			return True
 		except Exception as e:
-			print(f"拖拽操作失败: {e}")
+			logger.warning(f"拖拽操作失败: {e}")
 			return False
 	
 	def SendKeys(self, selector: str, text: str, byType: By = By.CSS_SELECTOR, clearFirst: bool = True) -> bool:
 		"""向元素输入文本"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			if clearFirst:
-				element.clear()
-			element.send_keys(text)
+			def typeText(element):
+				if clearFirst:
+					element.clear()
+				element.send_keys(text)
+			self.elements.Use(byType, selector, typeText)
 			return True
 		except Exception as e:
-			print(f"文本输入失败: {e}")
+			logger.warning(f"文本输入失败: {e}")
 			return False
 	
 	def PressKey(self, key: Keys) -> bool:
@@ -97,34 +132,35 @@ class BrowserController:
 			self.actionChains.send_keys(key).perform()
 			return True
 		except Exception as e:
-			print(f"按键操作失败: {e}")
+			logger.warning(f"按键操作失败: {e}")
 			return False
 	
 	def WaitForElement(self, selector: str, byType: By = By.CSS_SELECTOR, timeout: int = 10) -> bool:
 		"""等待元素出现"""
+		return self.WaitForCondition("present", selector, byType, timeout)
+	
+	def WaitForCondition(self, condition: str, selector: Optional[str] = None, byType: By = By.CSS_SELECTOR, timeout: int = 10, text: Optional[str] = None, attribute: Optional[str] = None, value: Optional[str] = None) -> bool:
+		"""等待元素出现/可见/可点击、文本出现或属性取值，由页面内变更事件驱动"""
 		try:
-			WebDriverWait(self.driver, timeout).until(
-				EC.presence_of_element_located((byType, selector))
-			)
+			if self.waiter.WaitFor(condition, selector, byType, timeout, text, attribute, value) is None:
+				raise TimeoutException(f"条件 {condition} 在{timeout}秒内未满足")
 			return True
 		except Exception as e:
-			print(f"等待元素失败: {e}")
+			logger.warning(f"等待元素失败: {e}")
 			return False
 	
 	def GetElementText(self, selector: str, byType: By = By.CSS_SELECTOR) -> Optional[str]:
 		"""获取元素文本"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			return element.text
+			return self.elements.Use(byType, selector, lambda element: element.text)
 		except Exception as e:
-			print(f"获取元素文本失败: {e}")
+			logger.warning(f"获取元素文本失败: {e}")
 			return None
 	
 	def IsElementVisible(self, selector: str, byType: By = By.CSS_SELECTOR) -> bool:
 		"""检查元素是否可见"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			return element.is_displayed()
+			return self.elements.Use(byType, selector, lambda element: element.is_displayed())
 		except Exception:
 			return False
 	
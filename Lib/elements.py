@@ -0,0 +1,129 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import StaleElementReferenceException
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+import threading
+
+# 由交互元素大纲分配的data-mcp-id编号定位元素
+REF_LOCATOR = "mcp ref"
+
+def _quote(value: str) -> str:
+	"""转义CSS属性选择器中的字符串"""
+	return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def ResolveLocator(byType: str, selector: str) -> Tuple[str, str]:
+	"""将编号定位转换为WebDriver可识别的CSS定位"""
+	if byType == REF_LOCATOR:
+		ref = _quote(str(selector).strip().strip("[]"))
+		return By.CSS_SELECTOR, f'[data-mcp-id="{ref}"]'
+	return byType, selector
+
+class ElementCache:
+	"""按 (frame, 定位方式, 选择器) 缓存当前文档中的元素句柄
+
+	命中时直接复用句柄，不再访问浏览器；句柄失效（StaleElementReferenceException）时重新查找。
+	页面导航与切换frame时清空，其他脚本顺带返回的文档状态（文档标识, DOM代数）经Observe传入，
+	DOM变化后早于该代数写入的句柄一并丢弃，避免复用已不再匹配选择器的节点。"""
+	def __init__(self, driver: webdriver.Chrome, maxEntries: int = 128):
+		self.driver = driver
+		self.maxEntries = maxEntries
+		self.frame: Optional[str] = None
+		self.__entries: OrderedDict = OrderedDict()
+		self.__state: Optional[Tuple[str, int]] = None
+		self.__lock = threading.Lock()
+		self.__hits = 0
+		self.__misses = 0
+		self.__staleRefreshes = 0
+		self.__invalidations = 0
+
+	def SetFrame(self, frame: Optional[str]) -> None:
+		"""切换frame后调用，None表示顶层文档；其他frame中的句柄不再可用，切换时清空"""
+		if frame != self.frame:
+			self.Invalidate()
+		self.frame = frame
+
+	def Observe(self, token: str, generation: int) -> None:
+		"""记录最新的文档状态：文档已更换时清空，DOM代数变化时丢弃在旧代数下写入的句柄"""
+		with self.__lock:
+			state = (token, generation)
+			if self.__state == state:
+				return
+			if self.__state is not None and self.__state[0] != token:
+				self.__clear()
+			else:
+				for key in [key for key, entry in self.__entries.items() if entry[1] != state]:
+					self.__entries.pop(key)
+			self.__state = state
+
+	def Get(self, byType: By, selector: str) -> Optional[WebElement]:
+		"""获取缓存的句柄，未缓存时返回None，不访问浏览器"""
+		key = (self.frame, byType, selector)
+		with self.__lock:
+			entry = self.__entries.get(key)
+			if entry is None:
+				return None
+			self.__entries.move_to_end(key)
+			self.__hits += 1
+			return entry[0]
+
+	def Find(self, byType: By, selector: str) -> WebElement:
+		"""查找元素，命中缓存时直接复用句柄"""
+		element = self.Get(byType, selector)
+		if element is not None:
+			return element
+		with self.__lock:
+			self.__misses += 1
+		element = self.driver.find_element(*ResolveLocator(byType, selector))
+		self.Put(byType, selector, element)
+		return element
+
+	def Put(self, byType: By, selector: str, element: WebElement) -> None:
+		"""写入元素句柄，记录写入时已知的文档状态"""
+		if self.maxEntries <= 0:
+			return
+		key = (self.frame, byType, selector)
+		with self.__lock:
+			self.__entries[key] = (element, self.__state)
+			self.__entries.move_to_end(key)
+			while len(self.__entries) > self.maxEntries:
+				self.__entries.popitem(last=False)
+
+	def Drop(self, byType: By, selector: str, stale: bool = True) -> None:
+		"""移除单个句柄，stale为True时计入失效刷新次数"""
+		with self.__lock:
+			if self.__entries.pop((self.frame, byType, selector), None) is not None and stale:
+				self.__staleRefreshes += 1
+
+	def Use(self, byType: By, selector: str, action: Callable[[WebElement], Any]) -> Any:
+		"""对元素执行操作，句柄已失效时重新查找并重试一次"""
+		element = self.Find(byType, selector)
+		try:
+			return action(element)
+		except StaleElementReferenceException:
+			self.Drop(byType, selector)
+			return action(self.Find(byType, selector))
+
+	def __clear(self) -> None:
+		"""清空所有句柄（调用方持有锁）"""
+		if self.__entries:
+			self.__invalidations += 1
+		self.__entries.clear()
+
+	def Invalidate(self) -> None:
+		"""页面导航或切换frame后清空所有句柄"""
+		with self.__lock:
+			self.__clear()
+			self.__state = None
+
+	def GetStats(self) -> dict:
+		"""获取缓存统计，hits为直接复用句柄（省去一次查找）的次数"""
+		with self.__lock:
+			return {
+				"entries": len(self.__entries),
+				"hits": self.__hits,
+				"misses": self.__misses,
+				"stale_refreshes": self.__staleRefreshes,
+				"invalidations": self.__invalidations
+			}
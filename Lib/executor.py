@@ -0,0 +1,127 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+import asyncio
+import queue
+import threading
+import time
+
+class ExecutorBusyError(RuntimeError):
+	"""执行队列已满"""
+
+class ExecutorClosedError(RuntimeError):
+	"""执行器已关闭"""
+
+class DriverCallTimeoutError(TimeoutError):
+	"""驱动调用超过截止时间"""
+
+class DriverExecutor:
+	"""将WebDriver调用串行投递到专用工作线程，避免阻塞事件循环"""
+	def __init__(self, name: str = "default", maxQueueSize: int = 32, defaultTimeout: float = 60.0):
+		self.name = name
+		self.maxQueueSize = maxQueueSize
+		self.defaultTimeout = defaultTimeout
+		self.__queue: queue.Queue = queue.Queue(maxsize=maxQueueSize)
+		self.__closed = False
+		self.__lock = threading.Lock()
+		self.__running = 0
+		self.__completed = 0
+		self.__timedOut = 0
+		self.__cancelled = 0
+		self.__thread = threading.Thread(target=self.__workerLoop, name=f"selenium-driver-{name}", daemon=True)
+		self.__thread.start()
+
+	def __workerLoop(self):
+		"""工作线程主循环"""
+		while True:
+			item = self.__queue.get()
+			if item is None:
+				self.__queue.task_done()
+				break
+			future, func, args, kwargs, deadline = item
+			try:
+				if deadline is not None and time.monotonic() > deadline:
+					# 排队期间已超过截止时间，不再执行
+					if future.set_running_or_notify_cancel():
+						future.set_exception(DriverCallTimeoutError(f"调用在队列中等待超时 ({self.name})"))
+					continue
+				if not future.set_running_or_notify_cancel():
+					continue
+				with self.__lock:
+					self.__running += 1
+				try:
+					result = func(*args, **kwargs)
+				except BaseException as e:
+					future.set_exception(e)
+				else:
+					future.set_result(result)
+				finally:
+					with self.__lock:
+						self.__running -= 1
+						self.__completed += 1
+			finally:
+				self.__queue.task_done()
+
+	def Submit(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Future:
+		"""提交调用到工作线程，队列已满时立即抛出ExecutorBusyError"""
+		if self.__closed:
+			raise ExecutorClosedError(f"执行器已关闭 ({self.name})")
+		timeout = self.defaultTimeout if timeout is None else timeout
+		deadline = time.monotonic() + timeout if timeout and timeout > 0 else None
+		future: Future = Future()
+		try:
+			self.__queue.put_nowait((future, func, args, kwargs, deadline))
+		except queue.Full:
+			raise ExecutorBusyError(f"执行队列已满 ({self.name}, 上限 {self.maxQueueSize})")
+		return future
+
+	async def Run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+		"""在工作线程中执行调用并等待结果，支持截止时间与取消"""
+		timeout = self.defaultTimeout if timeout is None else timeout
+		future = self.Submit(func, *args, timeout=timeout, **kwargs)
+		try:
+			return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout if timeout and timeout > 0 else None)
+		except asyncio.TimeoutError:
+			# 尚未开始的调用会被取消；正在执行的调用无法中断，其结果将被丢弃
+			future.cancel()
+			with self.__lock:
+				self.__timedOut += 1
+			raise DriverCallTimeoutError(f"驱动调用超时 ({self.name}, {timeout}s)")
+		except asyncio.CancelledError:
+			future.cancel()
+			with self.__lock:
+				self.__cancelled += 1
+			raise
+
+	def GetStats(self) -> dict:
+		"""获取执行器统计信息"""
+		with self.__lock:
+			return {
+				"name": self.name,
+				"queued": self.__queue.qsize(),
+				"running": self.__running,
+				"completed": self.__completed,
+				"timed_out": self.__timedOut,
+				"cancelled": self.__cancelled,
+				"max_queue_size": self.maxQueueSize
+			}
+
+	def Shutdown(self, wait: bool = False) -> None:
+		"""关闭执行器，丢弃尚未开始的调用"""
+		if self.__closed:
+			return
+		self.__closed = True
+		while True:
+			try:
+				item = self.__queue.get_nowait()
+			except queue.Empty:
+				break
+			if item is not None and item[0].set_running_or_notify_cancel():
+				item[0].set_exception(ExecutorClosedError(f"执行器已关闭 ({self.name})"))
+			self.__queue.task_done()
+		self.__queue.put(None)
+		if wait and threading.current_thread() is not self.__thread:
+			self.__thread.join()
+
+	def IsClosed(self) -> bool:
+		"""判断执行器是否已关闭"""
+		return self.__closed
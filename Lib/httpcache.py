@@ -0,0 +1,342 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional
+from Lib.cdp import CdpClient, CdpError
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+
+# 默认拦截的资源类型（DevTools Network.ResourceType）；XHR/Fetch多为随会话变化的接口数据，需要时显式传入
+DEFAULT_RESOURCE_TYPES = ["Script", "Stylesheet", "Image", "Font"]
+
+# 回放时需要去掉的响应头：Fetch.getResponseBody返回的是解码后的内容
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+def GetFreshness(headers: Dict[str, str], defaultTtl: float = 0, now: Optional[float] = None) -> float:
+	"""按Cache-Control、Expires和Last-Modified计算响应可缓存的秒数，不可缓存时返回0"""
+	now = time.time() if now is None else now
+	cacheControl = headers.get("cache-control", "").lower()
+	if any(directive in cacheControl for directive in ("no-store", "no-cache", "private")):
+		return 0
+	match = _MAX_AGE.search(cacheControl)
+	if match:
+		return float(match.group(1))
+	try:
+		date = parsedate_to_datetime(headers["date"]).timestamp() if "date" in headers else now
+		if "expires" in headers:
+			return max(0.0, parsedate_to_datetime(headers["expires"]).timestamp() - date)
+		if "last-modified" in headers:
+			# 启发式新鲜度：距上次修改时间的10%，最长一天
+			return min(86400.0, max(0.0, (date - parsedate_to_datetime(headers["last-modified"]).timestamp()) * 0.1))
+	except (TypeError, ValueError, OverflowError):
+		return 0
+	return defaultTtl
+
+class HttpCache:
+	"""磁盘HTTP响应缓存：按分区、URL和Vary列出的请求头寻址，遵循响应的新鲜度，按总大小LRU淘汰，可限定允许缓存的主机"""
+	def __init__(self, root: str, maxBytes: int = 256 * 1024 * 1024, maxEntryBytes: int = 16 * 1024 * 1024, defaultTtl: float = 0, allowHosts: Optional[List[str]] = None):
+		self.root = root
+		self.maxBytes = maxBytes
+		self.maxEntryBytes = maxEntryBytes
+		self.defaultTtl = defaultTtl
+		self.allowHosts = [host.lower() for host in allowHosts or []]
+		self.__lock = threading.Lock()
+		self.__index: "OrderedDict[str, dict]" = OrderedDict()
+		self.__vary: Dict[str, List[str]] = {}
+		self.__bytes = 0
+		self.__hits = 0
+		self.__misses = 0
+		self.__stores = 0
+		self.__uncacheable = 0
+		self.__expired = 0
+		self.__evicted = 0
+		self.__bytesServed = 0
+		os.makedirs(root, exist_ok=True)
+		self.__loadIndex()
+
+	@staticmethod
+	def __hash(*parts: str) -> str:
+		return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:32]
+
+	def __baseKey(self, url: str, partition: str) -> str:
+		"""分区内去掉片段后的URL的键，同一URL的各个变体共用"""
+		return self.__hash(partition, urllib.parse.urldefrag(url)[0])
+
+	def __entryKey(self, baseKey: str, vary: List[str], requestHeaders: Optional[Dict[str, str]]) -> str:
+		"""缓存键：响应带Vary时把所列请求头的取值计入键中"""
+		if not vary:
+			return baseKey
+		headers = {name.lower(): value for name, value in (requestHeaders or {}).items()}
+		return self.__hash(baseKey, *(f"{name}:{headers.get(name, '')}" for name in vary))
+
+	@staticmethod
+	def __varyNames(headerMap: Dict[str, str]) -> List[str]:
+		"""解析响应的Vary头"""
+		return sorted({name.strip().lower() for name in headerMap.get("vary", "").split(",") if name.strip()})
+
+	def __paths(self, key: str) -> tuple:
+		"""缓存条目的元数据与内容文件路径"""
+		return os.path.join(self.root, f"{key}.json"), os.path.join(self.root, f"{key}.body")
+
+	def __loadIndex(self) -> None:
+		"""按最后访问时间从磁盘恢复索引"""
+		entries = []
+		for entry in os.scandir(self.root):
+			if not entry.name.endswith(".json"):
+				continue
+			try:
+				with open(entry.path, "r", encoding="utf-8") as f:
+					meta = json.load(f)
+				if "base" not in meta or "vary" not in meta:
+					raise KeyError("base")
+				bodyPath = self.__paths(meta["key"])[1]
+				entries.append((os.stat(bodyPath).st_mtime, meta))
+			except (OSError, ValueError, KeyError):
+				self.__removeFiles(entry.name[:-5])
+		for _, meta in sorted(entries, key=lambda item: item[0]):
+			self.__index[meta["key"]] = meta
+			self.__vary[meta["base"]] = meta["vary"]
+			self.__bytes += meta["size"]
+
+	def __removeFiles(self, key: str) -> None:
+		"""删除条目文件"""
+		for path in self.__paths(key):
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+
+	def IsAllowed(self, url: str) -> bool:
+		"""判断URL的主机是否在允许列表中，列表为空时允许所有主机"""
+		if not self.allowHosts:
+			return True
+		host = (urllib.parse.urlsplit(url).hostname or "").lower()
+		return any(fnmatch(host, pattern) for pattern in self.allowHosts)
+
+	def Get(self, url: str, requestHeaders: Optional[Dict[str, str]] = None, partition: str = "") -> Optional[Dict[str, Any]]:
+		"""查找未过期的缓存响应，返回 {status, headers, body}；requestHeaders用于匹配响应Vary的请求头"""
+		baseKey = self.__baseKey(url, partition)
+		with self.__lock:
+			key = self.__entryKey(baseKey, self.__vary.get(baseKey, []), requestHeaders)
+			meta = self.__index.get(key)
+			if meta is None:
+				self.__misses += 1
+				return None
+			if meta["expires"] <= time.time():
+				self.__drop(key)
+				self.__expired += 1
+				self.__misses += 1
+				return None
+			self.__index.move_to_end(key)
+		bodyPath = self.__paths(key)[1]
+		try:
+			with open(bodyPath, "rb") as f:
+				body = f.read()
+			os.utime(bodyPath)
+		except OSError:
+			with self.__lock:
+				self.__drop(key)
+				self.__misses += 1
+			return None
+		with self.__lock:
+			self.__hits += 1
+			self.__bytesServed += len(body)
+		return {"status": meta["status"], "headers": meta["headers"], "body": body}
+
+	def GetCacheableTtl(self, status: int, headers: List[Dict[str, str]], size: int = 0) -> float:
+		"""按状态码、响应头和大小判断响应是否可缓存，返回可缓存的秒数，不可缓存时返回0"""
+		headerMap = {header["name"].lower(): header["value"] for header in headers}
+		vary = headerMap.get("vary", "").lower()
+		ttl = GetFreshness(headerMap, self.defaultTtl) if status == 200 else 0
+		if ttl <= 0 or "set-cookie" in headerMap or "*" in vary or "cookie" in vary or size > self.maxEntryBytes:
+			with self.__lock:
+				self.__uncacheable += 1
+			return 0
+		return ttl
+
+	def IsCacheable(self, status: int, headers: List[Dict[str, str]], size: int = 0) -> bool:
+		"""按状态码、响应头和大小判断响应是否可缓存"""
+		return self.GetCacheableTtl(status, headers, size) > 0
+
+	def Put(self, url: str, status: int, headers: List[Dict[str, str]], body: bytes, requestHeaders: Optional[Dict[str, str]] = None, partition: str = "", ttl: Optional[float] = None) -> bool:
+		"""判断是否可缓存并写入，返回是否已保存；ttl为调用方已由GetCacheableTtl得到的结果时只再检查内容大小"""
+		if ttl is None:
+			ttl = self.GetCacheableTtl(status, headers, len(body))
+		elif len(body) > self.maxEntryBytes:
+			with self.__lock:
+				self.__uncacheable += 1
+			ttl = 0
+		if ttl <= 0:
+			return False
+		headerMap = {header["name"].lower(): header["value"] for header in headers}
+		baseKey = self.__baseKey(url, partition)
+		vary = self.__varyNames(headerMap)
+		key = self.__entryKey(baseKey, vary, requestHeaders)
+		meta = {
+			"key": key,
+			"base": baseKey,
+			"vary": vary,
+			"partition": partition,
+			"url": url,
+			"status": status,
+			"headers": [header for header in headers if header["name"].lower() not in _DROPPED_HEADERS],
+			"size": len(body),
+			"stored_at": time.time(),
+			"expires": time.time() + ttl
+		}
+		metaPath, bodyPath = self.__paths(key)
+		with self.__lock:
+			if self.__vary.get(baseKey, vary) != vary:
+				# Vary变化后按旧请求头算出的变体无法再命中，一并移除
+				for stale in [entryKey for entryKey, entry in self.__index.items() if entry["base"] == baseKey]:
+					self.__drop(stale)
+			self.__vary[baseKey] = vary
+			self.__drop(key)
+			tempPath = f"{bodyPath}.{threading.get_ident()}.tmp"
+			with open(tempPath, "wb") as f:
+				f.write(body)
+			os.replace(tempPath, bodyPath)
+			with open(metaPath, "w", encoding="utf-8") as f:
+				json.dump(meta, f, ensure_ascii=False)
+			self.__index[key] = meta
+			self.__bytes += meta["size"]
+			self.__stores += 1
+			while self.__bytes > self.maxBytes and len(self.__index) > 1:
+				oldest = next(iter(self.__index))
+				self.__drop(oldest)
+				self.__evicted += 1
+		return True
+
+	def __drop(self, key: str) -> None:
+		"""移除条目（调用方持有锁）"""
+		meta = self.__index.pop(key, None)
+		if meta is not None:
+			self.__bytes -= meta["size"]
+			self.__removeFiles(key)
+
+	def Clear(self) -> int:
+		"""清空缓存，返回删除的条目数"""
+		with self.__lock:
+			keys = list(self.__index)
+			for key in keys:
+				self.__drop(key)
+			self.__vary.clear()
+			return len(keys)
+
+	def GetStats(self) -> Dict[str, Any]:
+		"""获取缓存命中统计"""
+		with self.__lock:
+			lookups = self.__hits + self.__misses
+			return {
+				"root": self.root,
+				"entries": len(self.__index),
+				"bytes": self.__bytes,
+				"max_bytes": self.maxBytes,
+				"allow_hosts": self.allowHosts,
+				"hits": self.__hits,
+				"misses": self.__misses,
+				"hit_rate": round(self.__hits / lookups, 4) if lookups else 0.0,
+				"bytes_served": self.__bytesServed,
+				"stores": self.__stores,
+				"uncacheable": self.__uncacheable,
+				"expired": self.__expired,
+				"evicted": self.__evicted
+			}
+
+class HttpCacheInterceptor:
+	"""通过DevTools Fetch域拦截页面请求：命中缓存时直接回放响应，未命中时在响应阶段取回内容写入缓存；
+	partition把缓存按加载配置等影响响应内容的条件隔开，不同分区的条目互不命中"""
+	def __init__(self, client: CdpClient, cache: HttpCache, resourceTypes: Optional[List[str]] = None, partition: str = ""):
+		self.client = client
+		self.cache = cache
+		self.resourceTypes = resourceTypes or DEFAULT_RESOURCE_TYPES
+		self.partition = partition
+		# 事件在连接的接收线程上派发，需要等待响应的调用转到工作线程执行以免阻塞接收
+		self.__pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="selenium-http-cache")
+		self.__lock = threading.Lock()
+		self.__fulfilled = 0
+		self.__errors = 0
+
+	def __patterns(self) -> List[dict]:
+		"""生成Fetch.enable的拦截模式，允许列表非空时只拦截这些主机"""
+		urlPatterns = [f"*://{host}/*" for host in self.cache.allowHosts] or ["*"]
+		return [
+			{"urlPattern": urlPattern, "resourceType": resourceType, "requestStage": stage}
+			for urlPattern in urlPatterns
+			for resourceType in self.resourceTypes
+			for stage in ("Request", "Response")
+		]
+
+	def Start(self) -> None:
+		"""订阅请求暂停事件并启用拦截"""
+		self.client.On("Fetch.requestPaused", lambda params: self.__pool.submit(self.__onPaused, params))
+		self.client.Call("Fetch.enable", {"patterns": self.__patterns()})
+
+	def __onPaused(self, params: dict) -> None:
+		"""处理被暂停的请求"""
+		requestId = params["requestId"]
+		request = params.get("request", {})
+		try:
+			if "responseStatusCode" in params:
+				self.__store(params)
+			elif self.__isPlainRequest(request) and self.cache.IsAllowed(request["url"]):
+				cached = self.cache.Get(request["url"], request.get("headers"), self.partition)
+				if cached is not None:
+					self.client.Send("Fetch.fulfillRequest", {
+						"requestId": requestId,
+						"responseCode": cached["status"],
+						"responseHeaders": cached["headers"],
+						"body": base64.b64encode(cached["body"]).decode("ascii")
+					})
+					with self.__lock:
+						self.__fulfilled += 1
+					return
+			self.client.Send("Fetch.continueRequest", {"requestId": requestId})
+		except Exception:
+			with self.__lock:
+				self.__errors += 1
+			try:
+				self.client.Send("Fetch.continueRequest", {"requestId": requestId})
+			except CdpError:
+				pass
+
+	@staticmethod
+	def __isPlainRequest(request: dict) -> bool:
+		"""只缓存GET请求，带凭据或范围请求不走缓存"""
+		headers = {name.lower() for name in request.get("headers", {})}
+		return request.get("method") == "GET" and "authorization" not in headers and "range" not in headers
+
+	def __store(self, params: dict) -> None:
+		"""在响应阶段取回内容写入缓存"""
+		request = params.get("request", {})
+		headers = params.get("responseHeaders", [])
+		ttl = self.cache.GetCacheableTtl(params["responseStatusCode"], headers) if self.__isPlainRequest(request) and self.cache.IsAllowed(request["url"]) else 0
+		if ttl > 0:
+			result = self.client.Call("Fetch.getResponseBody", {"requestId": params["requestId"]})
+			body = base64.b64decode(result["body"]) if result.get("base64Encoded") else result["body"].encode("utf-8")
+			self.cache.Put(request["url"], 200, headers, body, request.get("headers"), self.partition, ttl)
+		self.client.Send("Fetch.continueRequest", {"requestId": params["requestId"]})
+
+	def GetStats(self) -> Dict[str, Any]:
+		"""获取拦截统计"""
+		with self.__lock:
+			return {"fulfilled": self.__fulfilled, "errors": self.__errors, "resource_types": self.resourceTypes, "partition": self.partition}
+
+	def Stop(self) -> None:
+		"""停用拦截并关闭连接"""
+		try:
+			if not self.client.IsClosed():
+				self.client.Call("Fetch.disable", timeout=2)
+		except CdpError:
+			pass
+		self.client.Close()
+		self.__pool.shutdown(wait=False)
@@ -1,113 +1,292 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
 from selenium.common.exceptions import WebDriverException
+from Lib.registry import SessionRegistry
+from Lib.cdp import CdpClient
+from Lib.httpcache import HttpCache, HttpCacheInterceptor
+from Lib.profiles import LoadProfile, BuiltinProfiles
+from Lib.transport import RecordingConnection
+import logging
 import socket
 import os
 import psutil
-from typing import Optional
+import threading
+import time
+import urllib.parse
+import urllib.request
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+
+class SessionPoolFullError(RuntimeError):
+	"""会话池已满"""
+
+class AttachedChromeDriver(webdriver.Remote):
+	"""直接接管已存在的WebDriver会话，不创建新会话也不启动新的浏览器"""
+	def __init__(self, executorUrl: str, sessionId: str, driverPid: int, profile: Optional[str] = None):
+		self.executorUrl = executorUrl
+		self.driverPid = driverPid
+		self.profile = profile
+		self.__attachSessionId = sessionId
+		executor = ChromiumRemoteConnection(executorUrl, vendor_prefix="goog", browser_name="chrome")
+		super().__init__(command_executor=executor, options=Options())
+
+	def start_session(self, capabilities: dict) -> None:
+		self.session_id = self.__attachSessionId
+		self.caps = {}
+
+	def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+		"""通过chromedriver转发DevTools命令"""
+		return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+	def quit(self) -> None:
+		"""关闭会话并结束原进程遗留的chromedriver"""
+		try:
+			super().quit()
+		finally:
+			try:
+				psutil.Process(self.driverPid).terminate()
+			except psutil.Error:
+				pass
+
+class DriverSession:
+	def __init__(self, sessionId: str, driver: webdriver.Chrome, profile: str = "default"):
+		self.sessionId = sessionId
+		self.driver = driver
+		self.profile = profile
+		self.launchProfile = profile
+		self.createdAt = time.time()
+		self.lastUsed = self.createdAt
+		self.leased = False
+		self.cdp: Optional[CdpClient] = None
+		self.cdpRetryAt = 0.0
+		self.interceptor: Optional[HttpCacheInterceptor] = None
+
+	def ToDict(self) -> dict:
+		"""转换为可序列化的会话信息"""
+		return {
+			"session_id": self.sessionId,
+			"leased": self.leased,
+			"profile": self.profile,
+			"launch_profile": self.launchProfile,
+			"created_at": self.createdAt,
+			"idle_seconds": round(time.time() - self.lastUsed, 3),
+			"cdp": self.cdp.GetStats() if self.cdp else None,
+			"http_cache": self.interceptor.GetStats() if self.interceptor else None,
+			"recording": self.GetRecording()
+		}
+
+	def GetRecording(self) -> Optional[dict]:
+		"""当前命令录制的统计，未录制时返回None"""
+		log = RecordingConnection.GetLog(self.driver)
+		return log.GetStats() if log else None
 
 class SeleniumManager:
-	def __init__(self, debuggerAddress: str = '127.0.0.1:9222', debug: bool = True, chromedriverPath: Optional[str] = None, chromeBinPath: Optional[str] = None, headless: bool = False):
+	def __init__(self, debuggerAddress: str = '127.0.0.1:9222', debug: bool = True, chromedriverPath: Optional[str] = None, chromeBinPath: Optional[str] = None, headless: bool = False, maxSessions: int = 4, idleTimeout: float = 600, maxWarmDrivers: int = 1, registryPath: Optional[str] = None, standbyDrivers: int = 0, standbyHeadless: Optional[bool] = None, cdpReads: bool = False, profiles: Optional[Dict[str, LoadProfile]] = None, defaultProfile: str = "default", httpCacheFactory: Optional[Callable[[], HttpCache]] = None, httpCacheEnabled: bool = False, recordDir: Optional[str] = None, recordCommands: bool = False):
 		self.debuggerAddress = debuggerAddress
-		self.driver = None
 		self.debug = debug
 		self.chromedriverPath = chromedriverPath
 		self.chromeBinPath = chromeBinPath
 		self.headless = headless
+		self.maxSessions = maxSessions
+		self.idleTimeout = idleTimeout
+		self.maxWarmDrivers = maxWarmDrivers
+		self.registry = SessionRegistry(registryPath) if registryPath else None
+		self.standbyDrivers = standbyDrivers
+		self.standbyHeadless = standbyHeadless
+		self.cdpReads = cdpReads
+		self.profiles = profiles or BuiltinProfiles()
+		self.defaultProfile = defaultProfile if defaultProfile in self.profiles else "default"
+		# 响应缓存在首次启用时才创建，避免未使用时也建立缓存目录
+		self.httpCacheFactory = httpCacheFactory
+		self.httpCache: Optional[HttpCache] = None
+		self.httpCacheEnabled = httpCacheEnabled and httpCacheFactory is not None
+		self.recordDir = recordDir
+		self.recordCommands = recordCommands and bool(recordDir)
+		self.sessions: Dict[str, DriverSession] = {}
+		self.__warmDrivers: List[tuple] = []
+		self.__pending = 0
+		self.__lock = threading.RLock()
+		self.__evictionListeners: List[Callable[[str], None]] = []
+		self.__reaper: Optional[threading.Thread] = None
+		self.__reaperStop = threading.Event()
+		self.__standby: List[tuple] = []
+		self.__standbyFiller: Optional[threading.Thread] = None
+		self.__standbyStop = threading.Event()
+		self.__standbyHits = 0
+		self.__standbyMisses = 0
+
+	@property
+	def driver(self) -> Optional[webdriver.Chrome]:
+		"""默认会话的驱动实例"""
+		session = self.sessions.get(DEFAULT_SESSION_ID)
+		return session.driver if session else None
+
+	@driver.setter
+	def driver(self, value: Optional[webdriver.Chrome]):
+		with self.__lock:
+			if value is None:
+				self.sessions.pop(DEFAULT_SESSION_ID, None)
+			elif DEFAULT_SESSION_ID in self.sessions:
+				session = self.sessions[DEFAULT_SESSION_ID]
+				if session.driver is not value:
+					self.__closeCdp(session)
+				session.driver = value
+			else:
+				self.sessions[DEFAULT_SESSION_ID] = DriverSession(DEFAULT_SESSION_ID, value)
 
 	def __isPortInUse(self, host: str, port: int) -> bool:
-		"""检测端口是否被占用"""
+		"""检测端口上是否有服务在监听（跨平台，不依赖平台相关的errno）"""
 		with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-			try:
-				s.bind((host, port))
-				return False
-			except socket.error as e:
-				if e.errno == 10048:
-					return True
-				raise
-
-	def __getRunningSeleniumPids(self) -> list:
-		"""获取所有运行中的ChromeDriver进程ID"""
-		return [
-			p.info['pid'] for p in psutil.process_iter(['pid', 'name'])
-			if 'chromedriver' in p.info['name'].lower()
-		]
+			s.settimeout(0.2)
+			return s.connect_ex((host, port)) == 0
 
-	def __getActiveDriver(self, pid: int) -> Optional[webdriver.Chrome]:
-		"""尝试连接指定PID的WebDriver实例"""
+	def __isRecordAlive(self, record: dict) -> bool:
+		"""依次以进程存在、端口监听和会话可用三级探测登记的会话是否存活"""
 		try:
-			service = Service(executable_path=f'http://localhost:{pid}')
-			return webdriver.Chrome(service=service)
+			if not psutil.pid_exists(record["pid"]):
+				return False
+			if not self.__isPortInUse("127.0.0.1", record["port"]):
+				return False
+			url = f"{record['executor_url']}/session/{record['webdriver_session']}/url"
+			with urllib.request.urlopen(url, timeout=1) as response:
+				return response.status == 200
 		except Exception:
+			return False
+
+	def __reattachDriver(self, sessionId: str) -> Optional[webdriver.Remote]:
+		"""根据登记表重新连接到仍在运行的浏览器会话"""
+		if self.registry is None:
+			return None
+		record = self.registry.Get(sessionId)
+		if not record:
+			return None
+		if not self.__isRecordAlive(record):
+			self.registry.Remove(sessionId)
+			return None
+		try:
+			driver = AttachedChromeDriver(record["executor_url"], record["webdriver_session"], record["pid"], record.get("profile"))
+			if self.debug:
+				logger.info(f"复用现有实例 PID={record['pid']} 会话={record['webdriver_session']}")
+			return driver
+		except Exception as e:
+			if self.debug:
+				logger.warning(f"重新连接现有实例失败: {e}")
+			self.registry.Remove(sessionId)
 			return None
 
+	def __registerDriver(self, sessionId: str, driver: webdriver.Remote) -> None:
+		"""将驱动信息写入登记表，供后续进程快速重连"""
+		if self.registry is None:
+			return
+		try:
+			if isinstance(driver, AttachedChromeDriver):
+				pid, executorUrl = driver.driverPid, driver.executorUrl
+			else:
+				pid, executorUrl = driver.service.process.pid, driver.service.service_url
+			chromeOptions = (driver.capabilities or {}).get("goog:chromeOptions", {})
+			self.registry.Put(sessionId, {
+				"pid": pid,
+				"port": urllib.parse.urlparse(executorUrl).port,
+				"executor_url": executorUrl,
+				"webdriver_session": driver.session_id,
+				"debugger_address": chromeOptions.get("debuggerAddress"),
+				"profile": self.sessions[sessionId].launchProfile if sessionId in self.sessions else self.defaultProfile,
+				"registered_at": time.time()
+			})
+		except Exception as e:
+			if self.debug:
+				logger.warning(f"登记会话信息失败: {e}")
+
+	def __unregisterDriver(self, sessionId: str) -> None:
+		"""从登记表中移除会话"""
+		if self.registry is not None:
+			try:
+				self.registry.Remove(sessionId)
+			except Exception as e:
+				if self.debug:
+					logger.warning(f"移除会话登记失败: {e}")
+
 	def GetOrCreateDriver(self) -> Optional[webdriver.Chrome]:
 		"""获取或创建Selenium实例"""
-		for pid in self.__getRunningSeleniumPids():
-			driver = self.__getActiveDriver(pid)
-			if driver:
-				if self.debug:
-					print(f'复用现有实例 PID={pid}')
-				self.driver = driver
-				return self.driver
+		driver = self.__reattachDriver(DEFAULT_SESSION_ID)
+		if driver:
+			self.driver = driver
+			return self.driver
 		host, portStr = self.debuggerAddress.split(':')
 		port = int(portStr)
 		if self.__isPortInUse(host, port):
 			if self.debug:
-				print(f"检测到端口 {port} 正在使用，尝试连接到现有Selenium实例...")
+				logger.info(f"检测到端口 {port} 正在使用，尝试连接到现有Selenium实例...")
 			options = Options()
 			options.add_experimental_option("debuggerAddress", self.debuggerAddress)
 			try:
 				self.driver = webdriver.Chrome(options=options)
 				if self.debug:
-					print("成功连接到现有Selenium实例。")
+					logger.info("成功连接到现有Selenium实例。")
+				self.__registerDriver(DEFAULT_SESSION_ID, self.driver)
 				return self.driver
 			except WebDriverException as e:
 				if self.debug:
-					print(f"连接到现有实例失败: {e}")
-					print("尝试创建一个新的Selenium实例...")
+					logger.warning(f"连接到现有实例失败: {e}")
+					logger.info("尝试创建一个新的Selenium实例...")
 				return self.CreateNewDriver()
 		else:
 			if self.debug:
-				print(f"端口 {port} 未被使用，创建一个新的Selenium实例...")
+				logger.info(f"端口 {port} 未被使用，创建一个新的Selenium实例...")
 			return self.CreateNewDriver()
 
 	def CreateNewDriver(self) -> Optional[webdriver.Chrome]:
 		"""创建新的Selenium实例"""
+		self.driver = self.__launchDriver()
+		if self.driver:
+			self.__registerDriver(DEFAULT_SESSION_ID, self.driver)
+		return self.driver
+
+	def __launchDriver(self, headless: Optional[bool] = None, profile: Optional[str] = None) -> Optional[webdriver.Chrome]:
+		"""启动一个新的浏览器进程，不绑定到任何会话，加载策略与图片开关取自加载配置"""
+		headless = self.headless if headless is None else headless
+		loadProfile = self.GetProfile(profile)
 		options = Options()
+		options.page_load_strategy = loadProfile.pageLoadStrategy
+		if loadProfile.disableImages:
+			options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+			options.add_argument('--blink-settings=imagesEnabled=false')
 		options.add_argument('--disable-blink-features=AutomationControlled')
 		options.add_experimental_option("excludeSwitches", ["enable-automation"])
 		options.add_experimental_option('useAutomationExtension', False)
 		options.add_argument('--disable-extensions')
 		options.add_argument('--no-sandbox')
 		options.add_argument('--disable-dev-shm-usage')
-		if self.headless:
+		if headless:
 			options.add_argument('--headless')
 			options.add_argument('--disable-gpu')
 		if self.chromeBinPath and os.path.exists(self.chromeBinPath):
 			options.binary_location = self.chromeBinPath
 		else:
 			if self.debug:
-				print("警告: Chrome.exe文件路径无效或未提供")
+				logger.warning("警告: Chrome.exe文件路径无效或未提供")
 		service = None
 		if self.chromedriverPath and os.path.exists(self.chromedriverPath):
 			service = Service(executable_path=self.chromedriverPath)
 		else:
 			if self.debug:
-				print("警告: Chromedriver.exe路径无效或未提供")
+				logger.warning("警告: Chromedriver.exe路径无效或未提供")
 		try:
 			if service:
-				self.driver = webdriver.Chrome(service=service, options=options)
+				driver = webdriver.Chrome(service=service, options=options)
 			else:
-				self.driver = webdriver.Chrome(options=options)
+				driver = webdriver.Chrome(options=options)
 			if self.debug:
-				print("成功创建新的Selenium实例。")
-			return self.driver
+				logger.info("成功创建新的Selenium实例。")
+			return driver
 		except WebDriverException as e:
 			if self.debug:
-				print(f"创建新的Selenium实例失败: {e}")
-			self.driver = None
+				logger.warning(f"创建新的Selenium实例失败: {e}")
 			return None
 
 	def QuitDriver(self) -> bool:
@@ -116,17 +295,456 @@ class SeleniumManager:
 			try:
 				self.driver.quit()
 				self.driver = None
+				self.__unregisterDriver(DEFAULT_SESSION_ID)
 				if self.debug:
-					print("Selenium实例已关闭。")
+					logger.info("Selenium实例已关闭。")
 				return True
 			except Exception as e:
 				if self.debug:
-					print(f"关闭Selenium实例失败: {e}")
+					logger.warning(f"关闭Selenium实例失败: {e}")
 				return False
 		if self.debug:
-			print("没有正在运行的Selenium实例。")
+			logger.info("没有正在运行的Selenium实例。")
 		return False
 
 	def HasDriver(self) -> bool:
 		"""判断是否有Selenium实例"""
-		return self.driver is not None
\ No newline at end of file
+		return self.driver is not None
+
+	def HasSession(self, sessionId: str) -> bool:
+		"""判断指定会话是否存在"""
+		return sessionId in self.sessions
+
+	def LeaseSession(self, sessionId: str = DEFAULT_SESSION_ID, reuseWarm: bool = True, profile: Optional[str] = None) -> Optional[DriverSession]:
+		"""租用会话，会话不存在时优先复用预热实例，否则按加载配置创建新实例"""
+		loadProfile = self.GetProfile(profile)
+		with self.__lock:
+			session = self.sessions.get(sessionId)
+			if session:
+				session.leased = True
+				session.lastUsed = time.time()
+				return session
+			if len(self.sessions) + self.__pending >= self.maxSessions:
+				self.EvictIdleSessions()
+			if len(self.sessions) + self.__pending >= self.maxSessions:
+				raise SessionPoolFullError(f"会话池已满 (上限 {self.maxSessions})")
+			self.__pending += 1
+		launchProfile = loadProfile.name
+		try:
+			driver, launchProfile = self.__popWarmDriver(loadProfile) if reuseWarm else (None, launchProfile)
+			reusedWarm = driver is not None
+			if driver is None:
+				driver = self.__reattachDriver(sessionId)
+				if driver is not None and driver.profile in self.profiles:
+					launchProfile = driver.profile
+			if driver is None:
+				driver = self.__popStandbyDriver(loadProfile)
+				launchProfile = self.defaultProfile if driver is not None else loadProfile.name
+			if driver is None:
+				if sessionId == DEFAULT_SESSION_ID and loadProfile.name == self.defaultProfile:
+					driver = self.GetOrCreateDriver()
+				else:
+					driver = self.__launchDriver(profile=loadProfile.name)
+		finally:
+			with self.__lock:
+				self.__pending -= 1
+		if driver is None:
+			return None
+		with self.__lock:
+			session = DriverSession(sessionId, driver, loadProfile.name)
+			session.launchProfile = launchProfile
+			session.leased = True
+			self.sessions[sessionId] = session
+		# 预热实例可能残留上一个会话的屏蔽列表，复用时总是重新设置
+		if loadProfile.GetBlockedPatterns() or reusedWarm:
+			self.__applyBlocking(driver, loadProfile)
+		if self.httpCacheEnabled:
+			self.EnableHttpCache(sessionId)
+		if self.recordCommands:
+			self.__startRecordingQuietly(sessionId)
+		self.__registerDriver(sessionId, driver)
+		self.StartStandby()
+		if self.debug:
+			logger.info(f"会话 {sessionId} 已就绪")
+		return session
+
+	def ReplaceSession(self, sessionId: str, profile: Optional[str] = None) -> Optional[DriverSession]:
+		"""为会话换上全新的浏览器，优先使用待命实例，旧浏览器在后台关闭；未指定加载配置时沿用会话当前配置"""
+		current = self.sessions.get(sessionId)
+		loadProfile = self.GetProfile(profile or (current.profile if current else None))
+		driver = self.__popStandbyDriver(loadProfile)
+		launchProfile = self.defaultProfile
+		if driver is None:
+			driver = self.__launchDriver(profile=loadProfile.name)
+			launchProfile = loadProfile.name
+		if driver is None:
+			return None
+		with self.__lock:
+			session = self.sessions.get(sessionId)
+			oldDriver = session.driver if session else None
+			cacheEnabled = self.httpCacheEnabled or (session is not None and session.interceptor is not None)
+			if session:
+				self.__closeCdp(session)
+			session = DriverSession(sessionId, driver, loadProfile.name)
+			session.launchProfile = launchProfile
+			session.leased = True
+			self.sessions[sessionId] = session
+		if loadProfile.GetBlockedPatterns():
+			self.__applyBlocking(driver, loadProfile)
+		if cacheEnabled:
+			self.EnableHttpCache(sessionId)
+		if self.recordCommands:
+			self.__startRecordingQuietly(sessionId)
+		self.__registerDriver(sessionId, driver)
+		if oldDriver is not None:
+			threading.Thread(target=self.__quit, args=(oldDriver,), name="selenium-driver-quit", daemon=True).start()
+		self.StartStandby()
+		if self.debug:
+			logger.info(f"会话 {sessionId} 已切换到新的浏览器实例")
+		return session
+
+	def GetProfile(self, name: Optional[str] = None) -> LoadProfile:
+		"""按名称获取加载配置，未指定时使用默认配置"""
+		name = name or self.defaultProfile
+		if name not in self.profiles:
+			raise ValueError(f"unknown load profile: {name} (available: {', '.join(self.profiles)})")
+		return self.profiles[name]
+
+	def SetSessionProfile(self, sessionId: str, profile: str, restart: bool = False) -> dict:
+		"""切换会话的加载配置：URL屏蔽立即生效，加载策略或图片开关变化时需要restart才会换用新浏览器"""
+		loadProfile = self.GetProfile(profile)
+		session = self.sessions.get(sessionId)
+		if session is None:
+			raise ValueError(f"session not found: {sessionId}")
+		needsRestart = loadProfile.RequiresRestart(self.GetProfile(session.launchProfile))
+		if needsRestart and restart:
+			session = self.ReplaceSession(sessionId, loadProfile.name)
+			if session is None:
+				raise RuntimeError("failed to launch a browser for the new load profile")
+			return {"profile": loadProfile.name, "restarted": True, "pending_restart": False, "blocked_patterns": len(loadProfile.GetBlockedPatterns())}
+		session.profile = loadProfile.name
+		return {
+			"profile": loadProfile.name,
+			"restarted": False,
+			"pending_restart": needsRestart,
+			"blocking_applied": self.__applyBlocking(session.driver, loadProfile),
+			"blocked_patterns": len(loadProfile.GetBlockedPatterns())
+		}
+
+	def __applyBlocking(self, driver: webdriver.Remote, profile: LoadProfile) -> bool:
+		"""通过DevTools的Network.setBlockedURLs设置屏蔽列表，空列表即解除屏蔽"""
+		try:
+			driver.execute_cdp_cmd("Network.enable", {})
+			driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile.GetBlockedPatterns()})
+			return True
+		except Exception as e:
+			if self.debug:
+				logger.warning(f"设置资源屏蔽失败: {e}")
+			return False
+
+	def GetCdpClient(self, sessionId: str = DEFAULT_SESSION_ID) -> Optional[CdpClient]:
+		"""获取会话的DevTools直连客户端，未启用或不可用时返回None，失败后30秒内不再重试"""
+		if not self.cdpReads:
+			return None
+		session = self.sessions.get(sessionId)
+		if session is None:
+			return None
+		if session.cdp is not None and not session.cdp.IsClosed():
+			return session.cdp
+		if time.time() < session.cdpRetryAt:
+			return None
+		try:
+			session.cdp = CdpClient.ForDriver(session.driver)
+		except Exception as e:
+			session.cdp = None
+			if self.debug:
+				logger.warning(f"连接DevTools失败: {e}")
+		if session.cdp is None:
+			session.cdpRetryAt = time.time() + 30
+		return session.cdp
+
+	def __closeCdp(self, session: DriverSession) -> None:
+		"""关闭会话的DevTools连接、请求拦截与命令录制"""
+		RecordingConnection.Stop(session.driver)
+		if session.cdp is not None:
+			session.cdp.Close()
+			session.cdp = None
+		if session.interceptor is not None:
+			session.interceptor.Stop()
+			session.interceptor = None
+
+	def GetHttpCache(self, create: bool = True) -> Optional[HttpCache]:
+		"""获取响应缓存，create为True时按需创建"""
+		with self.__lock:
+			if self.httpCache is None and create and self.httpCacheFactory is not None:
+				self.httpCache = self.httpCacheFactory()
+			return self.httpCache
+
+	def EnableHttpCache(self, sessionId: str = DEFAULT_SESSION_ID) -> bool:
+		"""为会话当前页面启用响应缓存拦截，需要可用的DevTools调试地址"""
+		session = self.sessions.get(sessionId)
+		if session is None or self.GetHttpCache() is None:
+			return False
+		if session.interceptor is not None and not session.interceptor.client.IsClosed():
+			return True
+		try:
+			client = CdpClient.ForDriver(session.driver)
+			if client is None:
+				return False
+			interceptor = HttpCacheInterceptor(client, self.httpCache, partition=session.launchProfile)
+			try:
+				interceptor.Start()
+			except Exception:
+				interceptor.Stop()
+				raise
+			session.interceptor = interceptor
+			return True
+		except Exception as e:
+			if self.debug:
+				logger.warning(f"启用响应缓存失败: {e}")
+			return False
+
+	def DisableHttpCache(self, sessionId: str = DEFAULT_SESSION_ID) -> bool:
+		"""停用会话的响应缓存拦截"""
+		session = self.sessions.get(sessionId)
+		if session is None or session.interceptor is None:
+			return False
+		session.interceptor.Stop()
+		session.interceptor = None
+		return True
+
+	def StartRecording(self, sessionId: str = DEFAULT_SESSION_ID, path: Optional[str] = None) -> Optional[dict]:
+		"""开始把会话的WebDriver命令、响应与耗时录制到日志，未指定路径时写入录制目录，已在录制时换用新日志"""
+		session = self.sessions.get(sessionId)
+		if session is None:
+			return None
+		if not path:
+			if not self.recordDir:
+				raise ValueError("no recording directory configured")
+			path = os.path.join(self.recordDir, f"{sessionId}-{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}.jsonl.gz")
+		log = RecordingConnection.Start(session.driver, path)
+		if self.debug:
+			logger.info(f"会话 {sessionId} 开始录制命令: {path}")
+		return log.GetStats()
+
+	def __startRecordingQuietly(self, sessionId: str) -> None:
+		"""按配置为新会话开始录制，失败时只记录警告"""
+		try:
+			self.StartRecording(sessionId)
+		except (OSError, ValueError) as e:
+			if self.debug:
+				logger.warning(f"开始录制命令失败: {e}")
+
+	def StopRecording(self, sessionId: str = DEFAULT_SESSION_ID) -> Optional[dict]:
+		"""停止录制会话的命令，返回日志统计，未在录制时返回None"""
+		session = self.sessions.get(sessionId)
+		log = RecordingConnection.Stop(session.driver) if session else None
+		return log.GetStats() if log else None
+
+	def AdoptDriver(self, sessionId: str, driver: webdriver.Remote, profile: Optional[str] = None) -> DriverSession:
+		"""把外部创建的驱动（如回放驱动）登记为会话，不写入会话登记文件"""
+		loadProfile = self.GetProfile(profile)
+		with self.__lock:
+			if sessionId in self.sessions:
+				raise ValueError(f"session already exists: {sessionId}")
+			session = DriverSession(sessionId, driver, loadProfile.name)
+			self.sessions[sessionId] = session
+		return session
+
+	def StartStandby(self) -> None:
+		"""在后台补充待命浏览器直到达到配置数量，不阻塞调用方"""
+		if self.standbyDrivers <= 0 or self.__standbyStop.is_set():
+			return
+		with self.__lock:
+			if len(self.__standby) >= self.standbyDrivers:
+				return
+			if self.__standbyFiller and self.__standbyFiller.is_alive():
+				return
+			self.__standbyFiller = threading.Thread(target=self.__fillStandby, name="selenium-standby-filler", daemon=True)
+			self.__standbyFiller.start()
+
+	def __fillStandby(self) -> None:
+		"""待命实例补充线程"""
+		while not self.__standbyStop.is_set():
+			with self.__lock:
+				if len(self.__standby) >= self.standbyDrivers:
+					return
+			headless = self.headless if self.standbyHeadless is None else self.standbyHeadless
+			driver = self.__launchDriver(headless)
+			if driver is None:
+				return
+			with self.__lock:
+				if not self.__standbyStop.is_set():
+					self.__standby.append((driver, headless, time.time()))
+					driver = None
+			if driver is not None:
+				self.__quit(driver)
+				return
+			if self.debug:
+				logger.info("待命浏览器已就绪")
+
+	def StopStandby(self) -> None:
+		"""停止补充并关闭所有待命浏览器"""
+		self.__standbyStop.set()
+		with self.__lock:
+			drivers = [item[0] for item in self.__standby]
+			self.__standby = []
+		for driver in drivers:
+			self.__quit(driver)
+
+	def __popStandbyDriver(self, profile: Optional[LoadProfile] = None) -> Optional[webdriver.Chrome]:
+		"""取出一个与当前无头模式一致的待命实例，待命实例按默认加载配置启动，启动参数不兼容时不复用
+
+		standbyHeadless未指定时待命实例跟随当前无头模式，模式切换后旧模式的待命实例在后台关闭，由补充线程按新模式重新启动"""
+		if profile is not None and profile.RequiresRestart(self.GetProfile()):
+			return None
+		retired = []
+		with self.__lock:
+			for index, (driver, headless, _) in enumerate(self.__standby):
+				if headless == self.headless:
+					self.__standby.pop(index)
+					self.__standbyHits += 1
+					return driver
+			if self.standbyDrivers > 0:
+				self.__standbyMisses += 1
+			if self.standbyHeadless is None:
+				retired = [item[0] for item in self.__standby]
+				self.__standby = []
+		for driver in retired:
+			threading.Thread(target=self.__quit, args=(driver,), name="selenium-driver-quit", daemon=True).start()
+		return None
+
+	def ReleaseSession(self, sessionId: str) -> None:
+		"""归还会话租用"""
+		with self.__lock:
+			session = self.sessions.get(sessionId)
+			if session:
+				session.leased = False
+				session.lastUsed = time.time()
+
+	def CloseSession(self, sessionId: str, keepWarm: bool = True) -> bool:
+		"""关闭会话，可选择将浏览器保留为预热实例供后续会话复用"""
+		with self.__lock:
+			session = self.sessions.pop(sessionId, None)
+		if session is None:
+			return False
+		self.__closeCdp(session)
+		self.__unregisterDriver(sessionId)
+		if keepWarm and len(self.__warmDrivers) < self.maxWarmDrivers and self.__resetDriver(session.driver):
+			with self.__lock:
+				self.__warmDrivers.append((session.driver, time.time(), session.launchProfile))
+			if self.debug:
+				logger.info(f"会话 {sessionId} 已关闭，浏览器保留为预热实例")
+			return True
+		return self.__quit(session.driver)
+
+	def ListSessions(self) -> List[dict]:
+		"""列出所有会话"""
+		with self.__lock:
+			return [session.ToDict() for session in self.sessions.values()]
+
+	def GetPoolStats(self) -> dict:
+		"""获取会话池统计信息"""
+		with self.__lock:
+			return {
+				"sessions": len(self.sessions),
+				"leased": sum(1 for session in self.sessions.values() if session.leased),
+				"warm": len(self.__warmDrivers),
+				"standby": len(self.__standby),
+				"standby_target": self.standbyDrivers,
+				"standby_hits": self.__standbyHits,
+				"standby_misses": self.__standbyMisses,
+				"max_sessions": self.maxSessions,
+				"idle_timeout": self.idleTimeout
+			}
+
+	def EvictIdleSessions(self) -> List[str]:
+		"""淘汰空闲超时的会话和预热实例"""
+		now = time.time()
+		with self.__lock:
+			expired = [
+				session for session in self.sessions.values()
+				if not session.leased and now - session.lastUsed > self.idleTimeout
+			]
+			for session in expired:
+				self.sessions.pop(session.sessionId, None)
+			staleWarm = [item for item in self.__warmDrivers if now - item[1] > self.idleTimeout]
+			self.__warmDrivers = [item for item in self.__warmDrivers if now - item[1] <= self.idleTimeout]
+		for session in expired:
+			self.__closeCdp(session)
+			self.__unregisterDriver(session.sessionId)
+			self.__quit(session.driver)
+			if self.debug:
+				logger.info(f"会话 {session.sessionId} 空闲超时，已淘汰")
+			for listener in list(self.__evictionListeners):
+				try:
+					listener(session.sessionId)
+				except Exception as e:
+					if self.debug:
+						logger.warning(f"会话淘汰回调失败: {e}")
+		for driver, *_ in staleWarm:
+			self.__quit(driver)
+		return [session.sessionId for session in expired]
+
+	def AddEvictionListener(self, listener: Callable[[str], None]) -> None:
+		"""注册会话被淘汰时的回调"""
+		self.__evictionListeners.append(listener)
+
+	def StartIdleReaper(self, interval: float = 30) -> None:
+		"""启动后台线程定期淘汰空闲会话"""
+		if self.__reaper and self.__reaper.is_alive():
+			return
+		self.__reaperStop.clear()
+		def loop():
+			while not self.__reaperStop.wait(interval):
+				self.EvictIdleSessions()
+		self.__reaper = threading.Thread(target=loop, name="selenium-session-reaper", daemon=True)
+		self.__reaper.start()
+
+	def QuitAll(self) -> None:
+		"""关闭所有会话与预热实例"""
+		self.__reaperStop.set()
+		self.__standbyStop.set()
+		with self.__lock:
+			drivers = [session.driver for session in self.sessions.values()] + [item[0] for item in self.__warmDrivers] + [item[0] for item in self.__standby]
+			for session in self.sessions.values():
+				self.__closeCdp(session)
+			sessionIds = list(self.sessions)
+			self.sessions.clear()
+			self.__warmDrivers = []
+			self.__standby = []
+		for sessionId in sessionIds:
+			self.__unregisterDriver(sessionId)
+		for driver in drivers:
+			self.__quit(driver)
+
+	def __popWarmDriver(self, profile: LoadProfile) -> tuple:
+		"""取出一个启动参数与加载配置兼容的预热实例，返回 (驱动, 启动时的配置名)"""
+		with self.__lock:
+			for index in range(len(self.__warmDrivers) - 1, -1, -1):
+				driver, _, launchProfile = self.__warmDrivers[index]
+				if launchProfile in self.profiles and not profile.RequiresRestart(self.profiles[launchProfile]):
+					self.__warmDrivers.pop(index)
+					return driver, launchProfile
+		return None, profile.name
+
+	def __resetDriver(self, driver: webdriver.Chrome) -> bool:
+		"""清理浏览器状态以便复用"""
+		try:
+			driver.delete_all_cookies()
+			driver.get("about:blank")
+			return True
+		except Exception as e:
+			if self.debug:
+				logger.warning(f"重置浏览器状态失败: {e}")
+			return False
+
+	def __quit(self, driver: webdriver.Chrome) -> bool:
+		"""关闭浏览器进程"""
+		try:
+			driver.quit()
+			return True
+		except Exception as e:
+			if self.debug:
+				logger.warning(f"关闭Selenium实例失败: {e}")
+			return False
\ No newline at end of file
@@ -0,0 +1,271 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 延迟直方图桶上界（秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+	"""固定桶直方图，记录次数、总和、最大值、错误数与关联的WebDriver命令数"""
+	def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+		self.buckets = buckets
+		self.counts = [0] * (len(buckets) + 1)
+		self.count = 0
+		self.sum = 0.0
+		self.max = 0.0
+		self.errors = 0
+		self.commands = 0
+
+	def Observe(self, value: float, error: bool = False, commands: int = 0) -> None:
+		"""记录一次观测（调用方持有锁）"""
+		self.counts[bisect_left(self.buckets, value)] += 1
+		self.count += 1
+		self.sum += value
+		self.max = max(self.max, value)
+		self.errors += 1 if error else 0
+		self.commands += commands
+
+	def Quantile(self, quantile: float) -> Optional[float]:
+		"""按桶内线性插值估算分位数"""
+		if self.count == 0:
+			return None
+		rank = quantile * self.count
+		seen = 0
+		for index, bucketCount in enumerate(self.counts):
+			if seen + bucketCount >= rank and bucketCount > 0:
+				lower = self.buckets[index - 1] if index > 0 else 0.0
+				upper = self.buckets[index] if index < len(self.buckets) else self.max
+				return min(self.max, lower + (upper - lower) * (rank - seen) / bucketCount)
+			seen += bucketCount
+		return self.max
+
+	def ToDict(self) -> Dict[str, Any]:
+		"""转换为可读的统计摘要（毫秒）"""
+		def ms(value: Optional[float]) -> Optional[float]:
+			return None if value is None else round(value * 1000, 2)
+		return {
+			"count": self.count,
+			"errors": self.errors,
+			"mean_ms": ms(self.sum / self.count) if self.count else None,
+			"p50_ms": ms(self.Quantile(0.5)),
+			"p95_ms": ms(self.Quantile(0.95)),
+			"p99_ms": ms(self.Quantile(0.99)),
+			"max_ms": ms(self.max),
+			"webdriver_commands": self.commands,
+			"commands_per_call": round(self.commands / self.count, 2) if self.count else None
+		}
+
+class CallScope:
+	"""一次工具调用的上下文，累计该调用发出的WebDriver命令数"""
+	__slots__ = ("name", "commands")
+
+	def __init__(self, name: str):
+		self.name = name
+		self.commands = 0
+
+class ServerMetrics:
+	"""服务器自身的运行指标：工具与方法延迟直方图、错误数与WebDriver命令计数，可导出为Prometheus文本格式"""
+	def __init__(self, enabled: bool = True):
+		self.enabled = enabled
+		self.startedAt = time.time()
+		self.__lock = threading.Lock()
+		self.__tools: Dict[str, Histogram] = {}
+		self.__methods: Dict[str, Histogram] = {}
+		self.__commands: Dict[str, int] = {}
+		self.__scope: contextvars.ContextVar = contextvars.ContextVar("selenium_mcp_call", default=None)
+		self.__local = threading.local()
+		self.__writer: Optional[threading.Thread] = None
+		self.__writerStop = threading.Event()
+
+	def __observe(self, series: Dict[str, Histogram], name: str, seconds: float, error: bool, commands: int = 0) -> None:
+		"""记录一次观测"""
+		with self.__lock:
+			histogram = series.get(name)
+			if histogram is None:
+				histogram = series[name] = Histogram()
+			histogram.Observe(seconds, error, commands)
+
+	def InstrumentTool(self, func: Callable) -> Callable:
+		"""包装异步MCP工具：记录延迟，返回error开头的结果或抛出异常计为错误，并统计调用期间的WebDriver命令"""
+		if not self.enabled:
+			return func
+		name = func.__name__
+
+		@functools.wraps(func)
+		async def wrapper(*args, **kwargs):
+			scope = CallScope(name)
+			token = self.__scope.set(scope)
+			started = time.perf_counter()
+			error = True
+			try:
+				result = await func(*args, **kwargs)
+				error = isinstance(result, str) and result.startswith("error")
+				return result
+			finally:
+				self.__scope.reset(token)
+				self.__observe(self.__tools, name, time.perf_counter() - started, error, scope.commands)
+		return wrapper
+
+	def CurrentScope(self) -> Optional[CallScope]:
+		"""获取当前异步上下文中的工具调用"""
+		return self.__scope.get()
+
+	@contextmanager
+	def Attach(self, scope: Optional[CallScope]):
+		"""在执行器线程上关联工具调用，使该线程发出的WebDriver命令计入此调用"""
+		previous = getattr(self.__local, "scope", None)
+		self.__local.scope = scope
+		try:
+			yield
+		finally:
+			self.__local.scope = previous
+
+	def CountCommand(self, command: str) -> None:
+		"""记录一条WebDriver命令"""
+		scope = getattr(self.__local, "scope", None)
+		if scope is not None:
+			scope.commands += 1
+		with self.__lock:
+			self.__commands[command] = self.__commands.get(command, 0) + 1
+
+	def InstrumentDriver(self, driver: Any) -> Any:
+		"""在驱动的命令通道上计数，每个驱动只包装一次"""
+		if not self.enabled:
+			return driver
+		executor = getattr(driver, "command_executor", None)
+		if executor is None or getattr(executor, "_seleniumMcpCounted", False):
+			return driver
+		execute = executor.execute
+
+		@functools.wraps(execute)
+		def counted(command, params):
+			self.CountCommand(command)
+			return execute(command, params)
+		executor.execute = counted
+		executor._seleniumMcpCounted = True
+		return driver
+
+	def InstrumentObject(self, target: Any) -> Any:
+		"""为对象的公开方法（首字母大写）记录延迟与异常，生成器方法保持原样"""
+		if not self.enabled:
+			return target
+		prefix = type(target).__name__
+		for name, member in inspect.getmembers(type(target), callable):
+			if not name[:1].isupper() or inspect.isgeneratorfunction(member) or inspect.isclass(member):
+				continue
+			setattr(target, name, self.__timed(f"{prefix}.{name}", getattr(target, name)))
+		return target
+
+	def __timed(self, name: str, method: Callable) -> Callable:
+		"""包装单个方法"""
+		@functools.wraps(method)
+		def wrapper(*args, **kwargs):
+			started = time.perf_counter()
+			error = True
+			try:
+				result = method(*args, **kwargs)
+				error = False
+				return result
+			finally:
+				self.__observe(self.__methods, name, time.perf_counter() - started, error)
+		return wrapper
+
+	def GetStats(self) -> Dict[str, Any]:
+		"""获取统计摘要"""
+		with self.__lock:
+			return {
+				"enabled": self.enabled,
+				"uptime_seconds": round(time.time() - self.startedAt, 1),
+				"tools": {name: histogram.ToDict() for name, histogram in sorted(self.__tools.items())},
+				"methods": {name: histogram.ToDict() for name, histogram in sorted(self.__methods.items())},
+				"webdriver_commands": dict(sorted(self.__commands.items(), key=lambda item: -item[1]))
+			}
+
+	def Reset(self) -> None:
+		"""清空统计"""
+		with self.__lock:
+			self.__tools.clear()
+			self.__methods.clear()
+			self.__commands.clear()
+
+	@staticmethod
+	def __label(value: str) -> str:
+		"""转义Prometheus标签值"""
+		return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+	def __histogramLines(self, metric: str, label: str, series: Dict[str, Histogram]) -> List[str]:
+		"""生成直方图的样本行"""
+		lines = []
+		for name, histogram in sorted(series.items()):
+			labels = f'{label}="{self.__label(name)}"'
+			cumulative = 0
+			for bound, bucketCount in zip(histogram.buckets, histogram.counts):
+				cumulative += bucketCount
+				lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+			lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+			lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:.6f}")
+			lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+		return lines
+
+	def ToPrometheus(self) -> str:
+		"""导出为Prometheus文本格式"""
+		with self.__lock:
+			lines = [
+				"# HELP selenium_mcp_tool_duration_seconds MCP tool call latency.",
+				"# TYPE selenium_mcp_tool_duration_seconds histogram"
+			]
+			lines += self.__histogramLines("selenium_mcp_tool_duration_seconds", "tool", self.__tools)
+			lines += ["# HELP selenium_mcp_tool_errors_total MCP tool calls that failed or returned an error.", "# TYPE selenium_mcp_tool_errors_total counter"]
+			lines += [f'selenium_mcp_tool_errors_total{{tool="{self.__label(name)}"}} {histogram.errors}' for name, histogram in sorted(self.__tools.items())]
+			lines += ["# HELP selenium_mcp_tool_webdriver_commands_total WebDriver commands issued by MCP tool calls.", "# TYPE selenium_mcp_tool_webdriver_commands_total counter"]
+			lines += [f'selenium_mcp_tool_webdriver_commands_total{{tool="{self.__label(name)}"}} {histogram.commands}' for name, histogram in sorted(self.__tools.items())]
+			lines += ["# HELP selenium_mcp_method_duration_seconds Controller and reader method latency.", "# TYPE selenium_mcp_method_duration_seconds histogram"]
+			lines += self.__histogramLines("selenium_mcp_method_duration_seconds", "method", self.__methods)
+			lines += ["# HELP selenium_mcp_method_errors_total Controller and reader methods that raised.", "# TYPE selenium_mcp_method_errors_total counter"]
+			lines += [f'selenium_mcp_method_errors_total{{method="{self.__label(name)}"}} {histogram.errors}' for name, histogram in sorted(self.__methods.items())]
+			lines += ["# HELP selenium_mcp_webdriver_commands_total WebDriver commands by command name.", "# TYPE selenium_mcp_webdriver_commands_total counter"]
+			lines += [f'selenium_mcp_webdriver_commands_total{{command="{self.__label(name)}"}} {count}' for name, count in sorted(self.__commands.items())]
+			lines += ["# HELP selenium_mcp_uptime_seconds Seconds since the server started.", "# TYPE selenium_mcp_uptime_seconds gauge", f"selenium_mcp_uptime_seconds {time.time() - self.startedAt:.1f}"]
+		return "\n".join(lines) + "\n"
+
+	def WritePrometheus(self, path: str) -> None:
+		"""原子写入Prometheus文本文件"""
+		directory = os.path.dirname(path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+		tempPath = f"{path}.{os.getpid()}.tmp"
+		with open(tempPath, "w", encoding="utf-8") as f:
+			f.write(self.ToPrometheus())
+		os.replace(tempPath, path)
+
+	def StartWriter(self, path: str, interval: float = 15) -> None:
+		"""启动后台线程定期写出Prometheus文件"""
+		if not self.enabled or not path or (self.__writer and self.__writer.is_alive()):
+			return
+		self.__writerStop.clear()
+		def loop():
+			while not self.__writerStop.wait(interval):
+				try:
+					self.WritePrometheus(path)
+				except OSError as e:
+					logger.warning(f"写出指标文件失败: {e}")
+		self.__writer = threading.Thread(target=loop, name="selenium-metrics-writer", daemon=True)
+		self.__writer.start()
+
+	def StopWriter(self, path: Optional[str] = None) -> None:
+		"""停止写出线程，指定路径时最后写出一次"""
+		self.__writerStop.set()
+		if self.enabled and path:
+			try:
+				self.WritePrometheus(path)
+			except OSError as e:
+				logger.warning(f"写出指标文件失败: {e}")
@@ -0,0 +1,90 @@
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+import threading
+import time
+
+# 从Performance.getMetrics中保留的浏览器性能计数器
+PERFORMANCE_COUNTERS = (
+	"Documents", "Frames", "Nodes", "JSEventListeners", "LayoutCount", "RecalcStyleCount",
+	"LayoutDuration", "RecalcStyleDuration", "ScriptDuration", "TaskDuration", "JSHeapUsedSize"
+)
+
+# 参与分位数汇总的指标及其在记录中的路径
+SUMMARY_FIELDS = {
+	"driver_ms": ("driver_ms",),
+	"ttfb_ms": ("navigation", "ttfb_ms"),
+	"dom_content_loaded_ms": ("navigation", "dom_content_loaded_ms"),
+	"load_ms": ("navigation", "load_ms"),
+	"first_contentful_paint_ms": ("paint", "first_contentful_paint_ms"),
+	"resource_count": ("resources", "count"),
+	"transfer_bytes": ("resources", "transfer_bytes"),
+	"script_duration_s": ("counters", "ScriptDuration"),
+	"nodes": ("counters", "Nodes")
+}
+
+def Percentile(values: Sequence[float], percent: float) -> Optional[float]:
+	"""线性插值计算分位数"""
+	if not values:
+		return None
+	ordered = sorted(values)
+	position = (len(ordered) - 1) * percent / 100
+	lower = int(position)
+	upper = min(lower + 1, len(ordered) - 1)
+	return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+class NavigationMetrics:
+	"""会话内最近若干次导航的性能记录环形缓冲"""
+	def __init__(self, capacity: int = 50):
+		self.capacity = capacity
+		self.__records: deque = deque(maxlen=capacity)
+		self.__lock = threading.Lock()
+		self.__total = 0
+
+	def Record(self, action: str, target: Optional[str], driverSeconds: float, metrics: Dict[str, Any]) -> Dict[str, Any]:
+		"""记录一次导航，driverSeconds为驱动调用本身的耗时"""
+		record = dict(metrics)
+		record.update({"action": action, "target": target, "recorded_at": time.time(), "driver_ms": round(driverSeconds * 1000, 1)})
+		with self.__lock:
+			self.__records.append(record)
+			self.__total += 1
+		return record
+
+	@staticmethod
+	def __lookup(record: Dict[str, Any], path: tuple) -> Optional[float]:
+		"""按路径读取数值指标"""
+		value: Any = record
+		for key in path:
+			if not isinstance(value, dict):
+				return None
+			value = value.get(key)
+		return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+	def GetSummary(self, limit: int = 10) -> Dict[str, Any]:
+		"""返回各指标在缓冲内所有记录上的分位数汇总与最近limit条记录"""
+		with self.__lock:
+			records: List[Dict[str, Any]] = list(self.__records)
+			total = self.__total
+		summary = {}
+		for name, path in SUMMARY_FIELDS.items():
+			values = [value for value in (self.__lookup(record, path) for record in records) if value is not None]
+			if values:
+				summary[name] = {
+					"count": len(values),
+					"p50": round(Percentile(values, 50), 3),
+					"p90": round(Percentile(values, 90), 3),
+					"p95": round(Percentile(values, 95), 3),
+					"max": round(max(values), 3),
+					"mean": round(sum(values) / len(values), 3)
+				}
+		return {
+			"navigations": len(records),
+			"total_recorded": total,
+			"capacity": self.capacity,
+			"summary": summary,
+			"recent": records[-limit:] if limit > 0 else []
+		}
+
+	def Clear(self) -> None:
+		"""清空记录"""
+		with self.__lock:
+			self.__records.clear()
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional
+
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+
+RESOURCE_TYPE_EXTENSIONS = {
+	"image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"],
+	"font": ["woff", "woff2", "ttf", "otf", "eot"],
+	"media": ["mp4", "webm", "ogg", "mp3", "wav", "m4a", "m3u8", "mov"],
+	"stylesheet": ["css"],
+	"script": ["js"]
+}
+
+# Network.setBlockedURLs只能按URL匹配，资源类型按常见扩展名展开为通配模式；
+# 扩展名后可能跟查询串或片段（logo.png?v=3、font.woff2#iefix），但不能写成"*.js*"，否则会误伤.json接口；
+# 匹配规则中"?"是单字符通配符，查询串的问号需要用反斜杠转义
+RESOURCE_TYPE_PATTERNS = {
+	resourceType: [pattern for extension in extensions for pattern in (f"*.{extension}", f"*.{extension}\\?*", f"*.{extension}#*")]
+	for resourceType, extensions in RESOURCE_TYPE_EXTENSIONS.items()
+}
+
+class LoadProfile:
+	"""页面加载配置：加载策略、屏蔽的URL与资源类型、是否禁用图片"""
+	def __init__(self, name: str, pageLoadStrategy: str = "normal", blockedUrls: Optional[List[str]] = None, blockedResourceTypes: Optional[List[str]] = None, disableImages: bool = False):
+		if pageLoadStrategy not in PAGE_LOAD_STRATEGIES:
+			raise ValueError(f"unsupported pageLoadStrategy: {pageLoadStrategy} (expected normal, eager or none)")
+		resourceTypes = [resourceType.lower() for resourceType in blockedResourceTypes or []]
+		unknown = [resourceType for resourceType in resourceTypes if resourceType not in RESOURCE_TYPE_PATTERNS]
+		if unknown:
+			raise ValueError(f"unsupported resource types: {', '.join(unknown)} (expected {', '.join(RESOURCE_TYPE_PATTERNS)})")
+		self.name = name
+		self.pageLoadStrategy = pageLoadStrategy
+		self.blockedUrls = list(blockedUrls or [])
+		self.blockedResourceTypes = resourceTypes
+		self.disableImages = disableImages
+
+	@classmethod
+	def FromDict(cls, name: str, data: Dict[str, Any]) -> "LoadProfile":
+		"""从config.json中的配置项创建"""
+		return cls(
+			name,
+			data.get("pageLoadStrategy", "normal"),
+			data.get("blockedUrls"),
+			data.get("blockedResourceTypes"),
+			data.get("disableImages", False)
+		)
+
+	def GetBlockedPatterns(self) -> List[str]:
+		"""获取需要屏蔽的URL通配模式"""
+		patterns = list(self.blockedUrls)
+		resourceTypes = list(self.blockedResourceTypes)
+		if self.disableImages and "image" not in resourceTypes:
+			resourceTypes.append("image")
+		for resourceType in resourceTypes:
+			patterns.extend(RESOURCE_TYPE_PATTERNS[resourceType])
+		return list(dict.fromkeys(patterns))
+
+	def RequiresRestart(self, other: "LoadProfile") -> bool:
+		"""加载策略与图片开关在浏览器启动时确定，二者不同时切换需要重启浏览器"""
+		return self.pageLoadStrategy != other.pageLoadStrategy or self.disableImages != other.disableImages
+
+	def ToDict(self) -> Dict[str, Any]:
+		"""转换为可序列化的配置"""
+		return {
+			"pageLoadStrategy": self.pageLoadStrategy,
+			"blockedUrls": self.blockedUrls,
+			"blockedResourceTypes": self.blockedResourceTypes,
+			"disableImages": self.disableImages
+		}
+
+def BuiltinProfiles() -> Dict[str, LoadProfile]:
+	"""内置配置：default保持浏览器默认行为，lean在DOM就绪后返回并屏蔽图片、字体和媒体"""
+	return {
+		"default": LoadProfile("default"),
+		"lean": LoadProfile("lean", "eager", [], ["image", "font", "media"], True)
+	}
+
+def LoadProfiles(configured: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, LoadProfile]:
+	"""合并内置配置与config.json中的配置，无效的配置项被忽略"""
+	profiles = BuiltinProfiles()
+	for name, data in (configured or {}).items():
+		try:
+			profiles[name] = LoadProfile.FromDict(name, data or {})
+		except (ValueError, TypeError, AttributeError):
+			continue
+	return profiles
@@ -2,38 +2,180 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from typing import List, Dict, Optional, Any, Tuple
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from typing import List, Dict, Optional, Any, Tuple, Callable, Iterator
+from Lib.scripts import (
+	CACHED_LINKS_SCRIPT,
+	CACHED_IMAGES_SCRIPT,
+	CACHED_META_SCRIPT,
+	CACHED_SUMMARY_SCRIPT,
+	CACHED_SEARCH_TEXT_SCRIPT,
+	CACHED_TITLE_SCRIPT,
+	READ_TABLE_SCRIPT,
+	READ_FORM_SCRIPT,
+	DOCUMENT_STATE_SCRIPT,
+	READ_HTML_CHUNK_SCRIPT,
+	PAGE_TEXT_SCRIPT,
+	PAGE_CHANGES_SCRIPT,
+	INTERACTIVE_OUTLINE_SCRIPT,
+	NAVIGATION_METRICS_SCRIPT
+)
+from Lib.cache import SnapshotCache
+from Lib.waiter import DomWaiter
+from Lib.elements import ElementCache, ResolveLocator
+from Lib.cdp import CdpClient, CdpError
+from Lib.navigation import PERFORMANCE_COUNTERS
+import base64
+import csv
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PageReader:
-	def __init__(self, driver: webdriver.Chrome):
+	def __init__(self, driver: webdriver.Chrome, snapshotCache: Optional[SnapshotCache] = None, elementCache: Optional[ElementCache] = None, cdpProvider: Optional[Callable[[], Optional[CdpClient]]] = None):
 		self.driver = driver
+		self.cdpProvider = cdpProvider
 		self.wait = WebDriverWait(driver, 10)
+		self.snapshotCache = snapshotCache
+		self.elements = elementCache or ElementCache(driver)
+		self.waiter = DomWaiter(driver)
+		self.__textDocument: Optional[Dict[str, Any]] = None
+		self.__state: Optional[Tuple[str, int, str]] = None
+	
+	def __getCdp(self) -> Optional[CdpClient]:
+		"""获取DevTools直连客户端"""
+		if self.cdpProvider is None:
+			return None
+		try:
+			return self.cdpProvider()
+		except Exception:
+			return None
+	
+	def __evaluate(self, script: str, *args) -> Any:
+		"""执行只读脚本，优先走DevTools直连，不可用或失败时回退到WebDriver"""
+		cdp = self.__getCdp()
+		if cdp is not None:
+			try:
+				return cdp.Evaluate(script, *args)
+			except CdpError:
+				pass
+		return self.driver.execute_script(script, *args)
+	
+	def __observe(self, token: str, generation: int, url: str) -> Optional[Tuple[str, int, str]]:
+		"""记录脚本顺带返回的文档状态，代数为-1（无法观察DOM变化）时不可用于缓存"""
+		if generation < 0:
+			self.__state = None
+			return None
+		self.__state = (token, generation, url)
+		self.elements.Observe(token, generation)
+		return self.__state
+	
+	def GetDocumentState(self) -> Optional[Tuple[str, int, str]]:
+		"""获取 (文档标识, DOM代数, URL)，首次调用时在页面中注入变更观察器"""
+		try:
+			token, generation, url = self.__evaluate(DOCUMENT_STATE_SCRIPT)
+		except Exception:
+			return None
+		return self.__observe(token, generation, url)
+	
+	def __cachedRead(self, name: str, script: str, args: tuple = (), transform: Optional[Callable[[Any], Any]] = None) -> Any:
+		"""在文档未变化时复用上次的读取结果，导航或DOM变更会使缓存失效
+		按上次已知的文档状态查缓存，命中时把该状态随读取脚本一起发给页面：页面确认未变化则只回传状态，
+		否则在同一次往返内执行读取，因此命中与未命中都只需一次往返"""
+		known = self.__state if self.snapshotCache is not None else None
+		key = known + (name, args) if known else None
+		found, cached = self.snapshotCache.Peek(key) if key else (False, None)
+		token, generation, url, unchanged, value = self.__evaluate(script, list(known) if found else None, *args)
+		state = self.__observe(token, generation, url)
+		if unchanged:
+			self.snapshotCache.Get(key)
+			return cached
+		value = transform(value) if transform else value
+		if self.snapshotCache is not None:
+			self.snapshotCache.CountMiss()
+			if state is not None:
+				self.snapshotCache.Put(state + (name, args), value)
+		return value
 	
 	def GetPageTitle(self) -> str:
-		"""获取页面标题"""
+		"""获取页面标题，文档未变化时复用缓存；切换到frame后仍返回顶层文档的标题"""
+		if self.elements.frame is None:
+			try:
+				return self.__cachedRead("title", CACHED_TITLE_SCRIPT)
+			except Exception:
+				pass
 		return self.driver.title
 	
 	def GetPageUrl(self) -> str:
-		"""获取当前页面URL"""
+		"""获取当前页面URL，随文档状态一并读取；切换到frame后仍返回顶层文档的URL"""
+		if self.elements.frame is None:
+			state = self.GetDocumentState()
+			if state is not None:
+				return state[2]
 		return self.driver.current_url
 	
 	def GetPageSource(self) -> str:
 		"""获取页面源代码"""
+		cdp = self.__getCdp()
+		if cdp is not None:
+			try:
+				return cdp.GetOuterHTML()
+			except (CdpError, KeyError):
+				pass
 		return self.driver.page_source
 	
+	def __iterHtml(self, kind: str, chunkSize: int, pipelineDepth: int) -> Iterator[str]:
+		"""分块读取页面中序列化好的HTML，DevTools可用时后续分块按批流水线请求；分块边界落在代理对中间时把高位代理留给下一块"""
+		chunk, total = self.__evaluate(READ_HTML_CHUNK_SCRIPT, 0, chunkSize, kind)
+		pending = ""
+		def emit(chunk: str) -> Iterator[str]:
+			nonlocal pending
+			if pending:
+				chunk, pending = (pending + chunk).encode("utf-16", "surrogatepass").decode("utf-16"), ""
+			if chunk and "\ud800" <= chunk[-1] <= "\udbff":
+				chunk, pending = chunk[:-1], chunk[-1]
+			if chunk:
+				yield chunk
+		yield from emit(chunk)
+		starts = list(range(chunkSize, total, chunkSize))
+		while starts:
+			batch, starts = starts[:pipelineDepth], starts[pipelineDepth:]
+			cdp = self.__getCdp()
+			if cdp is not None:
+				try:
+					chunks = [chunk for chunk, _ in cdp.EvaluateMany([(READ_HTML_CHUNK_SCRIPT, (start, chunkSize, kind)) for start in batch])]
+				except CdpError:
+					chunks = None
+				if chunks is not None:
+					for chunk in chunks:
+						yield from emit(chunk)
+					continue
+			for start in batch:
+				chunk, _ = self.driver.execute_script(READ_HTML_CHUNK_SCRIPT, start, chunkSize, kind)
+				yield from emit(chunk)
+		if pending:
+			yield pending
+
+	def IterPageSource(self, chunkSize: int = 1024 * 1024, pipelineDepth: int = 8) -> Iterator[str]:
+		"""分块读取页面源代码（与WebDriver的page_source相同的序列化方式），不在Python侧拼出整份字符串"""
+		return self.__iterHtml("source", chunkSize, pipelineDepth)
+
+	def IterRenderedHtml(self, chunkSize: int = 1024 * 1024, pipelineDepth: int = 8) -> Iterator[str]:
+		"""分块读取渲染后的HTML"""
+		return self.__iterHtml("rendered", chunkSize, pipelineDepth)
+	
 	def GetElementText(self, selector: str, byType: By = By.CSS_SELECTOR) -> Optional[str]:
 		"""获取单个元素的文本内容"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			return element.text.strip()
+			return self.elements.Use(byType, selector, lambda element: element.text.strip())
 		except NoSuchElementException:
 			return None
 	
 	def GetElementsText(self, selector: str, byType: By = By.CSS_SELECTOR) -> List[str]:
 		"""获取多个元素的文本内容"""
 		try:
-			elements = self.driver.find_elements(byType, selector)
+			elements = self.driver.find_elements(*ResolveLocator(byType, selector))
 			return [element.text.strip() for element in elements if element.text.strip()]
 		except NoSuchElementException:
 			return []
@@ -41,186 +183,314 @@ class PageReader:
 	def GetElementAttribute(self, selector: str, attribute: str, byType: By = By.CSS_SELECTOR) -> Optional[str]:
 		"""获取元素属性值"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			return element.get_attribute(attribute)
+			return self.elements.Use(byType, selector, lambda element: element.get_attribute(attribute))
 		except NoSuchElementException:
 			return None
 	
-	def GetAllLinks(self) -> List[Dict[str, str]]:
-		"""获取页面所有链接"""
+	def GetAllLinks(self, limit: int = 0, offset: int = 0, pattern: Optional[str] = None) -> List[Dict[str, str]]:
+		"""获取页面所有链接，limit/offset/pattern(href正则)均在页面内处理"""
 		links = []
 		try:
-			elements = self.driver.find_elements(By.TAG_NAME, "a")
-			for element in elements:
-				href = element.get_attribute("href")
-				text = element.text.strip()
-				if href:
-					links.append({
-						"text": text,
-						"href": href
-					})
+			links = self.__cachedRead("links", CACHED_LINKS_SCRIPT, (offset, limit, pattern), lambda rows: [
+				{"text": text, "href": href}
+				for text, href in rows or []
+			])
 		except Exception as e:
-			print(f"获取链接失败: {e}")
+			logger.warning(f"获取链接失败: {e}")
 		return links
 	
-	def GetAllImages(self) -> List[Dict[str, str]]:
-		"""获取页面所有图片"""
+	def GetAllImages(self, limit: int = 0, offset: int = 0, pattern: Optional[str] = None) -> List[Dict[str, str]]:
+		"""获取页面所有图片，limit/offset/pattern(src正则)均在页面内处理"""
 		images = []
 		try:
-			elements = self.driver.find_elements(By.TAG_NAME, "img")
-			for element in elements:
-				src = element.get_attribute("src")
-				alt = element.get_attribute("alt") or ""
-				if src:
-					images.append({
-						"alt": alt,
-						"src": src
-					})
+			images = self.__cachedRead("images", CACHED_IMAGES_SCRIPT, (offset, limit, pattern), lambda rows: [
+				{"alt": alt, "src": src}
+				for alt, src in rows or []
+			])
 		except Exception as e:
-			print(f"获取图片失败: {e}")
+			logger.warning(f"获取图片失败: {e}")
 		return images
 	
-	def GetTableData(self, selector: str, byType: By = By.CSS_SELECTOR) -> List[List[str]]:
-		"""获取表格数据"""
+	def ReadTable(self, selector: str, byType: By = By.CSS_SELECTOR, rowOffset: int = 0, rowLimit: int = 0, columns: Optional[List[Any]] = None, detectHeader: bool = True, expandSpans: bool = True) -> Optional[Dict[str, Any]]:
+		"""在页面内一次性读取表格，支持表头识别、合并单元格展开、分页和列投影"""
 		try:
-			table = self.driver.find_element(byType, selector)
-			rows = table.find_elements(By.TAG_NAME, "tr")
-			tableData = []
-			
-			for row in rows:
-				cells = row.find_elements(By.TAG_NAME, "td")
-				if not cells:  # 如果没有td，尝试th
-					cells = row.find_elements(By.TAG_NAME, "th")
-				
-				if cells:
-					rowData = [cell.text.strip() for cell in cells]
-					tableData.append(rowData)
-			
-			return tableData
+			return self.elements.Use(byType, selector, lambda table: self.__readTable(table, rowOffset, rowLimit, columns, detectHeader, expandSpans))
 		except NoSuchElementException:
-			return []
+			return None
+	
+	def __readTable(self, table, rowOffset: int, rowLimit: int, columns: Optional[List[Any]], detectHeader: bool, expandSpans: bool) -> Dict[str, Any]:
+		"""对已定位的表格元素执行读取脚本"""
+		return self.driver.execute_script(READ_TABLE_SCRIPT, table, rowOffset, rowLimit, columns or [], detectHeader, expandSpans)
 	
-	def GetFormData(self, selector: str, byType: By = By.CSS_SELECTOR) -> Dict[str, Any]:
-		"""获取表单数据"""
-		formData = {}
+	def GetTableData(self, selector: str, byType: By = By.CSS_SELECTOR, rowOffset: int = 0, rowLimit: int = 0, columns: Optional[List[Any]] = None, expandSpans: bool = False) -> List[List[str]]:
+		"""获取表格数据"""
+		table = self.ReadTable(selector, byType, rowOffset, rowLimit, columns, False, expandSpans)
+		return table["rows"] if table else []
+	
+	def ExportTable(self, selector: str, filePath: str, byType: By = By.CSS_SELECTOR, fileFormat: str = "csv", columns: Optional[List[Any]] = None, detectHeader: bool = True, expandSpans: bool = True, chunkSize: int = 2000) -> Optional[Dict[str, Any]]:
+		"""分批读取表格并流式写入CSV/JSONL文件"""
 		try:
-			form = self.driver.find_element(byType, selector)
-			
-			inputs = form.find_elements(By.TAG_NAME, "input")
-			for input_elem in inputs:
-				name = input_elem.get_attribute("name")
-				value = input_elem.get_attribute("value")
-				inputType = input_elem.get_attribute("type")
-				
-				if name:
-					if inputType in ["checkbox", "radio"]:
-						formData[name] = input_elem.is_selected()
-					else:
-						formData[name] = value or ""
-			
-			selects = form.find_elements(By.TAG_NAME, "select")
-			for select in selects:
-				name = select.get_attribute("name")
-				if name:
-					selectedOptions = select.find_elements(By.CSS_SELECTOR, "option:checked")
-					if selectedOptions:
-						formData[name] = [option.get_attribute("value") for option in selectedOptions]
+			table = self.elements.Find(byType, selector)
+		except NoSuchElementException:
+			return None
+		rowsWritten = 0
+		headers = None
+		with open(filePath, "w", encoding="utf-8", newline="") as f:
+			writer = csv.writer(f) if fileFormat == "csv" else None
+			rowOffset = 0
+			while True:
+				chunk = self.__readTable(table, rowOffset, chunkSize, columns, detectHeader, expandSpans)
+				if rowOffset == 0:
+					headers = chunk.get("headers")
+					if writer and headers:
+						writer.writerow(headers)
+				for row in chunk["rows"]:
+					if writer:
+						writer.writerow(row)
 					else:
-						formData[name] = []
-			
-			textareas = form.find_elements(By.TAG_NAME, "textarea")
-			for textarea in textareas:
-				name = textarea.get_attribute("name")
-				if name:
-					formData[name] = textarea.text
-					
+						record = dict(zip(headers, row)) if headers else row
+						f.write(json.dumps(record, ensure_ascii=False) + "\n")
+				rowsWritten += len(chunk["rows"])
+				rowOffset += chunkSize
+				if not chunk["rows"] or rowOffset >= chunk["total_rows"]:
+					break
+		return {
+			"path": filePath,
+			"format": fileFormat,
+			"headers": headers,
+			"rows": rowsWritten
+		}
+	
+	def GetFormData(self, selector: str, byType: By = By.CSS_SELECTOR, detailed: bool = False) -> Any:
+		"""获取表单数据；detailed为True时返回每个控件的类型、值、选中与禁用状态及选项列表"""
+		try:
+			formData = self.elements.Use(byType, selector, lambda form: self.driver.execute_script(READ_FORM_SCRIPT, form, detailed))
 		except NoSuchElementException:
-			pass
-		
-		return formData
+			formData = None
+		return formData or ([] if detailed else {})
 	
 	def GetMetaTags(self) -> Dict[str, str]:
 		"""获取页面meta标签信息"""
 		metaData = {}
 		try:
-			metaTags = self.driver.find_elements(By.TAG_NAME, "meta")
-			for meta in metaTags:
-				name = meta.get_attribute("name") or meta.get_attribute("property")
-				content = meta.get_attribute("content")
-				if name and content:
-					metaData[name] = content
+			metaData = self.__cachedRead("meta", CACHED_META_SCRIPT, (), lambda meta: meta or {})
 		except Exception as e:
-			print(f"获取meta标签失败: {e}")
+			logger.warning(f"获取meta标签失败: {e}")
 		
 		return metaData
 	
+	def __loadTextDocument(self) -> Dict[str, Any]:
+		"""获取整页文本与标题大纲，同一文档代数内只从浏览器提取一次"""
+		document = self.__textDocument
+		known = (document["token"], document["generation"]) if document else (None, None)
+		token, generation, url, text, headings = self.__evaluate(PAGE_TEXT_SCRIPT, *known)
+		self.__observe(token, generation, url)
+		if text is None and document:
+			return document
+		self.__textDocument = {
+			"token": token,
+			"generation": generation,
+			"url": url,
+			"raw": text or "",
+			"headings": headings or [],
+			"variants": {}
+		}
+		return self.__textDocument
+	
+	def __textVariant(self, document: Dict[str, Any], removeEmpty: bool) -> Dict[str, Any]:
+		"""按是否去除空行生成文本及各标题所在偏移，结果随文档缓存"""
+		variant = document["variants"].get(removeEmpty)
+		if variant is not None:
+			return variant
+		text = document["raw"]
+		if removeEmpty:
+			text = '\n'.join(line.strip() for line in text.split('\n') if line.strip())
+		sections = []
+		position = 0
+		for level, title in document["headings"]:
+			title = title.split('\n')[0].strip()
+			index = text.find(title, position)
+			if index < 0:
+				continue
+			sections.append({"index": len(sections), "level": level, "title": title, "offset": index})
+			position = index + len(title)
+		variant = {"text": text, "sections": sections}
+		document["variants"][removeEmpty] = variant
+		return variant
+	
+	@staticmethod
+	def __pageEnd(text: str, sections: List[Dict[str, Any]], offset: int, maxChars: int) -> int:
+		"""计算分页结束位置，优先在后半页内的标题处断开，其次在换行处断开"""
+		if maxChars <= 0 or offset + maxChars >= len(text):
+			return len(text)
+		limit = offset + maxChars
+		floor = offset + maxChars // 2
+		boundaries = [section["offset"] for section in sections if floor < section["offset"] <= limit]
+		if boundaries:
+			return boundaries[-1]
+		newline = text.rfind('\n', floor, limit)
+		return newline + 1 if newline >= 0 else limit
+	
 	def GetPageText(self, removeEmpty: bool = True) -> str:
 		"""获取页面所有文本内容"""
-		try:
-			bodyText = self.driver.find_element(By.TAG_NAME, "body").text
-			if removeEmpty:
-				lines = [line.strip() for line in bodyText.split('\n') if line.strip()]
-				return '\n'.join(lines)
-			return bodyText
-		except NoSuchElementException:
-			return ""
+		return self.__textVariant(self.__loadTextDocument(), removeEmpty)["text"]
+	
+	def GetPageTextPage(self, maxChars: int = 0, cursor: Optional[str] = None, section: Optional[int] = None, removeEmpty: bool = True) -> Dict[str, Any]:
+		"""分页获取页面文本；游标指向已提取的文本快照，后续分页直接从内存返回而不访问浏览器"""
+		if cursor:
+			try:
+				token, generation, mode, offset = cursor.rsplit('.', 3)
+				generation, offset = int(generation), int(offset)
+			except ValueError:
+				raise ValueError(f"invalid cursor: {cursor}")
+			document = self.__textDocument
+			if not document or document["token"] != token or document["generation"] != generation:
+				raise ValueError("cursor expired: page changed since the cursor was issued, request again without cursor")
+			removeEmpty = mode == "1"
+		else:
+			document = self.__loadTextDocument()
+			offset = 0
+		variant = self.__textVariant(document, removeEmpty)
+		text, sections = variant["text"], variant["sections"]
+		if section is not None:
+			if not 0 <= section < len(sections):
+				raise ValueError(f"section index out of range: {section} (page has {len(sections)} sections)")
+			offset = sections[section]["offset"]
+		offset = max(0, min(offset, len(text)))
+		end = self.__pageEnd(text, sections, offset, maxChars)
+		page = {
+			"text": text[offset:end],
+			"offset": offset,
+			"end": end,
+			"total_chars": len(text),
+			"next_cursor": f"{document['token']}.{document['generation']}.{int(removeEmpty)}.{end}" if end < len(text) else None,
+			"url": document["url"],
+			"generation": document["generation"],
+			"sections": [item for item in sections if offset <= item["offset"] < end]
+		}
+		if not cursor:
+			page["outline"] = sections
+		return page
 	
-	def SearchTextInPage(self, searchText: str, caseSensitive: bool = False) -> List[Dict[str, Any]]:
-		"""在页面中搜索文本"""
-		results = []
+	def SearchTextInPage(self, searchText: str, caseSensitive: bool = False, regex: bool = False, limit: int = 100, contextChars: int = 40) -> List[Dict[str, Any]]:
+		"""在页面中搜索文本，支持大小写敏感、正则、结果数量限制和上下文片段"""
 		try:
-			pageText = self.GetPageText()
-			pattern = searchText if caseSensitive else searchText.lower()
-			targetText = pageText if caseSensitive else pageText.lower()
-			
-			if pattern in targetText:
-				# 使用XPath查找包含文本的元素
-				xpath = f"//*[contains(text(), '{searchText}')]"
-				elements = self.driver.find_elements(By.XPATH, xpath)
-				
-				for element in elements:
-					results.append({
-						"tag": element.tag_name,
-						"text": element.text.strip(),
-						"location": element.location
-					})
+			return self.SearchText(searchText, caseSensitive, regex, limit, contextChars)["matches"]
 		except Exception as e:
-			print(f"搜索文本失败: {e}")
-		
-		return results
+			logger.warning(f"搜索文本失败: {e}")
+			return []
+	
+	def SearchText(self, searchText: str, caseSensitive: bool = False, regex: bool = False, limit: int = 100, contextChars: int = 40) -> Dict[str, Any]:
+		"""基于页面内文本节点索引搜索，返回匹配列表及总数；索引在DOM变化前可重复使用"""
+		return self.__cachedRead("search", CACHED_SEARCH_TEXT_SCRIPT, (searchText, caseSensitive, regex, limit, contextChars))
 	
-	def WaitForTextToAppear(self, text: str, timeout: int = 10) -> bool:
-		"""等待指定文本出现在页面中"""
+	def WaitForTextToAppear(self, text: str, timeout: int = 10, selector: Optional[str] = None, byType: By = By.CSS_SELECTOR) -> bool:
+		"""等待指定文本出现在页面（或指定元素）中"""
 		try:
-			WebDriverWait(self.driver, timeout).until(
-				lambda driver: text in driver.page_source
-			)
-			return True
-		except TimeoutException:
+			return self.waiter.WaitFor("text", selector, byType, timeout, text=text) is not None
+		except Exception as e:
+			logger.warning(f"等待文本失败: {e}")
 			return False
 	
 	def GetPageInfo(self) -> Dict[str, Any]:
-		"""获取页面完整信息"""
-		return {
-			"title": self.GetPageTitle(),
-			"url": self.GetPageUrl(),
-			"meta": self.GetMetaTags(),
-			"links_count": len(self.GetAllLinks()),
-			"images_count": len(self.GetAllImages()),
-			"text_length": len(self.GetPageText())
-		}
+		"""获取页面完整信息，计数与文本长度均在页面内一次计算"""
+		return self.__cachedRead("info", CACHED_SUMMARY_SCRIPT)
+	
+	def GetInteractiveElements(self, scope: str = "viewport", limit: int = 200, maxName: int = 80, includeHidden: bool = False) -> Dict[str, Any]:
+		"""获取可交互元素大纲，每个元素的id可配合定位方式ref直接用于元素操作"""
+		if scope not in ("viewport", "page"):
+			raise ValueError(f"unsupported scope: {scope} (expected viewport or page)")
+		return self.__evaluate(INTERACTIVE_OUTLINE_SCRIPT, scope, limit, maxName, includeHidden)
+	
+	@staticmethod
+	def FormatInteractiveElements(outline: Dict[str, Any]) -> str:
+		"""将可交互元素大纲格式化为每行一个元素的紧凑文本"""
+		lines = [f"# {outline['url']} | {len(outline['elements'])} of {outline['total']} interactive elements ({outline['scope']}) | use the id as selector with by_type=\"ref\""]
+		for item in outline["elements"]:
+			x, y, width, height = item["box"]
+			line = f"[{item['id']}] {item['role']} {json.dumps(item['name'], ensure_ascii=False)} @{x},{y} {width}x{height}"
+			if item.get("disabled"):
+				line += " disabled"
+			if "checked" in item:
+				line += " checked" if item["checked"] else " unchecked"
+			if item.get("value"):
+				line += f" value={json.dumps(item['value'], ensure_ascii=False)}"
+			if not item["visible"]:
+				line += " hidden"
+			elif not item["in_viewport"]:
+				line += " offscreen"
+			if item.get("href"):
+				line += f" -> {item['href']}"
+			lines.append(line)
+		return "\n".join(lines)
+	
+	def GetPageChanges(self, limit: int = 200, maxText: int = 200, reset: bool = False) -> Dict[str, Any]:
+		"""获取自上次调用以来新增、删除和修改的文本元素；首次调用或导航后只建立基线"""
+		return self.__evaluate(PAGE_CHANGES_SCRIPT, limit, maxText, reset)
 		
+	def __cdpCommand(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+		"""执行DevTools命令，优先使用直连客户端，其次使用ChromeDriver转发"""
+		cdp = self.__getCdp()
+		if cdp is not None:
+			try:
+				return cdp.Call(method, params)
+			except CdpError:
+				pass
+		if hasattr(self.driver, "execute_cdp_cmd"):
+			try:
+				return self.driver.execute_cdp_cmd(method, params)
+			except WebDriverException as e:
+				raise CdpError(f"DevTools command failed: {e.msg or e}")
+		raise CdpError("DevTools is not available for this session")
+	
+	def GetNavigationMetrics(self, topResources: int = 5) -> Dict[str, Any]:
+		"""读取最近一次导航的Navigation Timing、绘制时间与资源汇总，并附带浏览器性能计数器"""
+		metrics = self.__evaluate(NAVIGATION_METRICS_SCRIPT, topResources)
+		try:
+			self.__cdpCommand("Performance.enable", {})
+			counters = {item["name"]: item["value"] for item in self.__cdpCommand("Performance.getMetrics", {}).get("metrics", [])}
+			metrics["counters"] = {name: counters[name] for name in PERFORMANCE_COUNTERS if name in counters}
+		except CdpError:
+			metrics["counters"] = None
+		return metrics
+	
+	def CaptureScreenshot(self, mode: str = "viewport", selector: Optional[str] = None, byType: By = By.CSS_SELECTOR, region: Optional[List[float]] = None) -> Tuple[bytes, Optional[Tuple[int, int, int, int]]]:
+		"""截取PNG画面，返回 (PNG数据, 需在后处理中裁剪的像素区域)；整页与区域截图通过DevTools完成，区域截图不可用时回退为视口截图加裁剪"""
+		if mode == "viewport":
+			return self.driver.get_screenshot_as_png(), None
+		if mode == "element":
+			if not selector:
+				raise ValueError("element screenshot requires a selector")
+			return self.elements.Use(byType, selector, lambda element: element.screenshot_as_png), None
+		if mode == "full":
+			metrics = self.__cdpCommand("Page.getLayoutMetrics", {})
+			size = metrics.get("cssContentSize") or metrics["contentSize"]
+			clip = {"x": 0, "y": 0, "width": size["width"], "height": size["height"], "scale": 1}
+			data = self.__cdpCommand("Page.captureScreenshot", {"format": "png", "captureBeyondViewport": True, "clip": clip})["data"]
+			return base64.b64decode(data), None
+		if mode == "region":
+			if not region or len(region) != 4 or region[2] <= 0 or region[3] <= 0:
+				raise ValueError("region screenshot requires [x, y, width, height] in page coordinates")
+			x, y, width, height = region
+			try:
+				clip = {"x": x, "y": y, "width": width, "height": height, "scale": 1}
+				data = self.__cdpCommand("Page.captureScreenshot", {"format": "png", "captureBeyondViewport": True, "clip": clip})["data"]
+				return base64.b64decode(data), None
+			except CdpError:
+				scrollX, scrollY, ratio = self.driver.execute_script("return [window.scrollX, window.scrollY, window.devicePixelRatio || 1];")
+				crop = (round((x - scrollX) * ratio), round((y - scrollY) * ratio), round(width * ratio), round(height * ratio))
+				return self.driver.get_screenshot_as_png(), crop
+		raise ValueError(f"unsupported screenshot mode: {mode} (expected viewport, full, element or region)")
+	
 	def GetElementCenter(self, selector: str, byType: By = By.CSS_SELECTOR) -> Optional[Tuple[int, int]]:
 		"""获取元素中心坐标"""
 		try:
-			element = self.driver.find_element(byType, selector)
-			# 获取元素位置和大小
-			location = element.location
-			size = element.size
+			# 一次请求同时获取元素位置和大小
+			rect = self.elements.Use(byType, selector, lambda element: element.rect)
 			
 			# 计算中心坐标
-			center_x = location['x'] + size['width'] // 2
-			center_y = location['y'] + size['height'] // 2
+			center_x = int(rect['x']) + int(rect['width']) // 2
+			center_y = int(rect['y']) + int(rect['height']) // 2
 			
 			return (center_x, center_y)
 		except NoSuchElementException:
@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+import json
+import os
+import threading
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+try:
+	import msvcrt
+except ImportError:
+	msvcrt = None
+
+class SessionRegistry:
+	"""跨进程共享的浏览器会话登记表，记录驱动PID、端口、WebDriver会话ID与调试地址"""
+	def __init__(self, path: str):
+		self.path = path
+		self.lockPath = path + ".lock"
+		self.__lock = threading.Lock()
+
+	@contextmanager
+	def __fileLock(self):
+		"""进程内与进程间互斥访问登记表文件"""
+		with self.__lock:
+			directory = os.path.dirname(self.path)
+			if directory and not os.path.exists(directory):
+				os.makedirs(directory, exist_ok=True)
+			with open(self.lockPath, "a+b") as lockFile:
+				if fcntl:
+					fcntl.flock(lockFile.fileno(), fcntl.LOCK_EX)
+				elif msvcrt:
+					lockFile.seek(0)
+					msvcrt.locking(lockFile.fileno(), msvcrt.LK_LOCK, 1)
+				try:
+					yield
+				finally:
+					if fcntl:
+						fcntl.flock(lockFile.fileno(), fcntl.LOCK_UN)
+					elif msvcrt:
+						lockFile.seek(0)
+						msvcrt.locking(lockFile.fileno(), msvcrt.LK_UNLCK, 1)
+
+	def __read(self) -> Dict[str, dict]:
+		"""读取登记表，文件不存在或损坏时视为空"""
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				records = json.load(f)
+			return records if isinstance(records, dict) else {}
+		except (OSError, ValueError):
+			return {}
+
+	def __write(self, records: Dict[str, dict]) -> None:
+		"""原子写入登记表"""
+		tempPath = f"{self.path}.{os.getpid()}.tmp"
+		with open(tempPath, "w", encoding="utf-8") as f:
+			json.dump(records, f, ensure_ascii=False, indent=2)
+		os.replace(tempPath, self.path)
+
+	def __update(self, mutate: Callable[[Dict[str, dict]], None]) -> None:
+		"""在锁内读取、修改并写回登记表"""
+		with self.__fileLock():
+			records = self.__read()
+			mutate(records)
+			self.__write(records)
+
+	def Get(self, sessionId: str) -> Optional[dict]:
+		"""获取会话记录"""
+		with self.__fileLock():
+			return self.__read().get(sessionId)
+
+	def All(self) -> Dict[str, dict]:
+		"""获取全部会话记录"""
+		with self.__fileLock():
+			return self.__read()
+
+	def Put(self, sessionId: str, record: dict) -> None:
+		"""写入会话记录"""
+		self.__update(lambda records: records.__setitem__(sessionId, record))
+
+	def Remove(self, sessionId: str) -> None:
+		"""删除会话记录"""
+		self.__update(lambda records: records.pop(sessionId, None))
@@ -0,0 +1,160 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+from Lib.artifacts import ArtifactStore
+import hashlib
+import io
+import math
+import threading
+
+try:
+	from PIL import Image
+except ImportError:
+	Image = None
+
+IMAGE_FORMATS = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP"}
+
+# 32点DCT中前8个频率的余弦系数表
+_DCT_SIZE = 32
+_DCT_KEEP = 8
+_DCT_TABLE = [
+	[math.cos((2 * x + 1) * u * math.pi / (2 * _DCT_SIZE)) for x in range(_DCT_SIZE)]
+	for u in range(_DCT_KEEP)
+]
+
+def PerceptualHash(pixels: Sequence[float]) -> int:
+	"""对32x32灰度像素计算64位pHash：取二维DCT左上8x8低频系数（不含直流分量）与中位数比较"""
+	rows = []
+	for y in range(_DCT_SIZE):
+		row = pixels[y * _DCT_SIZE:(y + 1) * _DCT_SIZE]
+		rows.append([sum(table[x] * row[x] for x in range(_DCT_SIZE)) for table in _DCT_TABLE])
+	coefficients = []
+	for v in range(_DCT_KEEP):
+		table = _DCT_TABLE[v]
+		for u in range(_DCT_KEEP):
+			coefficients.append(sum(table[y] * rows[y][u] for y in range(_DCT_SIZE)))
+	median = sorted(coefficients[1:])[len(coefficients[1:]) // 2]
+	value = 0
+	for coefficient in coefficients:
+		value = (value << 1) | (1 if coefficient > median else 0)
+	return value
+
+def HammingDistance(first: int, second: int) -> int:
+	"""计算两个哈希的汉明距离"""
+	return bin(first ^ second).count("1")
+
+class ScreenshotPipeline:
+	"""截图后处理：在独立线程池中裁剪、缩放和编码，跳过与上一帧相同的画面，结果写入产物目录
+
+	threshold为0时按像素内容的哈希精确比较，任何像素变化都会保存新帧；大于0时改用感知哈希，
+	汉明距离不超过threshold的画面视为未变化（可忽略抗锯齿、光标闪烁等细微差异，但也可能漏掉小的改动）"""
+	def __init__(self, artifacts: ArtifactStore, workers: int = 2, threshold: int = 0):
+		self.artifacts = artifacts
+		self.threshold = threshold
+		self.__pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="selenium-screenshot")
+		self.__lock = threading.Lock()
+		self.__previous: Dict[str, Tuple[Any, Tuple[Any, ...], Dict[str, Any]]] = {}
+		self.__captured = 0
+		self.__skipped = 0
+
+	@staticmethod
+	def IsImagingAvailable() -> bool:
+		"""是否安装了Pillow"""
+		return Image is not None
+
+	def Submit(self, key: str, png: bytes, imageFormat: str = "png", quality: int = 80, maxWidth: int = 0, crop: Optional[Tuple[int, int, int, int]] = None, skipUnchanged: bool = True, threshold: Optional[int] = None) -> Future:
+		"""提交截图处理任务，key用于区分比较基准（如会话与截图模式）"""
+		return self.__pool.submit(self.Process, key, png, imageFormat, quality, maxWidth, crop, skipUnchanged, threshold)
+
+	def Process(self, key: str, png: bytes, imageFormat: str = "png", quality: int = 80, maxWidth: int = 0, crop: Optional[Tuple[int, int, int, int]] = None, skipUnchanged: bool = True, threshold: Optional[int] = None) -> Dict[str, Any]:
+		"""裁剪、计算指纹、缩放并编码截图，threshold为None时使用流水线的默认阈值"""
+		imageFormat = imageFormat.lower()
+		if imageFormat not in IMAGE_FORMATS:
+			raise ValueError(f"unsupported image format: {imageFormat} (expected png, jpeg or webp)")
+		threshold = self.threshold if threshold is None else threshold
+		if Image is None:
+			if imageFormat != "png" or maxWidth or crop or threshold > 0:
+				raise ValueError("Pillow is not installed: downscaling, cropping, jpeg/webp output and similarity thresholds are unavailable (pip install -r requirements.txt)")
+			return self.__finish(key, png, hashlib.sha256(png).hexdigest(), 0, skipUnchanged, "png", None, 0)
+		image = Image.open(io.BytesIO(png))
+		image.load()
+		if crop:
+			left, top, width, height = crop
+			image = image.crop((left, top, left + width, top + height))
+		if threshold > 0:
+			gray = image.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.BILINEAR)
+			fingerprint = PerceptualHash(list(gray.getdata()))
+		else:
+			fingerprint = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode() + image.tobytes()).hexdigest()
+		if maxWidth and image.width > maxWidth:
+			height = max(1, round(image.height * maxWidth / image.width))
+			image = image.resize((maxWidth, height), Image.LANCZOS)
+		return self.__finish(key, image, fingerprint, threshold, skipUnchanged, imageFormat, quality, maxWidth)
+
+	def __finish(self, key: str, image: Any, fingerprint: Any, threshold: int, skipUnchanged: bool, imageFormat: str, quality: Optional[int], maxWidth: int) -> Dict[str, Any]:
+		"""与上一帧比较，画面与输出参数都未变化时跳过编码，否则编码并写入产物目录；感知哈希为整数，精确哈希为十六进制字符串。
+		画面相同但格式、质量或缩放宽度不同时仍重新编码，上一帧的产物不能代替所请求的输出"""
+		output = (IMAGE_FORMATS[imageFormat], quality if IMAGE_FORMATS[imageFormat] in ("JPEG", "WEBP") else None, maxWidth)
+		with self.__lock:
+			previous = self.__previous.get(key)
+		distance = None
+		if previous is not None:
+			if isinstance(fingerprint, int) and isinstance(previous[0], int):
+				distance = HammingDistance(previous[0], fingerprint)
+			else:
+				distance = 0 if previous[0] == fingerprint else None
+		if skipUnchanged and previous is not None and distance is not None and distance <= threshold and previous[1] == output:
+			with self.__lock:
+				self.__skipped += 1
+			result = dict(previous[2])
+			result.update({"unchanged": True, "distance": distance})
+			return result
+		data = image if isinstance(image, bytes) else self.__encode(image, imageFormat, quality)
+		extension = "jpg" if imageFormat == "jpeg" else imageFormat
+		artifact = self.artifacts.Write("screenshot", [data], extension=extension, compression="none")
+		result = {
+			"id": artifact["id"],
+			"path": artifact["path"],
+			"bytes": artifact["bytes"],
+			"format": extension,
+			"width": None if isinstance(image, bytes) else image.width,
+			"height": None if isinstance(image, bytes) else image.height,
+			"fingerprint": f"{fingerprint:016x}" if isinstance(fingerprint, int) else fingerprint
+		}
+		with self.__lock:
+			self.__captured += 1
+			self.__previous[key] = (fingerprint, output, result)
+		result = dict(result)
+		result.update({"unchanged": False, "distance": distance})
+		return result
+
+	@staticmethod
+	def __encode(image: Any, imageFormat: str, quality: Optional[int]) -> bytes:
+		"""按格式编码图片"""
+		buffer = io.BytesIO()
+		target = IMAGE_FORMATS[imageFormat]
+		if target == "JPEG" and image.mode not in ("RGB", "L"):
+			image = image.convert("RGB")
+		options: Dict[str, Any] = {"quality": quality} if target in ("JPEG", "WEBP") else {"compress_level": 3}
+		image.save(buffer, format=target, **options)
+		return buffer.getvalue()
+
+	def Forget(self, prefix: str) -> None:
+		"""清除指定前缀（如会话ID）的比较基准"""
+		with self.__lock:
+			for key in [key for key in self.__previous if key.startswith(prefix)]:
+				self.__previous.pop(key, None)
+
+	def GetStats(self) -> Dict[str, Any]:
+		"""获取截图统计"""
+		with self.__lock:
+			return {
+				"captured": self.__captured,
+				"skipped_unchanged": self.__skipped,
+				"baselines": len(self.__previous),
+				"threshold": self.threshold,
+				"pillow": Image is not None
+			}
+
+	def Shutdown(self) -> None:
+		"""关闭线程池"""
+		self.__pool.shutdown(wait=False)
@@ -0,0 +1,768 @@
+# 在页面内执行的脚本，用一次execute_script完成原本需要大量WebDriver往返的读取
+
+# 参数: offset, limit, hrefPattern；返回 [[text, href], ...]
+COLLECT_LINKS_SCRIPT = """
+var offset = arguments[0] || 0, limit = arguments[1] || 0;
+var pattern = arguments[2] ? new RegExp(arguments[2]) : null;
+var anchors = document.getElementsByTagName('a'), out = [], matched = 0;
+for (var i = 0; i < anchors.length; i++) {
+	var a = anchors[i];
+	var href = typeof a.href === 'string' ? a.href : a.getAttribute('href');
+	if (!href || (pattern && !pattern.test(href))) continue;
+	if (matched++ < offset) continue;
+	var text = a.getClientRects().length ? (a.innerText || '').trim() : '';
+	out.push([text, href]);
+	if (limit && out.length >= limit) break;
+}
+return out;
+"""
+
+# 参数: offset, limit, srcPattern；返回 [[alt, src], ...]
+COLLECT_IMAGES_SCRIPT = """
+var offset = arguments[0] || 0, limit = arguments[1] || 0;
+var pattern = arguments[2] ? new RegExp(arguments[2]) : null;
+var images = document.getElementsByTagName('img'), out = [], matched = 0;
+for (var i = 0; i < images.length; i++) {
+	var img = images[i];
+	var src = img.src || img.getAttribute('src');
+	if (!src || (pattern && !pattern.test(src))) continue;
+	if (matched++ < offset) continue;
+	out.push([img.getAttribute('alt') || '', src]);
+	if (limit && out.length >= limit) break;
+}
+return out;
+"""
+
+# 参数: table元素, rowOffset, rowLimit, columns(索引或表头名), detectHeader, expandSpans
+# 返回 {headers, rows, total_rows, column_count}
+READ_TABLE_SCRIPT = """
+var table = arguments[0], rowOffset = arguments[1] || 0, rowLimit = arguments[2] || 0;
+var columns = arguments[3] || [], detectHeader = arguments[4], expandSpans = arguments[5];
+var trs = table.rows ? Array.prototype.slice.call(table.rows) : Array.prototype.slice.call(table.querySelectorAll('tr'));
+var textCache = typeof Map !== 'undefined' ? new Map() : null;
+function cellText(cell) {
+	if (!cell) return '';
+	if (textCache && textCache.has(cell)) return textCache.get(cell);
+	var text = (cell.innerText || '').trim();
+	if (textCache) textCache.set(cell, text);
+	return text;
+}
+function directCells(tr, tag) {
+	var out = [];
+	for (var i = 0; i < tr.cells.length; i++) {
+		if (!tag || tr.cells[i].tagName === tag) out.push(tr.cells[i]);
+	}
+	return out;
+}
+var grid = [], carry = [], columnCount = 0;
+for (var r = 0; r < trs.length; r++) {
+	var tr = trs[r], row = [];
+	if (!expandSpans) {
+		var cells = directCells(tr, 'TD');
+		if (!cells.length) cells = directCells(tr, 'TH');
+		row = cells;
+	} else {
+		var col = 0, cells = directCells(tr, null);
+		for (var c = 0; c < cells.length || (carry[col] && carry[col].left > 0); ) {
+			if (carry[col] && carry[col].left > 0) {
+				row[col] = carry[col].cell;
+				carry[col].left--;
+				col++;
+				continue;
+			}
+			if (c >= cells.length) break;
+			var cell = cells[c++], colspan = Math.max(1, cell.colSpan || 1), rowspan = cell.rowSpan;
+			if (rowspan === 0) rowspan = trs.length - r;
+			rowspan = Math.max(1, rowspan || 1);
+			for (var k = 0; k < colspan; k++) {
+				row[col] = cell;
+				if (rowspan > 1) carry[col] = {cell: cell, left: rowspan - 1};
+				col++;
+			}
+		}
+	}
+	if (!row.length) continue;
+	columnCount = Math.max(columnCount, row.length);
+	grid.push({tr: tr, cells: row});
+}
+var headers = null;
+if (detectHeader && grid.length) {
+	var headerIndex = -1;
+	for (var h = 0; h < grid.length; h++) {
+		var parent = grid[h].tr.parentNode;
+		if (parent && parent.tagName === 'THEAD') { headerIndex = h; break; }
+	}
+	if (headerIndex < 0) {
+		var first = grid[0].cells, allTh = first.length > 0;
+		for (var t = 0; t < first.length; t++) {
+			if (!first[t] || first[t].tagName !== 'TH') { allTh = false; break; }
+		}
+		if (allTh) headerIndex = 0;
+	}
+	if (headerIndex >= 0) {
+		headers = [];
+		for (var x = 0; x < grid[headerIndex].cells.length; x++) headers.push(cellText(grid[headerIndex].cells[x]));
+		grid.splice(headerIndex, 1);
+	}
+}
+var projection = null;
+if (columns.length) {
+	projection = [];
+	for (var p = 0; p < columns.length; p++) {
+		var index = typeof columns[p] === 'number' ? columns[p] : (headers ? headers.indexOf(columns[p]) : -1);
+		projection.push(index);
+	}
+	if (headers) headers = projection.map(function(index) { return index >= 0 ? headers[index] || '' : ''; });
+}
+var end = rowLimit ? Math.min(grid.length, rowOffset + rowLimit) : grid.length, rows = [];
+for (var i = rowOffset; i < end; i++) {
+	var cells = grid[i].cells, out = [];
+	if (projection) {
+		for (var j = 0; j < projection.length; j++) out.push(projection[j] >= 0 ? cellText(cells[projection[j]]) : '');
+	} else {
+		for (var j = 0; j < cells.length; j++) out.push(cellText(cells[j]));
+	}
+	rows.push(out);
+}
+return {headers: headers, rows: rows, total_rows: grid.length, column_count: columnCount};
+"""
+
+# 参数: form元素, detailed；返回 {name: value} 或 detailed时的控件列表
+READ_FORM_SCRIPT = """
+var form = arguments[0], detailed = arguments[1];
+var controls = form.querySelectorAll('input, select, textarea');
+if (detailed) {
+	var fields = [];
+	for (var i = 0; i < controls.length; i++) {
+		var el = controls[i], tag = el.tagName.toLowerCase();
+		if (!el.name) continue;
+		var field = {
+			name: el.name,
+			tag: tag,
+			type: tag === 'input' ? (el.type || 'text') : tag,
+			value: tag === 'select' ? null : el.value,
+			disabled: !!el.disabled
+		};
+		if (tag === 'input' && (el.type === 'checkbox' || el.type === 'radio')) field.checked = !!el.checked;
+		if (tag === 'select') {
+			field.multiple = !!el.multiple;
+			field.options = [];
+			field.value = [];
+			for (var o = 0; o < el.options.length; o++) {
+				var option = el.options[o];
+				field.options.push({value: option.value, text: option.text, selected: option.selected, disabled: !!option.disabled});
+				if (option.selected) field.value.push(option.value);
+			}
+		}
+		fields.push(field);
+	}
+	return fields;
+}
+var checkboxCount = {};
+for (var i = 0; i < controls.length; i++) {
+	var el = controls[i];
+	if (el.name && el.tagName === 'INPUT' && el.type === 'checkbox') checkboxCount[el.name] = (checkboxCount[el.name] || 0) + 1;
+}
+var data = {};
+for (var i = 0; i < controls.length; i++) {
+	var el = controls[i], name = el.name;
+	if (!name) continue;
+	if (el.tagName === 'SELECT') {
+		var selected = [];
+		for (var o = 0; o < el.options.length; o++) {
+			if (el.options[o].selected) selected.push(el.options[o].value);
+		}
+		data[name] = selected;
+	} else if (el.tagName === 'INPUT' && el.type === 'checkbox') {
+		if (checkboxCount[name] > 1) {
+			if (!Array.isArray(data[name])) data[name] = [];
+			if (el.checked) data[name].push(el.value);
+		} else {
+			data[name] = !!el.checked;
+		}
+	} else if (el.tagName === 'INPUT' && el.type === 'radio') {
+		if (el.checked) data[name] = el.value;
+		else if (!(name in data)) data[name] = null;
+	} else {
+		data[name] = el.value || '';
+	}
+}
+return data;
+"""
+
+_READ_META_FUNCTION = """
+function readMeta() {
+	var meta = {}, tags = document.getElementsByTagName('meta');
+	for (var i = 0; i < tags.length; i++) {
+		var name = tags[i].getAttribute('name') || tags[i].getAttribute('property');
+		var content = tags[i].getAttribute('content');
+		if (name && content) meta[name] = content;
+	}
+	return meta;
+}
+"""
+
+# 返回 {name|property: content}
+READ_META_SCRIPT = _READ_META_FUNCTION + """
+return readMeta();
+"""
+
+# 一次性统计页面概要信息，text_length与GetPageText(removeEmpty=True)的长度一致
+PAGE_SUMMARY_SCRIPT = _READ_META_FUNCTION + """
+function countWith(tag, prop) {
+	var items = document.getElementsByTagName(tag), count = 0;
+	for (var i = 0; i < items.length; i++) {
+		var value = items[i][prop];
+		if (typeof value !== 'string') value = items[i].getAttribute(prop);
+		if (value) count++;
+	}
+	return count;
+}
+var textLength = 0;
+if (document.body) {
+	var lines = (document.body.innerText || '').split('\\n'), kept = 0;
+	for (var i = 0; i < lines.length; i++) {
+		var line = lines[i].trim();
+		if (line) { textLength += line.length; kept++; }
+	}
+	if (kept > 1) textLength += kept - 1;
+}
+return {
+	title: document.title,
+	url: location.href,
+	meta: readMeta(),
+	links_count: countWith('a', 'href'),
+	images_count: countWith('img', 'src'),
+	text_length: textLength,
+	forms_count: document.forms.length,
+	inputs_count: document.querySelectorAll('input, select, textarea').length,
+	iframes_count: document.getElementsByTagName('iframe').length,
+	dom_elements: document.getElementsByTagName('*').length
+};
+"""
+
+# 在页面中注入MutationObserver维护DOM代数，供缓存与索引判断页面是否变化
+# 代数为-1表示无法观察DOM变化；data-mcp-*属性的变化由本项目脚本产生，不计入代数
+_DOCUMENT_STATE_FUNCTION = """
+function documentState() {
+	var state = window.__seleniumMcpState;
+	if (!state) {
+		state = {token: Date.now().toString(36) + Math.random().toString(36).slice(2), generation: 0};
+		try {
+			new MutationObserver(function(records) {
+				for (var i = 0; i < records.length; i++) {
+					var record = records[i];
+					if (record.type !== 'attributes' || record.attributeName.indexOf('data-mcp-') !== 0) {
+						state.generation++;
+						return;
+					}
+				}
+			}).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+		} catch (e) {
+			state.generation = -1;
+		}
+		Object.defineProperty(window, '__seleniumMcpState', {value: state, enumerable: false, configurable: true});
+	}
+	return state;
+}
+"""
+
+# 生成元素的nth-of-type路径
+_ELEMENT_PATH_FUNCTION = """
+function elementPath(el) {
+	var parts = [];
+	while (el && el.nodeType === 1 && el !== document.documentElement) {
+		var part = el.nodeName.toLowerCase(), sibling = el, nth = 1;
+		while ((sibling = sibling.previousElementSibling)) {
+			if (sibling.nodeName === el.nodeName) nth++;
+		}
+		parts.unshift(part + ':nth-of-type(' + nth + ')');
+		el = el.parentElement;
+	}
+	return 'html > ' + parts.join(' > ');
+}
+"""
+
+# 返回 [文档标识, 代数, URL]
+DOCUMENT_STATE_SCRIPT = _DOCUMENT_STATE_FUNCTION + """
+var state = documentState();
+return [state.token, state.generation, location.href];
+"""
+
+# 异步脚本，参数: condition, by, selector, text, attribute, expected, timeoutMs, callback
+# condition为present/visible/clickable/attribute/text；满足时回调元素(无选择器的text条件回调true)，超时回调null
+WAIT_FOR_CONDITION_SCRIPT = """
+var condition = arguments[0], by = arguments[1], selector = arguments[2], text = arguments[3];
+var attribute = arguments[4], expected = arguments[5], timeoutMs = arguments[6];
+var done = arguments[arguments.length - 1];
+function find() {
+	if (!selector) return null;
+	switch (by) {
+		case 'css': return document.querySelector(selector);
+		case 'xpath': return document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+		case 'id': return document.getElementById(selector);
+		case 'class': return document.getElementsByClassName(selector)[0] || null;
+		case 'tag': return document.getElementsByTagName(selector)[0] || null;
+		case 'name': return document.getElementsByName(selector)[0] || null;
+		case 'ref': return document.querySelector('[data-mcp-id="' + CSS.escape(selector) + '"]');
+	}
+	return null;
+}
+function isVisible(el) {
+	if (!el.getClientRects().length) return false;
+	var style = window.getComputedStyle(el);
+	return style.visibility !== 'hidden' && style.visibility !== 'collapse' && style.opacity !== '0';
+}
+function check() {
+	if (condition === 'text' && !selector) {
+		var root = document.documentElement;
+		return root && (root.textContent || '').indexOf(text) >= 0 ? true : null;
+	}
+	var el = find();
+	if (!el) return null;
+	switch (condition) {
+		case 'present': return el;
+		case 'visible': return isVisible(el) ? el : null;
+		case 'clickable': return isVisible(el) && !el.disabled ? el : null;
+		case 'text': return (el.textContent || '').indexOf(text) >= 0 ? el : null;
+		case 'attribute':
+			if (expected === null || expected === undefined) return el.hasAttribute(attribute) ? el : null;
+			return el.getAttribute(attribute) === expected ? el : null;
+	}
+	return null;
+}
+var finished = false, observer = null, timer = null, poller = null, scheduled = false;
+function finish(result) {
+	if (finished) return;
+	finished = true;
+	if (observer) observer.disconnect();
+	clearTimeout(timer);
+	clearInterval(poller);
+	done(result);
+}
+function evaluate() {
+	scheduled = false;
+	if (finished) return;
+	try {
+		var result = check();
+		if (result) finish(result);
+	} catch (e) {
+		finish(null);
+	}
+}
+evaluate();
+if (!finished) {
+	observer = new MutationObserver(function() {
+		if (!scheduled) {
+			scheduled = true;
+			setTimeout(evaluate, 0);
+		}
+	});
+	observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+	// 样式动画等不产生DOM变更的可见性变化由低频轮询兜底
+	poller = setInterval(evaluate, 250);
+	timer = setTimeout(function() { finish(null); }, timeoutMs);
+}
+"""
+
+# 参数: query, caseSensitive, isRegex, limit, contextChars
+# 文本节点索引保存在页面中，DOM代数不变时重复查询直接复用；返回 {matches, total, truncated, index_reused}
+SEARCH_TEXT_SCRIPT = _DOCUMENT_STATE_FUNCTION + _ELEMENT_PATH_FUNCTION + """
+var query = arguments[0], caseSensitive = arguments[1], isRegex = arguments[2];
+var limit = arguments[3] || 0, contextChars = arguments[4] || 0;
+var state = documentState(), index = window.__seleniumMcpTextIndex, reused = true;
+if (!index || index.token !== state.token || index.generation !== state.generation || state.generation < 0) {
+	reused = false;
+	index = {token: state.token, generation: state.generation, nodes: [], texts: [], lower: null, maps: null};
+	var root = document.body || document.documentElement;
+	var skip = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEMPLATE: 1};
+	var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+		acceptNode: function(node) {
+			if (!node.nodeValue || !node.nodeValue.trim()) return NodeFilter.FILTER_REJECT;
+			var parent = node.parentNode;
+			return parent && skip[parent.nodeName] ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT;
+		}
+	});
+	for (var node = walker.nextNode(); node; node = walker.nextNode()) {
+		index.nodes.push(node);
+		index.texts.push(node.nodeValue);
+	}
+	Object.defineProperty(window, '__seleniumMcpTextIndex', {value: index, enumerable: false, configurable: true, writable: true});
+}
+// 小写形式长度变化的文本（如'İ'）逐字符折叠，并记录折叠后位置到原文偏移的映射
+function foldWithMap(text) {
+	var lower = '', map = [];
+	for (var j = 0; j < text.length;) {
+		var code = text.charCodeAt(j), size = code >= 0xD800 && code <= 0xDBFF && j + 1 < text.length ? 2 : 1;
+		var piece = text.substr(j, size).toLowerCase();
+		for (var k = 0; k < piece.length; k++) map.push(j);
+		lower += piece;
+		j += size;
+	}
+	map.push(text.length);
+	return [lower, map];
+}
+var texts = index.texts, maps = null;
+if (!caseSensitive && !isRegex) {
+	if (!index.lower) {
+		index.lower = [];
+		index.maps = [];
+		for (var t = 0; t < texts.length; t++) {
+			var lowered = texts[t].toLowerCase(), map = null;
+			if (lowered.length !== texts[t].length) {
+				var folded = foldWithMap(texts[t]);
+				lowered = folded[0];
+				map = folded[1];
+			}
+			index.lower.push(lowered);
+			index.maps.push(map);
+		}
+	}
+	texts = index.lower;
+	maps = index.maps;
+	query = query.toLowerCase();
+}
+var matches = [], total = 0, range = document.createRange();
+var regex = isRegex ? new RegExp(query, caseSensitive ? 'g' : 'gi') : null;
+for (var i = 0; i < texts.length; i++) {
+	var text = texts[i], found = [];
+	if (regex) {
+		regex.lastIndex = 0;
+		var m;
+		while ((m = regex.exec(text))) {
+			if (!m[0].length) { regex.lastIndex++; continue; }
+			found.push([m.index, m[0].length]);
+		}
+	} else if (query) {
+		for (var at = text.indexOf(query); at >= 0; at = text.indexOf(query, at + query.length)) found.push([at, query.length]);
+	}
+	for (var f = 0; f < found.length; f++) {
+		total++;
+		if (limit && matches.length >= limit) continue;
+		var node = index.nodes[i], original = index.texts[i], parent = node.parentElement;
+		var start = found[f][0], length = found[f][1];
+		if (maps && maps[i]) {
+			var offsets = maps[i], last = offsets[start + length - 1], end = start + length;
+			while (offsets[end] === last) end++;
+			start = offsets[start];
+			length = offsets[end] - start;
+		}
+		range.setStart(node, start);
+		range.setEnd(node, start + length);
+		var rect = range.getBoundingClientRect(), parentRect = parent ? parent.getBoundingClientRect() : rect;
+		matches.push({
+			tag: parent ? parent.nodeName.toLowerCase() : '',
+			text: parent ? (parent.textContent || '').trim().slice(0, 1000) : original,
+			location: {x: Math.round(parentRect.left + window.scrollX), y: Math.round(parentRect.top + window.scrollY)},
+			path: parent ? elementPath(parent) : '',
+			node_index: i,
+			offset: start,
+			length: length,
+			match: original.substr(start, length),
+			snippet: contextChars ? original.slice(Math.max(0, start - contextChars), start + length + contextChars) : '',
+			rect: {x: Math.round(rect.left + window.scrollX), y: Math.round(rect.top + window.scrollY), width: Math.round(rect.width), height: Math.round(rect.height)}
+		});
+	}
+}
+return {matches: matches, total: total, truncated: total > matches.length, index_reused: reused};
+"""
+
+READ_HTML_CHUNK_SCRIPT = """
+var start = arguments[0], size = arguments[1], kind = arguments[2] || 'rendered';
+var snapshot = window.__seleniumMcpHtml;
+if (start === 0 || !snapshot || snapshot.kind !== kind) {
+	var html = kind === 'source' ? new XMLSerializer().serializeToString(document) : document.documentElement.outerHTML;
+	snapshot = {kind: kind, html: html};
+	Object.defineProperty(window, '__seleniumMcpHtml', {value: snapshot, enumerable: false, configurable: true, writable: true});
+}
+var chunk = snapshot.html.substr(start, size);
+var total = snapshot.html.length;
+if (start + size >= total) window.__seleniumMcpHtml = null;
+return [chunk, total];
+"""
+
+# 参数: 已知文档标识, 已知代数；文档未变化时只返回状态，否则返回 [标识, 代数, URL, 整页文本, [[标题级别, 标题文本], ...]]
+PAGE_TEXT_SCRIPT = _DOCUMENT_STATE_FUNCTION + """
+var state = documentState();
+if (state.generation >= 0 && state.token === arguments[0] && state.generation === arguments[1]) {
+	return [state.token, state.generation, location.href, null, null];
+}
+var root = document.body || document.documentElement;
+var text = root ? (root.innerText !== undefined ? root.innerText : root.textContent) || '' : '';
+var headings = [];
+var nodes = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
+for (var i = 0; i < nodes.length; i++) {
+	var title = (nodes[i].innerText || '').trim();
+	if (title) headings.push([parseInt(nodes[i].tagName.charAt(1), 10), title]);
+}
+return [state.token, state.generation, location.href, text, headings];
+"""
+
+# 参数: limit, maxText, reset；与上次调用比较带有自身文本的元素，返回新增、删除和修改的元素
+# 元素以WeakMap分配的编号识别，指纹为文本哈希加可见性；DOM代数未变化时不遍历页面
+# 删除与新增中标签和指纹相同的元素视为重新渲染，互相抵消
+PAGE_CHANGES_SCRIPT = _DOCUMENT_STATE_FUNCTION + _ELEMENT_PATH_FUNCTION + """
+var limit = arguments[0] || 0, maxText = arguments[1] || 200, reset = arguments[2];
+var state = documentState(), store = window.__seleniumMcpChanges;
+if (!store || reset) {
+	store = {ids: new WeakMap(), nextId: 1, entries: null, generation: -2};
+	Object.defineProperty(window, '__seleniumMcpChanges', {value: store, enumerable: false, configurable: true, writable: true});
+}
+var baseline = !store.entries;
+var result = {baseline: baseline, unchanged: false, generation: state.generation, url: location.href, added: [], removed: [], modified: [], counts: {added: 0, removed: 0, modified: 0}, truncated: false};
+if (!baseline && state.generation >= 0 && store.generation === state.generation) {
+	result.unchanged = true;
+	result.elements = store.entries.size;
+	return result;
+}
+function ownText(el) {
+	var text = '';
+	for (var child = el.firstChild; child; child = child.nextSibling) {
+		if (child.nodeType === 3) text += child.nodeValue;
+	}
+	return text.replace(/\\s+/g, ' ').trim();
+}
+function fingerprint(text, visible) {
+	var hash = 2166136261;
+	for (var i = 0; i < text.length; i++) {
+		hash ^= text.charCodeAt(i);
+		hash = Math.imul(hash, 16777619);
+	}
+	return (hash >>> 0).toString(36) + (visible ? 'v' : 'h');
+}
+var skip = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEMPLATE: 1};
+var current = new Map(), root = document.body || document.documentElement;
+var all = root ? root.getElementsByTagName('*') : [];
+for (var i = 0; i < all.length; i++) {
+	var el = all[i];
+	if (skip[el.nodeName]) continue;
+	var text = ownText(el);
+	if (!text) continue;
+	var id = store.ids.get(el);
+	if (!id) {
+		id = store.nextId++;
+		store.ids.set(el, id);
+	}
+	var visible = el.getClientRects().length > 0;
+	current.set(id, {el: el, tag: el.nodeName, text: text, visible: visible, fp: fingerprint(text, visible)});
+}
+if (!baseline) {
+	var added = [], removed = [], rendered = {};
+	current.forEach(function(entry, id) {
+		var old = store.entries.get(id);
+		if (!old) added.push(entry);
+		else if (old.fp !== entry.fp) result.modified.push([old, entry]);
+	});
+	store.entries.forEach(function(old, id) {
+		if (!current.has(id)) {
+			removed.push(old);
+			rendered[old.tag + old.fp] = (rendered[old.tag + old.fp] || 0) + 1;
+		}
+	});
+	added = added.filter(function(entry) {
+		var key = entry.tag + entry.fp;
+		if (!rendered[key]) return true;
+		rendered[key]--;
+		return false;
+	});
+	removed = removed.filter(function(entry) {
+		var key = entry.tag + entry.fp;
+		if (rendered[key] === undefined || rendered[key] <= 0) return false;
+		rendered[key]--;
+		return true;
+	});
+	function describe(entry) {
+		return {tag: entry.tag.toLowerCase(), text: entry.text.slice(0, maxText), visible: entry.visible, path: entry.el.isConnected ? elementPath(entry.el) : ''};
+	}
+	var budget = limit || Infinity, modified = result.modified;
+	result.counts = {added: added.length, removed: removed.length, modified: modified.length};
+	result.modified = modified.slice(0, budget).map(function(pair) {
+		var item = describe(pair[1]);
+		item.before = pair[0].text.slice(0, maxText);
+		item.was_visible = pair[0].visible;
+		return item;
+	});
+	budget -= result.modified.length;
+	result.added = added.slice(0, Math.max(0, budget)).map(describe);
+	budget -= result.added.length;
+	result.removed = removed.slice(0, Math.max(0, budget)).map(describe);
+	result.truncated = result.modified.length + result.added.length + result.removed.length < added.length + removed.length + modified.length;
+}
+store.entries = current;
+store.generation = state.generation;
+result.elements = current.size;
+return result;
+"""
+
+# 参数: scope(viewport/page), limit, maxName, includeHidden
+# 一次遍历收集可交互元素，为每个元素分配在文档内稳定的data-mcp-id编号，可配合定位方式ref直接使用
+INTERACTIVE_OUTLINE_SCRIPT = """
+var scope = arguments[0] || 'viewport', limit = arguments[1] || 0, maxName = arguments[2] || 80, includeHidden = arguments[3];
+var selector = 'a[href], button, input:not([type="hidden"]), select, textarea, summary, [contenteditable=""], [contenteditable="true"], [onclick], ' +
+	'[tabindex]:not([tabindex="-1"]), [role="button"], [role="link"], [role="checkbox"], [role="radio"], [role="switch"], [role="tab"], ' +
+	'[role="menuitem"], [role="option"], [role="combobox"], [role="textbox"], [role="searchbox"], [role="slider"]';
+var inputRoles = {checkbox: 'checkbox', radio: 'radio', button: 'button', submit: 'button', reset: 'button', image: 'button',
+	range: 'slider', number: 'spinbutton', search: 'searchbox', file: 'button'};
+var counter = window.__seleniumMcpRefCounter || 0;
+var viewWidth = window.innerWidth, viewHeight = window.innerHeight;
+function clean(text) {
+	return (text || '').replace(/\\s+/g, ' ').trim();
+}
+function roleOf(el) {
+	var role = el.getAttribute('role');
+	if (role) return role.split(' ')[0];
+	switch (el.nodeName) {
+		case 'A': return 'link';
+		case 'BUTTON': case 'SUMMARY': return 'button';
+		case 'SELECT': return el.multiple || el.size > 1 ? 'listbox' : 'combobox';
+		case 'TEXTAREA': return 'textbox';
+		case 'INPUT': return inputRoles[(el.type || 'text').toLowerCase()] || 'textbox';
+	}
+	return el.isContentEditable ? 'textbox' : 'generic';
+}
+function nameOf(el) {
+	var labelledBy = el.getAttribute('aria-labelledby');
+	if (labelledBy) {
+		var parts = labelledBy.split(/\\s+/).map(function(id) {
+			var ref = document.getElementById(id);
+			return ref ? ref.textContent : '';
+		});
+		var joined = clean(parts.join(' '));
+		if (joined) return joined;
+	}
+	var label = clean(el.getAttribute('aria-label'));
+	if (label) return label;
+	if (el.nodeName === 'INPUT' || el.nodeName === 'TEXTAREA' || el.nodeName === 'SELECT') {
+		if (el.labels && el.labels.length) {
+			label = clean(Array.prototype.map.call(el.labels, function(item) { return item.textContent; }).join(' '));
+			if (label) return label;
+		}
+		var type = (el.type || '').toLowerCase();
+		if (type === 'submit' || type === 'button' || type === 'reset') return clean(el.value);
+		if (type === 'image') return clean(el.alt);
+		label = clean(el.getAttribute('placeholder') || el.getAttribute('title') || el.getAttribute('name'));
+		if (label) return label;
+	}
+	label = clean(el.innerText !== undefined ? el.innerText : el.textContent);
+	if (!label) {
+		var img = el.querySelector && el.querySelector('img[alt]');
+		label = clean((img && img.alt) || el.getAttribute('title'));
+	}
+	return label;
+}
+var nodes = document.querySelectorAll(selector), items = [], total = 0;
+for (var i = 0; i < nodes.length; i++) {
+	var el = nodes[i], rect = el.getBoundingClientRect();
+	var visible = rect.width > 0 && rect.height > 0;
+	if (visible) {
+		var style = window.getComputedStyle(el);
+		visible = style.visibility !== 'hidden' && style.visibility !== 'collapse' && style.display !== 'none';
+	}
+	var inViewport = visible && rect.bottom > 0 && rect.right > 0 && rect.top < viewHeight && rect.left < viewWidth;
+	if (!visible && !includeHidden) continue;
+	if (scope === 'viewport' && !inViewport && !(includeHidden && !visible)) continue;
+	total++;
+	if (limit && items.length >= limit) continue;
+	var id = el.getAttribute('data-mcp-id');
+	if (!id) {
+		id = String(++counter);
+		el.setAttribute('data-mcp-id', id);
+	}
+	var item = {
+		id: id,
+		role: roleOf(el),
+		name: nameOf(el).slice(0, maxName),
+		tag: el.nodeName.toLowerCase(),
+		box: [Math.round(rect.left + window.scrollX), Math.round(rect.top + window.scrollY), Math.round(rect.width), Math.round(rect.height)],
+		visible: visible,
+		in_viewport: inViewport
+	};
+	if (el.disabled) item.disabled = true;
+	if (el.nodeName === 'INPUT' && (el.type === 'checkbox' || el.type === 'radio')) item.checked = el.checked;
+	else if ((el.nodeName === 'INPUT' || el.nodeName === 'TEXTAREA' || el.nodeName === 'SELECT') && el.type !== 'password' && el.value) item.value = String(el.value).slice(0, maxName);
+	if (el.nodeName === 'A') item.href = el.getAttribute('href');
+	items.push(item);
+}
+Object.defineProperty(window, '__seleniumMcpRefCounter', {value: counter, enumerable: false, configurable: true, writable: true});
+return {
+	url: location.href,
+	scope: scope,
+	total: total,
+	truncated: total > items.length,
+	viewport: {width: viewWidth, height: viewHeight, scroll_x: Math.round(window.scrollX), scroll_y: Math.round(window.scrollY)},
+	elements: items
+};
+"""
+
+NAVIGATION_METRICS_SCRIPT = """
+var topResources = arguments[0];
+function ms(value) { return value > 0 ? Math.round(value * 10) / 10 : 0; }
+var result = {url: location.href, navigation: null, paint: {}, resources: null};
+var nav = performance.getEntriesByType('navigation')[0];
+if (nav) {
+	result.navigation = {
+		type: nav.type,
+		redirect_ms: ms(nav.redirectEnd - nav.redirectStart),
+		dns_ms: ms(nav.domainLookupEnd - nav.domainLookupStart),
+		connect_ms: ms(nav.connectEnd - nav.connectStart),
+		tls_ms: nav.secureConnectionStart > 0 ? ms(nav.connectEnd - nav.secureConnectionStart) : 0,
+		ttfb_ms: ms(nav.responseStart - nav.startTime),
+		response_ms: ms(nav.responseEnd - nav.responseStart),
+		dom_interactive_ms: ms(nav.domInteractive),
+		dom_content_loaded_ms: ms(nav.domContentLoadedEventEnd),
+		load_ms: ms(nav.loadEventEnd),
+		transfer_bytes: nav.transferSize || 0,
+		body_bytes: nav.encodedBodySize || 0
+	};
+}
+performance.getEntriesByType('paint').forEach(function (entry) {
+	result.paint[entry.name.replace(/-/g, '_') + '_ms'] = ms(entry.startTime);
+});
+var entries = performance.getEntriesByType('resource');
+var byType = {};
+var transfer = 0, cached = 0;
+for (var i = 0; i < entries.length; i++) {
+	var entry = entries[i];
+	var kind = entry.initiatorType || 'other';
+	var bucket = byType[kind] || (byType[kind] = {count: 0, transfer_bytes: 0, max_ms: 0});
+	bucket.count++;
+	bucket.transfer_bytes += entry.transferSize || 0;
+	bucket.max_ms = Math.max(bucket.max_ms, ms(entry.duration));
+	transfer += entry.transferSize || 0;
+	if (entry.transferSize === 0 && entry.decodedBodySize > 0) cached++;
+}
+var slowest = entries.slice().sort(function (a, b) { return b.duration - a.duration; }).slice(0, topResources);
+result.resources = {
+	count: entries.length,
+	transfer_bytes: transfer,
+	cached: cached,
+	by_type: byType,
+	slowest: slowest.map(function (entry) {
+		return {name: entry.name.slice(0, 160), type: entry.initiatorType, duration_ms: ms(entry.duration), transfer_bytes: entry.transferSize || 0};
+	})
+};
+result.dom_nodes = document.getElementsByTagName('*').length;
+if (performance.memory) result.js_heap_used_bytes = performance.memory.usedJSHeapSize;
+return result;
+"""
+
+def _cachedRead(script: str) -> str:
+	"""包装只读脚本，使文档状态检查与读取在同一次往返内完成
+	参数: [已知文档标识, 已知代数, 已知URL] 或 null, 原脚本参数...
+	返回 [文档标识, 代数, URL, 是否未变化, 读取结果]；文档与已知状态一致时不执行读取，结果为null"""
+	return _DOCUMENT_STATE_FUNCTION + """
+var state = documentState(), known = arguments[0];
+if (state.generation >= 0 && known && state.token === known[0] && state.generation === known[1] && location.href === known[2]) {
+	return [state.token, state.generation, location.href, true, null];
+}
+var value = (function() {""" + script + """
+}).apply(null, Array.prototype.slice.call(arguments, 1));
+return [state.token, state.generation, location.href, false, value];
+"""
+
+CACHED_LINKS_SCRIPT = _cachedRead(COLLECT_LINKS_SCRIPT)
+CACHED_IMAGES_SCRIPT = _cachedRead(COLLECT_IMAGES_SCRIPT)
+CACHED_META_SCRIPT = _cachedRead(READ_META_SCRIPT)
+CACHED_SUMMARY_SCRIPT = _cachedRead(PAGE_SUMMARY_SCRIPT)
+CACHED_SEARCH_TEXT_SCRIPT = _cachedRead(SEARCH_TEXT_SCRIPT)
+CACHED_TITLE_SCRIPT = _cachedRead("return document.title;")
@@ -0,0 +1,226 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from typing import Any, Dict, List, Optional
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+LOG_FORMAT = "selenium-mcp-commands"
+LOG_VERSION = 1
+
+class ReplayError(RuntimeError):
+	"""回放日志与实际命令序列不一致或已用尽"""
+
+def _openLog(path: str, mode: str):
+	"""按扩展名以文本方式打开日志，.gz结尾时使用gzip"""
+	if path.endswith(".gz"):
+		return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+	return open(path, mode, encoding="utf-8")
+
+class CommandLog:
+	"""WebDriver命令日志写入器：每行一条JSON，相同的脚本正文只写一次，之后按哈希引用"""
+	def __init__(self, path: str, sessionId: Optional[str] = None):
+		self.path = path
+		directory = os.path.dirname(path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+		self.__file = _openLog(path, "w")
+		self.__lock = threading.Lock()
+		self.__scripts: set = set()
+		self.__sequence = 0
+		self.__closed = False
+		self.__write({"format": LOG_FORMAT, "version": LOG_VERSION, "created_at": time.time(), "session_id": sessionId})
+
+	def __write(self, record: dict) -> None:
+		"""写入一行（调用方持有锁或处于构造阶段）"""
+		self.__file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+	def Append(self, command: str, params: Optional[dict], response: Any = None, seconds: float = 0.0, error: Optional[str] = None) -> None:
+		"""追加一条命令记录"""
+		params = dict(params or {})
+		script = params.pop("script", None)
+		with self.__lock:
+			if self.__closed:
+				return
+			record: Dict[str, Any] = {"i": self.__sequence, "c": command, "t": round(seconds, 6)}
+			if isinstance(script, str):
+				key = hashlib.sha1(script.encode("utf-8")).hexdigest()[:16]
+				if key not in self.__scripts:
+					self.__scripts.add(key)
+					self.__write({"script": key, "text": script})
+				record["s"] = key
+			if params:
+				record["p"] = params
+			if error is not None:
+				record["x"] = error
+			else:
+				record["r"] = response
+			self.__write(record)
+			self.__sequence += 1
+
+	def GetStats(self) -> Dict[str, Any]:
+		"""获取录制统计"""
+		with self.__lock:
+			return {"path": self.path, "commands": self.__sequence, "scripts": len(self.__scripts), "closed": self.__closed}
+
+	def Close(self) -> None:
+		"""关闭日志"""
+		with self.__lock:
+			if not self.__closed:
+				self.__closed = True
+				self.__file.close()
+
+class RecordingConnection:
+	"""包装驱动的命令通道，转发每条命令并在录制期间记录参数、响应与耗时
+
+	停止录制后仍保留在驱动上直接透传，避免替换通道后丢失外层（如指标计数）的包装。"""
+	def __init__(self, inner: Any, log: Optional[CommandLog] = None):
+		self.inner = inner
+		self.log = log
+
+	def execute(self, command: str, params: dict) -> Any:
+		log = self.log
+		if log is None:
+			return self.inner.execute(command, params)
+		started = time.perf_counter()
+		try:
+			response = self.inner.execute(command, params)
+		except Exception as e:
+			log.Append(command, params, seconds=time.perf_counter() - started, error=f"{type(e).__name__}: {e}")
+			raise
+		log.Append(command, params, response, time.perf_counter() - started)
+		return response
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self.inner, name)
+
+	@classmethod
+	def Start(cls, driver: Any, path: str) -> CommandLog:
+		"""为已创建的驱动开始录制，先写入一条等效的newSession记录以便回放时建立会话"""
+		connection = driver.command_executor
+		if not isinstance(connection, cls):
+			connection = cls(connection)
+			driver.command_executor = connection
+		log = CommandLog(path, driver.session_id)
+		log.Append("newSession", {}, {"value": {"sessionId": driver.session_id, "capabilities": driver.capabilities}})
+		previous, connection.log = connection.log, log
+		if previous is not None:
+			previous.Close()
+		return log
+
+	@staticmethod
+	def Stop(driver: Any) -> Optional[CommandLog]:
+		"""停止录制并关闭日志，未在录制时返回None"""
+		connection = getattr(driver, "command_executor", None)
+		if not isinstance(connection, RecordingConnection) or connection.log is None:
+			return None
+		log, connection.log = connection.log, None
+		log.Close()
+		return log
+
+	@staticmethod
+	def GetLog(driver: Any) -> Optional[CommandLog]:
+		"""获取驱动当前的录制日志"""
+		connection = getattr(driver, "command_executor", None)
+		return connection.log if isinstance(connection, RecordingConnection) else None
+
+class ReplayConnection(RemoteConnection):
+	"""从命令日志回放响应的命令通道，不发出任何网络请求
+
+	strict为True时命令必须与日志逐条一致；否则向后查找下一条同名命令，跳过因等待轮询次数不同而多出的记录。
+	latencyScale大于0时按录制耗时的倍数休眠，用于模拟网络往返。"""
+	def __init__(self, path: str, strict: bool = False, latencyScale: float = 0.0, matchParams: bool = False, lookahead: int = 64):
+		super().__init__(client_config=ClientConfig("http://replay.invalid"))
+		self.path = path
+		self.strict = strict
+		self.latencyScale = latencyScale
+		self.matchParams = matchParams
+		self.lookahead = lookahead
+		self.__lock = threading.Lock()
+		self.__entries: List[dict] = []
+		self.__scripts: Dict[str, str] = {}
+		self.__position = 0
+		self.__replayed = 0
+		self.__skipped = 0
+		self.__recordedSeconds = 0.0
+		self.__load()
+
+	def __load(self) -> None:
+		"""读取日志"""
+		with _openLog(self.path, "r") as f:
+			header = json.loads(f.readline() or "{}")
+			if header.get("format") != LOG_FORMAT:
+				raise ReplayError(f"not a command log: {self.path}")
+			for line in f:
+				record = json.loads(line)
+				if "script" in record:
+					self.__scripts[record["script"]] = record["text"]
+					continue
+				# 响应保留为JSON文本，回放时重新解析，既避免被调用方修改，也保留解析开销
+				if "r" in record:
+					record["r"] = json.dumps(record["r"], ensure_ascii=False)
+				self.__entries.append(record)
+
+	def __matches(self, entry: dict, command: str, params: dict) -> bool:
+		"""判断日志条目是否对应当前命令"""
+		if entry["c"] != command:
+			return False
+		# 录制时的newSession是按驱动能力补写的，不比较参数
+		if not self.matchParams or command == "newSession":
+			return True
+		expected = dict(entry.get("p", {}))
+		if "s" in entry:
+			expected["script"] = self.__scripts.get(entry["s"])
+		return expected == json.loads(json.dumps(params or {}))
+
+	def execute(self, command: str, params: dict) -> Any:
+		with self.__lock:
+			limit = min(len(self.__entries), self.__position + (1 if self.strict else self.lookahead))
+			index = next((index for index in range(self.__position, limit) if self.__matches(self.__entries[index], command, params)), None)
+			if index is None:
+				if command in ("quit", "close") and self.__position >= len(self.__entries):
+					return {"value": None}
+				actual = self.__entries[self.__position]["c"] if self.__position < len(self.__entries) else "end of log"
+				raise ReplayError(f"replay mismatch at entry {self.__position}: driver sent {command}, log has {actual}")
+			self.__skipped += index - self.__position
+			entry = self.__entries[index]
+			self.__position = index + 1
+			self.__replayed += 1
+			self.__recordedSeconds += entry.get("t", 0.0)
+		if self.latencyScale > 0 and entry.get("t"):
+			time.sleep(entry["t"] * self.latencyScale)
+		if "x" in entry:
+			raise ReplayError(f"recorded transport error: {entry['x']}")
+		return json.loads(entry["r"])
+
+	def GetStats(self) -> Dict[str, Any]:
+		"""获取回放统计，recorded_seconds为已回放命令在录制时的耗时总和"""
+		with self.__lock:
+			return {
+				"path": self.path,
+				"entries": len(self.__entries),
+				"position": self.__position,
+				"replayed": self.__replayed,
+				"skipped": self.__skipped,
+				"recorded_seconds": round(self.__recordedSeconds, 6)
+			}
+
+	def Rewind(self) -> None:
+		"""回到日志开头（newSession之后）"""
+		with self.__lock:
+			self.__position = 1 if self.__entries and self.__entries[0]["c"] == "newSession" else 0
+
+class ReplayDriver(webdriver.Remote):
+	"""在进程内回放命令日志的驱动，无需浏览器即可确定性地运行PageReader/BrowserController"""
+	def __init__(self, path: str, strict: bool = False, latencyScale: float = 0.0, matchParams: bool = False):
+		self.replay = ReplayConnection(path, strict, latencyScale, matchParams)
+		super().__init__(command_executor=self.replay, options=Options())
+
+	def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+		"""回放转发的DevTools命令"""
+		return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
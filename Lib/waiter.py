@@ -0,0 +1,79 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from typing import Any, Optional
+from Lib.scripts import WAIT_FOR_CONDITION_SCRIPT
+from Lib.elements import REF_LOCATOR, ResolveLocator
+import time
+
+class DomWaiter:
+	"""基于页面内MutationObserver的事件驱动等待，条件满足后立即返回"""
+	CONDITIONS = ("present", "visible", "clickable", "text", "attribute")
+	BY_TYPES = {
+		By.CSS_SELECTOR: "css",
+		By.XPATH: "xpath",
+		By.ID: "id",
+		By.CLASS_NAME: "class",
+		By.TAG_NAME: "tag",
+		By.NAME: "name",
+		REF_LOCATOR: "ref"
+	}
+
+	def __init__(self, driver: webdriver.Chrome):
+		self.driver = driver
+		# ChromeDriver默认异步脚本超时为30秒，仅在需要更长等待时调整
+		self.__scriptTimeout = 30
+
+	def WaitFor(self, condition: str, selector: Optional[str] = None, byType: By = By.CSS_SELECTOR, timeout: float = 10, text: Optional[str] = None, attribute: Optional[str] = None, value: Optional[str] = None) -> Any:
+		"""等待条件满足，元素条件返回WebElement，页面文本条件返回True，超时返回None"""
+		if condition not in self.CONDITIONS:
+			raise ValueError(f"不支持的等待条件: {condition}")
+		if selector and byType not in self.BY_TYPES:
+			return self.__pollFallback(condition, selector, byType, timeout, text, attribute, value)
+		if timeout + 2 > self.__scriptTimeout:
+			self.__scriptTimeout = timeout + 2
+			self.driver.set_script_timeout(self.__scriptTimeout)
+		deadline = time.monotonic() + timeout
+		while True:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				return None
+			try:
+				return self.driver.execute_async_script(
+					WAIT_FOR_CONDITION_SCRIPT,
+					condition,
+					self.BY_TYPES.get(byType, "css"),
+					selector or "",
+					text or "",
+					attribute or "",
+					value,
+					int(remaining * 1000)
+				)
+			except TimeoutException:
+				return None
+			except WebDriverException as e:
+				# 等待期间页面发生导航时脚本会被中断，在新文档上继续等待
+				if "unload" not in str(e).lower():
+					raise
+
+	def __pollFallback(self, condition: str, selector: str, byType: By, timeout: float, text: Optional[str], attribute: Optional[str], value: Optional[str]) -> Any:
+		"""页面内无法解析的定位方式回退为短间隔轮询"""
+		locator = ResolveLocator(byType, selector)
+		def attributeMatches(driver):
+			element = driver.find_element(*locator)
+			actual = element.get_attribute(attribute)
+			matched = actual is not None if value is None else actual == value
+			return element if matched else False
+		conditions = {
+			"present": EC.presence_of_element_located(locator),
+			"visible": EC.visibility_of_element_located(locator),
+			"clickable": EC.element_to_be_clickable(locator),
+			"text": EC.text_to_be_present_in_element(locator, text or ""),
+			"attribute": attributeMatches
+		}
+		try:
+			return WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(conditions[condition])
+		except TimeoutException:
+			return None
@@ -0,0 +1,468 @@
+import argparse
+import asyncio
+import fnmatch
+import functools
+import html
+import http.server
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+class BenchmarkFixtures:
+	"""生成基准测试用的静态页面，内容由固定随机种子决定，每次生成结果相同"""
+	def __init__(self, root: str, seed: int = 20240501):
+		self.root = root
+		self.random = random.Random(seed)
+
+	def __word(self) -> str:
+		return "".join(self.random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(self.random.randint(3, 10)))
+
+	def __sentence(self, words: int = 12) -> str:
+		return " ".join(self.__word() for _ in range(words))
+
+	@staticmethod
+	def __page(title: str, body: str, script: str = "") -> str:
+		return f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>\n{body}\n{script}</body></html>\n"
+
+	def __write(self, name: str, content: str) -> None:
+		with open(os.path.join(self.root, name), "w", encoding="utf-8") as f:
+			f.write(content)
+
+	def Generate(self) -> List[str]:
+		"""生成全部页面并返回文件名"""
+		os.makedirs(self.root, exist_ok=True)
+		self.__write("links.html", self.__page("10k links", self.__links(10000)))
+		self.__write("table.html", self.__page("large table", self.__table(5000, 12)))
+		self.__write("form.html", self.__page("500 fields", self.__form(500)))
+		self.__write("deep.html", self.__page("deep dom", self.__deep(400, 30)))
+		self.__write("scroll.html", self.__page("infinite scroll", "<h1>feed</h1><ul id=\"feed\"></ul>", self.__scrollScript()))
+		return sorted(name for name in os.listdir(self.root) if name.endswith(".html"))
+
+	def __links(self, count: int) -> str:
+		items = [
+			f"<li><a href=\"/item/{index}?ref={self.__word()}\" title=\"{self.__word()}\">{html.escape(self.__sentence(4))}</a></li>"
+			for index in range(count)
+		]
+		return "<h1>links</h1><ul id=\"links\">\n" + "\n".join(items) + "\n</ul>"
+
+	def __table(self, rows: int, columns: int) -> str:
+		head = "".join(f"<th>col {index}</th>" for index in range(columns))
+		body = "\n".join(
+			"<tr>" + "".join(f"<td>{self.random.randint(0, 99999) if column % 2 else self.__word()}</td>" for column in range(columns)) + "</tr>"
+			for _ in range(rows)
+		)
+		return f"<h1>table</h1><table id=\"data\"><thead><tr>{head}</tr></thead><tbody>\n{body}\n</tbody></table>"
+
+	def __form(self, fields: int) -> str:
+		parts = []
+		for index in range(fields):
+			kind = index % 5
+			name = f"field_{index}"
+			if kind == 0:
+				parts.append(f"<label>{self.__word()} <input type=\"text\" name=\"{name}\" value=\"{self.__word()}\"></label>")
+			elif kind == 1:
+				parts.append(f"<label><input type=\"checkbox\" name=\"{name}\" {'checked' if index % 2 else ''}> {self.__word()}</label>")
+			elif kind == 2:
+				options = "".join(f"<option value=\"{option}\">{self.__word()}</option>" for option in range(6))
+				parts.append(f"<label>{self.__word()} <select name=\"{name}\">{options}</select></label>")
+			elif kind == 3:
+				parts.append(f"<label>{self.__word()} <textarea name=\"{name}\">{self.__sentence(8)}</textarea></label>")
+			else:
+				parts.append(f"<label>{self.__word()} <input type=\"number\" name=\"{name}\" value=\"{index}\"></label>")
+		return "<h1>form</h1><form id=\"big-form\">\n" + "\n".join(f"<div>{part}</div>" for part in parts) + "\n<button type=\"submit\">submit</button></form>"
+
+	def __deep(self, depth: int, branches: int) -> str:
+		"""branches条深度为depth的嵌套链，链尾带文本与按钮"""
+		chains = []
+		for branch in range(branches):
+			chain = f"<p>{self.__sentence(10)}</p><button id=\"deep-{branch}\">{self.__word()}</button>"
+			for level in range(depth):
+				chain = f"<div class=\"d{level % 7}\">{chain}</div>"
+			chains.append(f"<section><h2>section {branch}</h2>{chain}</section>")
+		return "<h1>deep</h1>\n" + "\n".join(chains)
+
+	@staticmethod
+	def __scrollScript() -> str:
+		"""滚动到底部附近时追加50条内容，最多40批"""
+		return """<script>
+(function () {
+	var feed = document.getElementById('feed'), batch = 0;
+	function append() {
+		if (batch >= 40) return;
+		var fragment = document.createDocumentFragment();
+		for (var i = 0; i < 50; i++) {
+			var li = document.createElement('li');
+			li.innerHTML = '<a href="/post/' + batch + '-' + i + '">post ' + batch + '-' + i + '</a> <span>' + 'lorem ipsum '.repeat(8) + '</span>';
+			fragment.appendChild(li);
+		}
+		feed.appendChild(fragment);
+		batch++;
+	}
+	append();
+	window.addEventListener('scroll', function () {
+		if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 800) append();
+	});
+})();
+</script>
+"""
+
+class FixtureServer:
+	"""在本机随机端口上提供静态页面"""
+	def __init__(self, root: str):
+		handler = functools.partial(QuietHandler, directory=root)
+		self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+		self.baseUrl = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+		self.__thread = threading.Thread(target=self.httpd.serve_forever, name="benchmark-http", daemon=True)
+
+	def Start(self) -> "FixtureServer":
+		self.__thread.start()
+		return self
+
+	def Stop(self) -> None:
+		self.httpd.shutdown()
+		self.httpd.server_close()
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+	def log_message(self, format, *args):
+		pass
+
+class Operation:
+	"""一项基准操作：fixture为操作前打开的页面，fresh为True时每次重复前重新打开以测量未命中缓存的读取"""
+	def __init__(self, name: str, fixture: str, run: Callable[[], Any], fresh: bool = True):
+		self.name = name
+		self.fixture = fixture
+		self.run = run
+		self.fresh = fresh
+
+class BenchmarkRunner:
+	"""通过MCP工具与直接调用PageReader/BrowserController两种方式运行基准操作；
+	webdriver/cdp两种方式对可走DevTools直连的读取分别在关闭与开启cdpReads时直接调用PageReader，用于比较两种通道
+
+	record指定路径时把运行期间的WebDriver命令录制到日志；replay指定日志时不启动浏览器，由回放驱动按日志应答，
+	此时耗时只包含Python侧开销（latencyScale大于0时按录制耗时的倍数模拟往返），命令数与录制时一致。
+	两者都关闭DevTools直连读取，使全部通信经过WebDriver命令通道。"""
+	def __init__(self, baseUrl: str, repeat: int = 5, warmup: int = 1, record: Optional[str] = None, replay: Optional[str] = None, latencyScale: float = 0.0):
+		self.baseUrl = baseUrl
+		self.repeat = repeat
+		self.warmup = warmup
+		self.loop = asyncio.new_event_loop()
+		spec = importlib.util.spec_from_file_location("selenium_mcp", os.path.join(PROJECT_ROOT, "selenium-mcp.py"))
+		self.module = importlib.util.module_from_spec(spec)
+		spec.loader.exec_module(self.module)
+		self.app = self.module.SeleniumMCPApp()
+		sessionId = self.module.DEFAULT_SESSION_ID
+		if record or replay:
+			self.app.manager.cdpReads = False
+		self.replay = None
+		if replay:
+			from Lib.transport import ReplayDriver
+			driver = ReplayDriver(replay, latencyScale=latencyScale)
+			self.replay = driver.replay
+			self.app.manager.AdoptDriver(sessionId, driver)
+			result = self.CallTool("get_or_create_browser_instance")
+		else:
+			result = self.CallTool("create_browser_instance", headless=True)
+		if result.startswith("error"):
+			raise RuntimeError(f"failed to start headless Chrome: {result}")
+		self.session = self.app.sessions[sessionId]
+		if record:
+			self.app.manager.StartRecording(sessionId, record)
+
+	def CallTool(self, name: str, **arguments) -> str:
+		"""调用MCP工具并返回文本结果"""
+		content = self.loop.run_until_complete(self.app.mcp.call_tool(name, arguments))
+		text = "".join(getattr(item, "text", "") for item in content)
+		return text
+
+	def __tool(self, name: str, **arguments) -> Callable[[], str]:
+		def call():
+			result = self.CallTool(name, **arguments)
+			if result.startswith("error"):
+				raise RuntimeError(result)
+			return result
+		return call
+
+	def __url(self, fixture: str) -> str:
+		return f"{self.baseUrl}/{fixture}"
+
+	def __scrollAndDiff(self, viaTools: bool) -> Callable[[], Any]:
+		"""无限滚动：连续滚动8次后读取增量变化"""
+		def run():
+			for _ in range(8):
+				if viaTools:
+					self.__tool("scroll_page", delta_y=4000)()
+				else:
+					self.session.controller.ScrollWheel(4000)
+			return self.__tool("get_page_changes")() if viaTools else self.session.reader.GetPageChanges()
+		return run
+
+	def Operations(self) -> Dict[str, List[Operation]]:
+		"""两种方式下的操作列表"""
+		reader = lambda: self.session.reader
+		controller = lambda: self.session.controller
+		tools = [
+			Operation("navigate_links", "links.html", self.__tool("navigate_to_url", url=self.__url("links.html")), fresh=False),
+			Operation("get_all_links", "links.html", self.__tool("get_all_links")),
+			Operation("get_all_links_cached", "links.html", self.__tool("get_all_links"), fresh=False),
+			Operation("get_page_text_paged", "links.html", self.__tool("get_page_text", max_chars=20000)),
+			Operation("get_table_data", "table.html", self.__tool("get_table_data", selector="#data")),
+			Operation("get_table_data_window", "table.html", self.__tool("get_table_data", selector="#data", row_offset=2000, row_limit=100)),
+			Operation("get_form_data", "form.html", self.__tool("get_form_data", selector="#big-form")),
+			Operation("fill_form_field", "form.html", self.__tool("send_keys_to_element", selector="input[name=field_250]", text="benchmark"), fresh=False),
+			Operation("get_page_text_deep", "deep.html", self.__tool("get_page_text")),
+			Operation("get_interactive_elements_deep", "deep.html", self.__tool("get_interactive_elements", scope="page", limit=500)),
+			Operation("search_text_deep", "deep.html", self.__tool("search_text_in_page", search_text="section 2")),
+			Operation("click_deep_button", "deep.html", self.__tool("click_element", selector="#deep-29"), fresh=False),
+			Operation("get_rendered_html_table", "table.html", self.__tool("get_rendered_html")),
+			Operation("infinite_scroll_changes", "scroll.html", self.__scrollAndDiff(True))
+		]
+		direct = [
+			Operation("navigate_links", "links.html", lambda: controller().NavigateTo(self.__url("links.html")), fresh=False),
+			Operation("get_all_links", "links.html", lambda: reader().GetAllLinks()),
+			Operation("get_table_data", "table.html", lambda: reader().GetTableData("#data")),
+			Operation("get_form_data", "form.html", lambda: reader().GetFormData("#big-form")),
+			Operation("get_page_text_deep", "deep.html", lambda: reader().GetPageText()),
+			Operation("get_interactive_elements_deep", "deep.html", lambda: reader().GetInteractiveElements("page", 500)),
+			Operation("search_text_deep", "deep.html", lambda: reader().SearchText("section 2")),
+			Operation("click_deep_button", "deep.html", lambda: controller().ClickElement("#deep-29"), fresh=False),
+			Operation("infinite_scroll_changes", "scroll.html", self.__scrollAndDiff(False))
+		]
+		reads = [
+			Operation("get_all_links", "links.html", lambda: reader().GetAllLinks()),
+			Operation("get_page_source_links", "links.html", lambda: sum(len(chunk) for chunk in reader().IterPageSource())),
+			Operation("get_page_text_deep", "deep.html", lambda: reader().GetPageText()),
+			Operation("get_interactive_elements_deep", "deep.html", lambda: reader().GetInteractiveElements("page", 500)),
+			Operation("search_text_deep", "deep.html", lambda: reader().SearchText("section 2")),
+			Operation("get_page_info_deep", "deep.html", lambda: reader().GetPageInfo()),
+			Operation("get_rendered_html_table", "table.html", lambda: sum(len(chunk) for chunk in reader().IterRenderedHtml()))
+		]
+		return {"tools": tools, "direct": direct, "webdriver": reads, "cdp": reads}
+
+	def __useTransport(self, mode: str) -> None:
+		"""webdriver/cdp方式下切换读取通道，cdp方式要求DevTools直连可用"""
+		if mode not in ("webdriver", "cdp"):
+			return
+		manager = self.app.manager
+		manager.cdpReads = mode == "cdp"
+		if manager.cdpReads and manager.GetCdpClient(self.module.DEFAULT_SESSION_ID) is None:
+			raise RuntimeError("DevTools connection is not available for this browser")
+
+	def __commandCount(self) -> Optional[int]:
+		"""已发出的WebDriver命令总数，未启用指标时为None"""
+		if not self.app.metrics.enabled:
+			return None
+		return sum(self.app.metrics.GetStats()["webdriver_commands"].values())
+
+	def __browserHeap(self) -> Optional[int]:
+		"""页面JS堆占用（仅Chrome提供）"""
+		try:
+			return self.session.driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null;")
+		except Exception:
+			return None
+
+	def __prepare(self, operation: Operation) -> None:
+		self.session.controller.NavigateTo(self.__url(operation.fixture))
+
+	def Measure(self, mode: str, operation: Operation) -> Dict[str, Any]:
+		"""测量一项操作：预热后重复计时，再单独运行一次统计Python内存峰值与浏览器堆变化"""
+		self.__prepare(operation)
+		for _ in range(self.warmup):
+			operation.run()
+		timings = []
+		commands = []
+		for _ in range(self.repeat):
+			if operation.fresh:
+				self.__prepare(operation)
+			before = self.__commandCount()
+			started = time.perf_counter()
+			operation.run()
+			timings.append(time.perf_counter() - started)
+			after = self.__commandCount()
+			if before is not None and after is not None:
+				commands.append(after - before)
+		if operation.fresh:
+			self.__prepare(operation)
+		heapBefore = self.__browserHeap()
+		tracemalloc.start()
+		try:
+			operation.run()
+			_, peak = tracemalloc.get_traced_memory()
+		finally:
+			tracemalloc.stop()
+		heapAfter = self.__browserHeap()
+		ordered = sorted(timings)
+		return {
+			"name": operation.name,
+			"mode": mode,
+			"fixture": operation.fixture,
+			"repeat": self.repeat,
+			"median_ms": round(statistics.median(timings) * 1000, 2),
+			"min_ms": round(ordered[0] * 1000, 2),
+			"max_ms": round(ordered[-1] * 1000, 2),
+			"stdev_ms": round(statistics.stdev(timings) * 1000, 2) if len(timings) > 1 else 0.0,
+			"webdriver_commands": round(statistics.median(commands)) if commands else None,
+			"python_peak_kib": round(peak / 1024, 1),
+			"browser_heap_delta_kib": round((heapAfter - heapBefore) / 1024, 1) if heapBefore is not None and heapAfter is not None else None
+		}
+
+	def Run(self, modes: List[str], only: Optional[str] = None) -> List[Dict[str, Any]]:
+		"""运行所选方式下的全部操作"""
+		results = []
+		operations = self.Operations()
+		for mode in modes:
+			self.__useTransport(mode)
+			for operation in operations[mode]:
+				if only and not fnmatch.fnmatch(operation.name, only):
+					continue
+				try:
+					result = self.Measure(mode, operation)
+				except Exception as e:
+					result = {"name": operation.name, "mode": mode, "fixture": operation.fixture, "error": str(e)}
+				results.append(result)
+				print(FormatResult(result), file=sys.stderr)
+		return results
+
+	def Close(self) -> None:
+		self.app.manager.StopRecording(self.module.DEFAULT_SESSION_ID)
+		self.CallTool("quit_selenium_instance")
+		self.app.manager.QuitAll()
+		self.app.screenshots.Shutdown()
+		self.loop.close()
+
+def FormatResult(result: Dict[str, Any]) -> str:
+	"""单行格式化结果"""
+	label = f"{result['mode']:<9} {result['name']:<32}"
+	if "error" in result:
+		return f"{label} error: {result['error']}"
+	commands = "-" if result["webdriver_commands"] is None else result["webdriver_commands"]
+	return f"{label} median {result['median_ms']:>9.2f} ms  min {result['min_ms']:>9.2f} ms  commands {commands:>4}  py peak {result['python_peak_kib']:>8.1f} KiB"
+
+def CompareBaseline(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float, minDeltaMs: float) -> List[Dict[str, Any]]:
+	"""与基线比较：中位耗时超过基线的(1+threshold)倍且差值大于minDeltaMs，或WebDriver命令数增加，均视为回归"""
+	previous = {(item["mode"], item["name"]): item for item in baseline.get("results", []) if "error" not in item}
+	comparisons = []
+	for result in results:
+		base = previous.get((result["mode"], result["name"]))
+		if base is None or "error" in result:
+			comparisons.append({"name": result["name"], "mode": result["mode"], "status": "error" if "error" in result else "new"})
+			continue
+		delta = result["median_ms"] - base["median_ms"]
+		ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] > 0 else None
+		slower = ratio is not None and ratio > 1 + threshold and delta > minDeltaMs
+		faster = ratio is not None and ratio < 1 - threshold and -delta > minDeltaMs
+		moreCommands = result.get("webdriver_commands") is not None and base.get("webdriver_commands") is not None and result["webdriver_commands"] > base["webdriver_commands"]
+		comparisons.append({
+			"name": result["name"],
+			"mode": result["mode"],
+			"median_ms": result["median_ms"],
+			"baseline_ms": base["median_ms"],
+			"change_pct": round((ratio - 1) * 100, 1) if ratio is not None else None,
+			"webdriver_commands": result.get("webdriver_commands"),
+			"baseline_commands": base.get("webdriver_commands"),
+			"status": "regression" if slower or moreCommands else "improved" if faster else "ok"
+		})
+	return comparisons
+
+def CompareTransports(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+	"""对比同一读取操作在webdriver与cdp方式下的中位耗时与WebDriver命令数"""
+	byTransport = {(item["mode"], item["name"]): item for item in results if "error" not in item}
+	comparisons = []
+	for result in results:
+		if result["mode"] != "webdriver" or "error" in result:
+			continue
+		cdp = byTransport.get(("cdp", result["name"]))
+		if cdp is None:
+			continue
+		comparisons.append({
+			"name": result["name"],
+			"webdriver_ms": result["median_ms"],
+			"cdp_ms": cdp["median_ms"],
+			"speedup": round(result["median_ms"] / cdp["median_ms"], 2) if cdp["median_ms"] > 0 else None,
+			"webdriver_commands": result.get("webdriver_commands"),
+			"cdp_webdriver_commands": cdp.get("webdriver_commands")
+		})
+	return comparisons
+
+def Main() -> int:
+	parser = argparse.ArgumentParser(description="selenium-mcp 读取与控制热路径基准测试（需要Chrome与ChromeDriver，使用config.json中的路径）")
+	parser.add_argument("--repeat", type=int, default=5, help="每项操作的计时次数")
+	parser.add_argument("--warmup", type=int, default=1, help="计时前的预热次数")
+	parser.add_argument("--mode", choices=["tools", "direct", "both", "cdp"], default="both", help="通过MCP工具或直接调用PageReader/BrowserController；cdp为关闭与开启cdpReads时读取操作的对比")
+	parser.add_argument("--only", help="只运行名称匹配该通配模式的操作")
+	parser.add_argument("--output", help="结果JSON的保存路径")
+	parser.add_argument("--baseline", help="与之比较的基线JSON")
+	parser.add_argument("--save-baseline", help="将本次结果保存为基线")
+	parser.add_argument("--threshold", type=float, default=0.2, help="中位耗时回归阈值（比例）")
+	parser.add_argument("--min-delta-ms", type=float, default=5.0, help="低于该差值的耗时变化视为噪声")
+	parser.add_argument("--record", help="把本次运行的WebDriver命令录制到该日志（.gz结尾时压缩）")
+	parser.add_argument("--replay", help="不启动浏览器，回放该命令日志；需与录制时使用相同的--repeat/--warmup/--mode/--only")
+	parser.add_argument("--replay-latency", type=float, default=0.0, help="回放时按录制耗时的该倍数模拟往返延迟，0表示不等待")
+	args = parser.parse_args()
+	if args.record and args.replay:
+		parser.error("--record and --replay are mutually exclusive")
+	if args.mode == "cdp" and (args.record or args.replay):
+		parser.error("--mode cdp needs a live browser and cannot be combined with --record/--replay")
+
+	server = None
+	if args.replay:
+		baseUrl = "http://replay.invalid"
+	else:
+		fixtureRoot = os.path.join(PROJECT_ROOT, "temp", "benchmark")
+		BenchmarkFixtures(fixtureRoot).Generate()
+		server = FixtureServer(fixtureRoot).Start()
+		baseUrl = server.baseUrl
+	runner = BenchmarkRunner(baseUrl, args.repeat, args.warmup, args.record, args.replay, args.replay_latency)
+	try:
+		modes = {"both": ["tools", "direct"], "cdp": ["webdriver", "cdp"]}.get(args.mode, [args.mode])
+		results = runner.Run(modes, args.only)
+		replayStats = runner.replay.GetStats() if runner.replay else None
+	finally:
+		runner.Close()
+		if server:
+			server.Stop()
+
+	import selenium
+	report = {
+		"created_at": time.time(),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"selenium": selenium.__version__,
+		"repeat": args.repeat,
+		"transport": "replay" if args.replay else "live",
+		"replay": replayStats,
+		"results": results
+	}
+	exitCode = 1 if any("error" in result for result in results) else 0
+	if args.mode == "cdp":
+		report["transport_comparison"] = CompareTransports(results)
+		for item in report["transport_comparison"]:
+			print(f"{item['name']:<32} webdriver {item['webdriver_ms']:>9.2f} ms  cdp {item['cdp_ms']:>9.2f} ms  speedup {item['speedup']}x  commands {item['webdriver_commands']} -> {item['cdp_webdriver_commands']}", file=sys.stderr)
+	if args.baseline:
+		with open(args.baseline, "r", encoding="utf-8") as f:
+			comparisons = CompareBaseline(results, json.load(f), args.threshold, args.min_delta_ms)
+		report["comparison"] = comparisons
+		for item in comparisons:
+			if item["status"] in ("regression", "improved"):
+				print(f"{item['status']:<10} {item['mode']:<9} {item['name']:<32} {item['baseline_ms']} -> {item['median_ms']} ms ({item['change_pct']:+}%), commands {item['baseline_commands']} -> {item['webdriver_commands']}", file=sys.stderr)
+		if any(item["status"] == "regression" for item in comparisons):
+			exitCode = 1
+	for path in (args.output, args.save_baseline):
+		if path:
+			with open(path, "w", encoding="utf-8") as f:
+				json.dump(report, f, ensure_ascii=False, indent=2)
+	if not args.output:
+		print(json.dumps(report, ensure_ascii=False, indent=2))
+	return exitCode
+
+if __name__ == "__main__":
+	sys.exit(Main())
@@ -1,12 +1,30 @@
 from mcp.server.fastmcp import FastMCP
-from Lib.manager import SeleniumManager
+from Lib.manager import SeleniumManager, SessionPoolFullError, DEFAULT_SESSION_ID
 from Lib.controller import BrowserController
 from Lib.reader import PageReader
+from Lib.actions import ActionRunner
+from Lib.cache import SnapshotCache
+from Lib.elements import ElementCache, REF_LOCATOR
+from Lib.artifacts import ArtifactStore
+from Lib.screenshot import ScreenshotPipeline
+from Lib.cdp import CdpError
+from Lib.profiles import LoadProfiles
+from Lib.httpcache import HttpCache
+from Lib.navigation import NavigationMetrics
+from Lib.metrics import ServerMetrics
+from Lib.executor import DriverExecutor, DriverCallTimeoutError, ExecutorBusyError, ExecutorClosedError
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from typing import Optional, List, Dict, Any
+from selenium.common.exceptions import WebDriverException
+from typing import Optional, List, Dict, Any, Callable, Union
+import asyncio
+import functools
+import inspect
 import json
+import logging
 import os
+import sys
+import threading
 import time
 
 class SeleniumMCPConfig:
@@ -16,25 +34,72 @@ class SeleniumMCPConfig:
 	
 	def LoadConfig(self):
 		"""从配置文件加载配置"""
+		self.chromedriverPath = r'D:\Chrome\chromedriver-win64\chromedriver.exe'
+		self.chromeBinPath = r'D:\Chrome\chrome-win64\chrome.exe'
+		self.debug = False
+		self.headless = False
+		self.loadProfile = "default"
+		self.profiles = LoadProfiles(None)
+		self.callTimeout = 60
+		self.callQueueSize = 32
+		self.maxSessions = 4
+		self.sessionIdleTimeout = 600
+		self.maxWarmDrivers = 1
+		self.snapshotCacheSize = 256
+		self.standbyDrivers = 0
+		self.standbyHeadless = None
+		self.cdpReads = False
+		self.artifactMaxBytes = 200 * 1024 * 1024
+		self.artifactMaxAge = 86400
+		self.artifactCompression = "none"
+		self.httpCache = False
+		self.captureNavigationMetrics = False
+		self.navigationHistory = 50
+		self.metrics = True
+		self.metricsFile = os.path.join("temp", "metrics.prom")
+		self.metricsInterval = 15
+		self.httpCacheMaxBytes = 256 * 1024 * 1024
+		self.httpCacheDefaultTtl = 0
+		self.httpCacheHosts = []
+		self.recordCommands = False
+		self.recordDir = os.path.join("temp", "recordings")
 		try:
 			if os.path.exists(self.configPath):
 				with open(self.configPath, 'r', encoding='utf-8') as f:
 					config = json.load(f)
 					browserConfig = config.get('browser', {})
-					self.chromedriverPath = browserConfig.get('chromedriverPath', r'D:\Chrome\chromedriver-win64\chromedriver.exe')
-					self.chromeBinPath = browserConfig.get('chromeBinPath', r'D:\Chrome\chrome-win64\chrome.exe')
+					self.chromedriverPath = browserConfig.get('chromedriverPath', self.chromedriverPath)
+					self.chromeBinPath = browserConfig.get('chromeBinPath', self.chromeBinPath)
 					self.debug = browserConfig.get('debug', False)
 					self.headless = browserConfig.get('headless', False)
-			else:
-				self.chromedriverPath = r'D:\Chrome\chromedriver-win64\chromedriver.exe'
-				self.chromeBinPath = r'D:\Chrome\chrome-win64\chrome.exe'
-				self.debug = False
-				self.headless = False
+					self.loadProfile = browserConfig.get('loadProfile', self.loadProfile)
+					self.profiles = LoadProfiles(config.get('profiles'))
+					serverConfig = config.get('server', {})
+					self.callTimeout = serverConfig.get('callTimeout', self.callTimeout)
+					self.callQueueSize = serverConfig.get('callQueueSize', self.callQueueSize)
+					self.maxSessions = serverConfig.get('maxSessions', self.maxSessions)
+					self.sessionIdleTimeout = serverConfig.get('sessionIdleTimeout', self.sessionIdleTimeout)
+					self.maxWarmDrivers = serverConfig.get('maxWarmDrivers', self.maxWarmDrivers)
+					self.snapshotCacheSize = serverConfig.get('snapshotCacheSize', self.snapshotCacheSize)
+					self.standbyDrivers = serverConfig.get('standbyDrivers', self.standbyDrivers)
+					self.standbyHeadless = serverConfig.get('standbyHeadless', self.standbyHeadless)
+					self.cdpReads = serverConfig.get('cdpReads', self.cdpReads)
+					self.artifactMaxBytes = serverConfig.get('artifactMaxBytes', self.artifactMaxBytes)
+					self.artifactMaxAge = serverConfig.get('artifactMaxAge', self.artifactMaxAge)
+					self.artifactCompression = serverConfig.get('artifactCompression', self.artifactCompression)
+					self.httpCache = serverConfig.get('httpCache', self.httpCache)
+					self.captureNavigationMetrics = serverConfig.get('captureNavigationMetrics', self.captureNavigationMetrics)
+					self.navigationHistory = serverConfig.get('navigationHistory', self.navigationHistory)
+					self.metrics = serverConfig.get('metrics', self.metrics)
+					self.metricsFile = serverConfig.get('metricsFile', self.metricsFile)
+					self.metricsInterval = serverConfig.get('metricsInterval', self.metricsInterval)
+					self.httpCacheMaxBytes = serverConfig.get('httpCacheMaxBytes', self.httpCacheMaxBytes)
+					self.httpCacheDefaultTtl = serverConfig.get('httpCacheDefaultTtl', self.httpCacheDefaultTtl)
+					self.httpCacheHosts = serverConfig.get('httpCacheHosts', self.httpCacheHosts)
+					self.recordCommands = serverConfig.get('recordCommands', self.recordCommands)
+					self.recordDir = serverConfig.get('recordDir', self.recordDir)
 		except Exception as e:
-			self.chromedriverPath = r'D:\Chrome\chromedriver-win64\chromedriver.exe'
-			self.chromeBinPath = r'D:\Chrome\chrome-win64\chrome.exe'
-			self.debug = False
-			self.headless = False
+			pass
 
 class SeleniumMCPUtils:	
 	@staticmethod
@@ -45,7 +110,8 @@ class SeleniumMCPUtils:
 			"id": By.ID,
 			"xpath": By.XPATH,
 			"class": By.CLASS_NAME,
-			"tag": By.TAG_NAME
+			"tag": By.TAG_NAME,
+			"ref": REF_LOCATOR
 		}
 		return byMap.get(byType, By.CSS_SELECTOR)
 	
@@ -65,28 +131,158 @@ class SeleniumMCPUtils:
 			os.makedirs(tempDir)
 		return tempDir
 
+class SeleniumMCPSession:
+	def __init__(self, sessionId: str, executor: DriverExecutor, snapshotCache: Optional[SnapshotCache] = None, navigationHistory: int = 50, metrics: Optional[ServerMetrics] = None):
+		self.sessionId = sessionId
+		self.executor = executor
+		self.snapshotCache = snapshotCache
+		self.metrics = metrics
+		self.navigation = NavigationMetrics(navigationHistory)
+		self.elementCache: Optional[ElementCache] = None
+		self.driver = None
+		self.controller: Optional[BrowserController] = None
+		self.reader: Optional[PageReader] = None
+	
+	def Bind(self, driver, cdpProvider: Optional[Callable[[], Any]] = None) -> None:
+		"""绑定驱动实例，驱动变化时重建controller和reader"""
+		if driver is not self.driver:
+			self.driver = driver
+			self.elementCache = ElementCache(driver)
+			self.controller = BrowserController(driver, self.elementCache)
+			self.reader = PageReader(driver, self.snapshotCache, self.elementCache, cdpProvider)
+			if self.metrics:
+				self.metrics.InstrumentDriver(driver)
+				self.metrics.InstrumentObject(self.controller)
+				self.metrics.InstrumentObject(self.reader)
+	
+	def Unbind(self) -> None:
+		"""解除驱动绑定"""
+		self.driver = None
+		self.elementCache = None
+		self.controller = None
+		self.reader = None
+
+class SessionUnavailableError(RuntimeError):
+	"""会话的浏览器实例不可用"""
+
 class SeleniumMCPApp:	
 	def __init__(self):
 		self.config = SeleniumMCPConfig()
+		self.metrics = ServerMetrics(self.config.metrics)
+		self.metricsFile = self.config.metricsFile
+		if self.metricsFile and not os.path.isabs(self.metricsFile):
+			self.metricsFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.metricsFile)
+		recordDir = self.config.recordDir
+		if recordDir and not os.path.isabs(recordDir):
+			recordDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), recordDir)
 		self.manager = SeleniumManager(
 			debug=self.config.debug,
 			chromedriverPath=self.config.chromedriverPath,
 			chromeBinPath=self.config.chromeBinPath,
-			headless=self.config.headless
+			headless=self.config.headless,
+			maxSessions=self.config.maxSessions,
+			idleTimeout=self.config.sessionIdleTimeout,
+			maxWarmDrivers=self.config.maxWarmDrivers,
+			registryPath=os.path.join(SeleniumMCPUtils.EnsureTempDir(), "sessions.json"),
+			standbyDrivers=self.config.standbyDrivers,
+			standbyHeadless=self.config.standbyHeadless,
+			cdpReads=self.config.cdpReads,
+			profiles=self.config.profiles,
+			defaultProfile=self.config.loadProfile,
+			httpCacheFactory=lambda: HttpCache(
+				os.path.join(SeleniumMCPUtils.EnsureTempDir(), "httpcache"),
+				maxBytes=self.config.httpCacheMaxBytes,
+				defaultTtl=self.config.httpCacheDefaultTtl,
+				allowHosts=self.config.httpCacheHosts
+			),
+			httpCacheEnabled=self.config.httpCache,
+			recordDir=recordDir,
+			recordCommands=self.config.recordCommands
 		)
-		self.controller: Optional[BrowserController] = None
-		self.reader: Optional[PageReader] = None
+		self.sessions: Dict[str, SeleniumMCPSession] = {}
+		self.snapshotCache = SnapshotCache(self.config.snapshotCacheSize)
+		self.artifacts = ArtifactStore(
+			os.path.join(SeleniumMCPUtils.EnsureTempDir(), "artifacts"),
+			maxBytes=self.config.artifactMaxBytes,
+			maxAge=self.config.artifactMaxAge,
+			compression=self.config.artifactCompression
+		)
+		self.screenshots = ScreenshotPipeline(self.artifacts)
+		self.__sessionsLock = threading.Lock()
+		self.manager.AddEvictionListener(self.__dropSession)
+		self.manager.StartIdleReaper()
+		self.manager.StartStandby()
 		self.mcp = FastMCP("selenium-mcp")
 		self.__registerTools()
 	
-	def __ensureInstances(self):
-		"""确保controller和reader实例存在"""
-		if not self.manager.HasDriver():
-			self.manager.GetOrCreateDriver()
-		if self.controller is None:
-			self.controller = BrowserController(self.manager.driver)
-		if self.reader is None:
-			self.reader = PageReader(self.manager.driver)
+	def __getSession(self, sessionId: str) -> SeleniumMCPSession:
+		"""获取会话上下文，不存在时创建并分配专用执行器"""
+		with self.__sessionsLock:
+			session = self.sessions.get(sessionId)
+			if session is None:
+				executor = DriverExecutor(
+					name=sessionId,
+					maxQueueSize=self.config.callQueueSize,
+					defaultTimeout=self.config.callTimeout
+				)
+				session = SeleniumMCPSession(sessionId, executor, self.snapshotCache, self.config.navigationHistory, self.metrics)
+				self.sessions[sessionId] = session
+			return session
+	
+	def __dropSession(self, sessionId: str) -> None:
+		"""移除会话上下文并关闭其执行器"""
+		with self.__sessionsLock:
+			session = self.sessions.pop(sessionId, None)
+		if session:
+			session.Unbind()
+			session.executor.Shutdown()
+		self.screenshots.Forget(f"{sessionId}:")
+	
+	def __ensureInstances(self, sessionId: str = DEFAULT_SESSION_ID, reuseWarm: bool = True, profile: Optional[str] = None) -> SeleniumMCPSession:
+		"""租用会话并确保controller和reader实例存在"""
+		session = self.__getSession(sessionId)
+		try:
+			leased = self.manager.LeaseSession(sessionId, reuseWarm, profile)
+		except SessionPoolFullError:
+			self.__dropSession(sessionId)
+			raise
+		if leased is None:
+			raise SessionUnavailableError(f"failed to create browser instance for session {sessionId}")
+		session.Bind(leased.driver, lambda: self.manager.GetCdpClient(sessionId))
+		return session
+	
+	def __driverTool(self, func):
+		"""将同步工具函数包装为在所属会话执行器线程上运行的异步工具"""
+		signature = inspect.signature(func)
+		
+		@functools.wraps(func)
+		async def wrapper(*args, **kwargs):
+			arguments = signature.bind_partial(*args, **kwargs).arguments
+			sessionId = arguments.get("session_id") or DEFAULT_SESSION_ID
+			scope = self.metrics.CurrentScope()
+			deadline = self.config.callTimeout
+			waitTimeout = arguments.get("timeout")
+			if isinstance(waitTimeout, (int, float)) and waitTimeout > 0:
+				# 带等待参数的工具需要为等待本身预留时间
+				deadline = max(deadline, waitTimeout + 5)
+			
+			def run():
+				try:
+					with self.metrics.Attach(scope):
+						return func(*args, **kwargs)
+				finally:
+					self.manager.ReleaseSession(sessionId)
+			
+			try:
+				return await self.__getSession(sessionId).executor.Run(run, timeout=deadline)
+			except (DriverCallTimeoutError, ExecutorBusyError, ExecutorClosedError, SessionPoolFullError, SessionUnavailableError) as e:
+				return f"error: {str(e)}"
+		return wrapper
+	
+	def __tool(self):
+		"""注册MCP工具，并记录每次调用的延迟、错误与WebDriver命令数"""
+		register = self.mcp.tool()
+		return lambda func: register(self.metrics.InstrumentTool(func))
 	
 	def __registerTools(self):
 		"""注册所有MCP工具"""
@@ -98,60 +294,59 @@ class SeleniumMCPApp:
 	
 	def __registerConnectionTools(self):
 		"""注册连接和实例管理相关工具"""
-		@self.mcp.tool()
+		@self.__tool()
 		async def check_connection() -> str:
 			"""查看MCP服务器是否已连接"""
 			return "connected"
 		
-		@self.mcp.tool()
-		async def get_selenium_instance() -> str:
+		@self.__tool()
+		async def get_selenium_instance(session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取Selenium是否存在实例"""
-			return "appeared" if self.manager.HasDriver() else "absent"
+			return "appeared" if self.manager.HasSession(session_id) else "absent"
 		
-		@self.mcp.tool()
-		async def create_browser_instance(headless: bool = False, debug: bool = False) -> str:
-			"""创建新的浏览器实例"""
+		@self.__tool()
+		@self.__driverTool
+		def create_browser_instance(headless: bool = False, debug: bool = False, profile: str = "", session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""创建新的浏览器实例，profile为页面加载配置名（如lean），为空时使用默认配置"""
 			try:
-				if self.manager.HasDriver():
-					self.manager.QuitDriver()
-					self.controller = None
-					self.reader = None
-				
+				self.manager.GetProfile(profile or None)
 				self.manager.headless = headless
 				self.manager.debug = debug
 				
-				driver = self.manager.GetOrCreateDriver()
-				if driver:
-					self.controller = BrowserController(driver)
-					self.reader = PageReader(driver)
-					return f"success: browser instance created (headless={headless}, debug={debug})"
+				if self.manager.HasSession(session_id):
+					# 先换上新浏览器（优先使用待命实例），旧浏览器在后台关闭
+					replaced = self.manager.ReplaceSession(session_id, profile or None)
+					if replaced is None:
+						return "error: failed to create browser instance"
+					self.__getSession(session_id).Bind(replaced.driver, lambda: self.manager.GetCdpClient(session_id))
 				else:
-					return "error: failed to create browser instance"
+					self.__ensureInstances(session_id, reuseWarm=False, profile=profile or None)
+				return f"success: browser instance created (headless={headless}, debug={debug}, profile={self.manager.sessions[session_id].profile}, session={session_id})"
+			except SessionUnavailableError:
+				return "error: failed to create browser instance"
 			except Exception as e:
 				return f"error: {str(e)}"
 		
-		@self.mcp.tool()
-		async def get_or_create_browser_instance(headless: bool = False, debug: bool = False) -> str:
-			"""获取现有实例或创建新实例"""
+		@self.__tool()
+		@self.__driverTool
+		def get_or_create_browser_instance(headless: bool = False, debug: bool = False, profile: str = "", session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取现有实例或创建新实例，profile仅在创建新实例时生效"""
 			try:
-				if self.manager.HasDriver():
-					self.__ensureInstances()
+				if self.manager.HasSession(session_id):
+					self.__ensureInstances(session_id)
 					return "success: using existing browser instance"
 				else:
 					self.manager.headless = headless
 					self.manager.debug = debug
 					
-					driver = self.manager.GetOrCreateDriver()
-					if driver:
-						self.controller = BrowserController(driver)
-						self.reader = PageReader(driver)
-						return f"success: new browser instance created (headless={headless}, debug={debug})"
-					else:
-						return "error: failed to create browser instance"
+					self.__ensureInstances(session_id, profile=profile or None)
+					return f"success: new browser instance created (headless={headless}, debug={debug}, profile={self.manager.sessions[session_id].profile}, session={session_id})"
+			except SessionUnavailableError:
+				return "error: failed to create browser instance"
 			except Exception as e:
 				return f"error: {str(e)}"
 		
-		@self.mcp.tool()
+		@self.__tool()
 		async def set_browser_config(chromedriver_path: str = "", chrome_bin_path: str = "") -> str:
 			"""设置浏览器配置路径"""
 			try:
@@ -163,7 +358,7 @@ class SeleniumMCPApp:
 			except Exception as e:
 				return f"error: {str(e)}"
 		
-		@self.mcp.tool()
+		@self.__tool()
 		async def get_browser_config() -> str:
 			"""获取当前浏览器配置"""
 			try:
@@ -172,259 +367,500 @@ class SeleniumMCPApp:
 					"chrome_bin_path": self.manager.chromeBinPath,
 					"headless": self.manager.headless,
 					"debug": self.manager.debug,
-					"has_driver": self.manager.HasDriver()
+					"has_driver": self.manager.HasDriver(),
+					"default_profile": self.manager.defaultProfile,
+					"profiles": {name: profile.ToDict() for name, profile in self.manager.profiles.items()},
+					"pool": self.manager.GetPoolStats()
 				}
 				return json.dumps(config, ensure_ascii=False)
 			except Exception as e:
 				return f"error: {str(e)}"
 		
-		@self.mcp.tool()
-		async def quit_selenium_instance() -> str:
+		@self.__tool()
+		@self.__driverTool
+		def set_load_profile(profile: str, restart: bool = False, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""切换会话的页面加载配置，URL与资源屏蔽立即生效；加载策略或图片开关不同时需restart=True换用新浏览器"""
+			try:
+				session = self.__ensureInstances(session_id)
+				result = self.manager.SetSessionProfile(session_id, profile, restart)
+				if result["restarted"]:
+					session.Bind(self.manager.sessions[session_id].driver, lambda: self.manager.GetCdpClient(session_id))
+				return json.dumps(result, ensure_ascii=False)
+			except Exception as e:
+				return f"error: {str(e)}"
+		
+		@self.__tool()
+		@self.__driverTool
+		def set_http_cache(enabled: bool = True, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""为会话开启或关闭本地响应缓存：可缓存的脚本、样式、图片和字体从磁盘缓存回放，只作用于当前标签页"""
+			try:
+				self.__ensureInstances(session_id)
+				if not enabled:
+					self.manager.DisableHttpCache(session_id)
+					return "success: http cache disabled"
+				if self.manager.EnableHttpCache(session_id):
+					return "success: http cache enabled"
+				return "error: http cache needs a DevTools debugger address (not available for this browser)"
+			except Exception as e:
+				return f"error: {str(e)}"
+		
+		@self.__tool()
+		@self.__driverTool
+		def set_command_recording(enabled: bool = True, path: str = "", session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""开始或停止把会话的WebDriver命令、响应与耗时录制到日志文件，日志可由benchmark.py --replay在无浏览器时回放"""
+			try:
+				self.__ensureInstances(session_id)
+				if not enabled:
+					stats = self.manager.StopRecording(session_id)
+					return json.dumps(stats, ensure_ascii=False) if stats else "error: session is not recording"
+				return json.dumps(self.manager.StartRecording(session_id, path or None), ensure_ascii=False)
+			except Exception as e:
+				return f"error: {str(e)}"
+		
+		@self.__tool()
+		async def get_http_cache_stats(clear: bool = False) -> str:
+			"""获取本地响应缓存的命中率与容量统计，clear=True时统计后清空缓存；尚未启用过缓存时返回created=false"""
+			httpCache = self.manager.GetHttpCache(create=clear)
+			if httpCache is None:
+				return json.dumps({"created": False, "sessions": {}}, ensure_ascii=False)
+			stats = httpCache.GetStats()
+			stats["created"] = True
+			stats["sessions"] = {
+				info["session_id"]: info["http_cache"]
+				for info in self.manager.ListSessions() if info["http_cache"]
+			}
+			if clear:
+				stats["cleared"] = httpCache.Clear()
+			return json.dumps(stats, ensure_ascii=False)
+		
+		@self.__tool()
+		async def list_browser_sessions() -> str:
+			"""列出所有浏览器会话及会话池状态"""
+			sessions = self.manager.ListSessions()
+			for sessionInfo in sessions:
+				context = self.sessions.get(sessionInfo["session_id"])
+				if context:
+					sessionInfo["executor"] = context.executor.GetStats()
+			return json.dumps({"sessions": sessions, "pool": self.manager.GetPoolStats()}, ensure_ascii=False)
+		
+		@self.__tool()
+		@self.__driverTool
+		def release_browser_session(session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""释放会话，浏览器保留为预热实例供新会话复用"""
+			released = self.manager.CloseSession(session_id, keepWarm=True)
+			self.__dropSession(session_id)
+			return "released" if released else "failed"
+		
+		@self.__tool()
+		async def get_server_stats(reset: bool = False) -> str:
+			"""获取服务器自身的运行指标：各工具与控制器/读取器方法的延迟分位数、错误数、每次调用的WebDriver命令数，以及执行器与会话池状态"""
+			stats = self.metrics.GetStats()
+			stats["executors"] = {sessionId: session.executor.GetStats() for sessionId, session in list(self.sessions.items())}
+			stats["pool"] = self.manager.GetPoolStats()
+			stats["prometheus_file"] = self.metricsFile or None
+			if reset:
+				self.metrics.Reset()
+			return json.dumps(stats, ensure_ascii=False)
+		
+		@self.__tool()
+		async def get_cache_stats() -> str:
+			"""获取页面读取缓存的命中统计"""
+			elements = {
+				sessionId: session.elementCache.GetStats()
+				for sessionId, session in list(self.sessions.items()) if session.elementCache
+			}
+			return json.dumps({"snapshot": self.snapshotCache.GetStats(), "elements": elements, "artifacts": self.artifacts.GetStats(), "screenshots": self.screenshots.GetStats()}, ensure_ascii=False)
+		
+		@self.__tool()
+		@self.__driverTool
+		def quit_selenium_instance(session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""关闭Selenium实例"""
-			self.controller = None
-			self.reader = None
-			return "closed" if self.manager.QuitDriver() else "failed"
+			closed = self.manager.CloseSession(session_id, keepWarm=False)
+			self.__dropSession(session_id)
+			return "closed" if closed else "failed"
 
 	def __registerNavigationTools(self):
 		"""注册浏览器导航相关工具"""
-		@self.mcp.tool()
-		async def navigate_to_url(url: str) -> str:
-			"""导航到指定URL"""
-			self.__ensureInstances()
+		@self.__tool()
+		@self.__driverTool
+		def navigate_to_url(url: str, capture_metrics: Optional[bool] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""导航到指定URL，capture_metrics为True时在加载后记录性能指标（默认取配置captureNavigationMetrics）"""
+			session = self.__ensureInstances(session_id)
 			try:
-				self.manager.driver.get(url)
-				return f"success: navigated to {url}"
+				return self.__navigate(session, "navigate", url, lambda: session.controller.NavigateTo(url), f"success: navigated to {url}", capture_metrics)
 			except Exception as e:
 				return f"error: {str(e)}"
 		
-		@self.mcp.tool()
-		async def go_back() -> str:
+		@self.__tool()
+		@self.__driverTool
+		def go_back(capture_metrics: Optional[bool] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""浏览器后退"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			try:
-				self.manager.driver.back()
-				return "success: navigated back"
+				return self.__navigate(session, "back", None, session.controller.GoBack, "success: navigated back", capture_metrics)
 			except Exception as e:
 				return f"error: {str(e)}"
 		
-		@self.mcp.tool()
-		async def go_forward() -> str:
+		@self.__tool()
+		@self.__driverTool
+		def go_forward(capture_metrics: Optional[bool] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""浏览器前进"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			try:
-				self.manager.driver.forward()
-				return "success: navigated forward"
+				return self.__navigate(session, "forward", None, session.controller.GoForward, "success: navigated forward", capture_metrics)
 			except Exception as e:
 				return f"error: {str(e)}"
 		
-		@self.mcp.tool()
-		async def refresh_page() -> str:
+		@self.__tool()
+		@self.__driverTool
+		def refresh_page(capture_metrics: Optional[bool] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""刷新页面"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			try:
-				self.manager.driver.refresh()
-				return "success: page refreshed"
+				return self.__navigate(session, "refresh", None, session.controller.Refresh, "success: page refreshed", capture_metrics)
 			except Exception as e:
 				return f"error: {str(e)}"
+		
+		@self.__tool()
+		async def get_navigation_metrics(limit: int = 10, reset: bool = False, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取会话最近导航的性能记录，summary为驱动耗时、TTFB、DOMContentLoaded、load、FCP、资源数等指标的p50/p90/p95分位数"""
+			context = self.sessions.get(session_id)
+			if context is None:
+				return f"error: session {session_id} has no navigation history"
+			result = context.navigation.GetSummary(limit)
+			if reset:
+				context.navigation.Clear()
+			return json.dumps(result, ensure_ascii=False)
+	
+	def __navigate(self, session: SeleniumMCPSession, action: str, target: Optional[str], navigate: Callable[[], None], message: str, captureMetrics: Optional[bool]) -> str:
+		"""执行导航并按需在加载后记录性能指标，返回结果附带本次导航的关键指标"""
+		started = time.perf_counter()
+		navigate()
+		elapsed = time.perf_counter() - started
+		if not (self.config.captureNavigationMetrics if captureMetrics is None else captureMetrics):
+			return message
+		try:
+			record = session.navigation.Record(action, target, elapsed, session.reader.GetNavigationMetrics())
+		except Exception as e:
+			return f"{message} (metrics unavailable: {str(e)})"
+		timing = record.get("navigation") or {}
+		brief = {
+			"driver_ms": record["driver_ms"],
+			"ttfb_ms": timing.get("ttfb_ms"),
+			"dom_content_loaded_ms": timing.get("dom_content_loaded_ms"),
+			"load_ms": timing.get("load_ms"),
+			"first_contentful_paint_ms": record["paint"].get("first_contentful_paint_ms"),
+			"resources": (record.get("resources") or {}).get("count")
+		}
+		return f"{message}\n{json.dumps(brief, ensure_ascii=False)}"
 
 	def __registerElementTools(self):
 		"""注册元素操作相关工具"""
-		@self.mcp.tool()
-		async def click_element(selector: str, by_type: str = "css", timeout: int = 10) -> str:
+		@self.__tool()
+		@self.__driverTool
+		def click_element(selector: str, by_type: str = "css", timeout: int = 10, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""点击页面元素"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			success = self.controller.ClickElement(selector, byTypeObj, timeout)
+			success = session.controller.ClickElement(selector, byTypeObj, timeout)
 			return "success: element clicked" if success else "error: failed to click element"
 		
-		@self.mcp.tool()
-		async def click_coordinates(x: int, y: int) -> str:
+		@self.__tool()
+		@self.__driverTool
+		def click_coordinates(x: int, y: int, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""根据坐标点击页面"""
-			self.__ensureInstances()
-			success = self.controller.ClickElementByCoordinates(x, y)
+			session = self.__ensureInstances(session_id)
+			success = session.controller.ClickElementByCoordinates(x, y)
 			return "success: clicked coordinates" if success else "error: failed to click coordinates"
 		
-		@self.mcp.tool()
-		async def send_keys_to_element(selector: str, text: str, by_type: str = "css", clear_first: bool = True) -> str:
+		@self.__tool()
+		@self.__driverTool
+		def send_keys_to_element(selector: str, text: str, by_type: str = "css", clear_first: bool = True, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""向元素输入文本"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			success = self.controller.SendKeys(selector, text, byTypeObj, clear_first)
+			success = session.controller.SendKeys(selector, text, byTypeObj, clear_first)
 			return "success: text sent" if success else "error: failed to send text"
 		
-		@self.mcp.tool()
-		async def scroll_page(delta_y: int, element_selector: Optional[str] = None) -> str:
+		@self.__tool()
+		@self.__driverTool
+		def scroll_page(delta_y: int, element_selector: Optional[str] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""滚动页面"""
-			self.__ensureInstances()
-			success = self.controller.ScrollWheel(delta_y, element_selector)
+			session = self.__ensureInstances(session_id)
+			success = session.controller.ScrollWheel(delta_y, element_selector)
 			return "success: page scrolled" if success else "error: failed to scroll"
 		
-		@self.mcp.tool()
-		async def scroll_to_element(selector: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def scroll_to_element(selector: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""滚动到指定元素"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			success = self.controller.ScrollToElement(selector, byTypeObj)
+			success = session.controller.ScrollToElement(selector, byTypeObj)
 			return "success: scrolled to element" if success else "error: failed to scroll to element"
 		
-		@self.mcp.tool()
-		async def hover_element(selector: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def hover_element(selector: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""悬停在元素上"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			success = self.controller.HoverElement(selector, byTypeObj)
+			success = session.controller.HoverElement(selector, byTypeObj)
 			return "success: element hovered" if success else "error: failed to hover element"
 		
-		@self.mcp.tool()
-		async def drag_and_drop(source_selector: str, target_selector: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def drag_and_drop(source_selector: str, target_selector: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""拖拽元素"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			success = self.controller.DragAndDrop(source_selector, target_selector, byTypeObj)
+			success = session.controller.DragAndDrop(source_selector, target_selector, byTypeObj)
 			return "success: drag and drop completed" if success else "error: failed to drag and drop"
 
 	def __registerReaderTools(self):
 		"""注册页面读取相关工具"""
-		@self.mcp.tool()
-		async def get_page_title() -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_page_title(session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取页面标题"""
-			self.__ensureInstances()
-			return self.reader.GetPageTitle()
+			session = self.__ensureInstances(session_id)
+			return session.reader.GetPageTitle()
 		
-		@self.mcp.tool()
-		async def get_page_url() -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_page_url(session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取当前页面URL"""
-			self.__ensureInstances()
-			return self.reader.GetPageUrl()
+			session = self.__ensureInstances(session_id)
+			return session.reader.GetPageUrl()
 		
-		@self.mcp.tool()
-		async def get_element_text(selector: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_element_text(selector: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取元素文本"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			text = self.reader.GetElementText(selector, byTypeObj)
+			text = session.reader.GetElementText(selector, byTypeObj)
 			return text if text is not None else "error: element not found"
 		
-		@self.mcp.tool()
-		async def get_elements_text(selector: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_elements_text(selector: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取多个元素的文本"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			texts = self.reader.GetElementsText(selector, byTypeObj)
+			texts = session.reader.GetElementsText(selector, byTypeObj)
 			return json.dumps(texts, ensure_ascii=False)
 		
-		@self.mcp.tool()
-		async def get_element_attribute(selector: str, attribute: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_element_attribute(selector: str, attribute: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取元素属性值"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			attrValue = self.reader.GetElementAttribute(selector, attribute, byTypeObj)
+			attrValue = session.reader.GetElementAttribute(selector, attribute, byTypeObj)
 			return attrValue if attrValue is not None else "error: element or attribute not found"
 		
-		@self.mcp.tool()
-		async def get_all_links() -> str:
-			"""获取页面所有链接"""
-			self.__ensureInstances()
-			links = self.reader.GetAllLinks()
+		@self.__tool()
+		@self.__driverTool
+		def get_all_links(limit: int = 0, offset: int = 0, pattern: str = "", session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取页面所有链接，可按数量、偏移和href正则过滤"""
+			session = self.__ensureInstances(session_id)
+			links = session.reader.GetAllLinks(limit, offset, pattern or None)
 			return json.dumps(links, ensure_ascii=False)
 		
-		@self.mcp.tool()
-		async def get_all_images() -> str:
-			"""获取页面所有图片"""
-			self.__ensureInstances()
-			images = self.reader.GetAllImages()
+		@self.__tool()
+		@self.__driverTool
+		def get_all_images(limit: int = 0, offset: int = 0, pattern: str = "", session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取页面所有图片，可按数量、偏移和src正则过滤"""
+			session = self.__ensureInstances(session_id)
+			images = session.reader.GetAllImages(limit, offset, pattern or None)
 			return json.dumps(images, ensure_ascii=False)
 		
-		@self.mcp.tool()
-		async def get_table_data(selector: str, by_type: str = "css") -> str:
-			"""获取表格数据"""
-			self.__ensureInstances()
+		@self.__tool()
+		@self.__driverTool
+		def get_table_data(selector: str, by_type: str = "css", row_offset: int = 0, row_limit: int = 0, columns: Optional[List[Union[int, str]]] = None, header: bool = False, expand_spans: bool = False, output: str = "json", session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取表格数据；columns可为列序号或表头名，output为csv/jsonl时写入temp目录并返回文件信息。
+			返回格式：只给出selector/by_type时保持原有格式，返回行列表 [[单元格文本, ...], ...]（未找到表格时为[]）；
+			给出row_offset、row_limit、columns、header或expand_spans任一参数时返回
+			{"headers": [...]或null, "rows": [[...], ...], "total_rows": 总行数, "column_count": 列数}，未找到表格时返回 error: table not found 文本"""
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			tableData = self.reader.GetTableData(selector, byTypeObj)
-			return json.dumps(tableData, ensure_ascii=False)
+			columnKeys = [int(column) if isinstance(column, str) and column.isdigit() else column for column in columns] if columns else None
+			if output in ("csv", "jsonl"):
+				filename = SeleniumMCPUtils.SanitizeFilename(f"table_{int(time.time() * 1000)}.{output}")
+				filePath = os.path.join(SeleniumMCPUtils.EnsureTempDir(), filename)
+				result = session.reader.ExportTable(selector, filePath, byTypeObj, output, columnKeys, header, expand_spans)
+				return json.dumps(result, ensure_ascii=False) if result else "error: table not found"
+			if not (row_offset or row_limit or columnKeys or header or expand_spans):
+				tableData = session.reader.GetTableData(selector, byTypeObj)
+				return json.dumps(tableData, ensure_ascii=False)
+			table = session.reader.ReadTable(selector, byTypeObj, row_offset, row_limit, columnKeys, header, expand_spans)
+			return json.dumps(table, ensure_ascii=False) if table else "error: table not found"
 		
-		@self.mcp.tool()
-		async def get_form_data(selector: str, by_type: str = "css") -> str:
-			"""获取表单数据"""
-			self.__ensureInstances()
+		@self.__tool()
+		@self.__driverTool
+		def get_form_data(selector: str, by_type: str = "css", detailed: bool = False, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取表单数据，detailed为True时返回每个控件的详细状态和选项"""
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			formData = self.reader.GetFormData(selector, byTypeObj)
+			formData = session.reader.GetFormData(selector, byTypeObj, detailed)
 			return json.dumps(formData, ensure_ascii=False)
 		
-		@self.mcp.tool()
-		async def get_page_text(remove_empty: bool = True) -> str:
-			"""获取页面所有文本"""
-			self.__ensureInstances()
-			return self.reader.GetPageText(remove_empty)
-		
-		@self.mcp.tool()
-		async def search_text_in_page(search_text: str, case_sensitive: bool = False) -> str:
-			"""在页面中搜索文本"""
-			self.__ensureInstances()
-			results = self.reader.SearchTextInPage(search_text, case_sensitive)
+		@self.__tool()
+		@self.__driverTool
+		def get_page_text(remove_empty: bool = True, max_chars: int = 0, cursor: Optional[str] = None, section: Optional[int] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取页面所有文本。max_chars>0、cursor或section任一给出时分页返回JSON：
+			text为本页文本，next_cursor用于获取下一页（为null表示已到末尾），outline为按标题划分的章节列表，
+			section为章节序号，可直接从该章节开始读取。分页优先在标题或换行处断开，后续分页不再访问浏览器"""
+			session = self.__ensureInstances(session_id)
+			if max_chars <= 0 and not cursor and section is None:
+				return session.reader.GetPageText(remove_empty)
+			try:
+				page = session.reader.GetPageTextPage(max_chars, cursor, section, remove_empty)
+				return json.dumps(page, ensure_ascii=False)
+			except ValueError as e:
+				return f"error: {str(e)}"
+		
+		@self.__tool()
+		@self.__driverTool
+		def search_text_in_page(search_text: str, case_sensitive: bool = False, regex: bool = False, limit: int = 100, context_chars: int = 40, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""在页面中搜索文本，支持正则、结果数量限制和上下文片段，返回匹配的节点路径、偏移和位置"""
+			session = self.__ensureInstances(session_id)
+			results = session.reader.SearchTextInPage(search_text, case_sensitive, regex, limit, context_chars)
 			return json.dumps(results, ensure_ascii=False)
 		
-		@self.mcp.tool()
-		async def get_page_info() -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_page_info(session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取页面完整信息"""
-			self.__ensureInstances()
-			pageInfo = self.reader.GetPageInfo()
+			session = self.__ensureInstances(session_id)
+			pageInfo = session.reader.GetPageInfo()
 			return json.dumps(pageInfo, ensure_ascii=False)
+		
+		@self.__tool()
+		@self.__driverTool
+		def get_interactive_elements(scope: str = "viewport", limit: int = 200, max_name: int = 80, include_hidden: bool = False, output: str = "text", session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""一次获取页面可交互元素（链接、按钮、输入框等）的编号列表，包含角色、可访问名称、位置尺寸与可见性。
+			scope为viewport（仅当前视口）或page（整页）；output为text（每行一个元素的紧凑格式）或json。
+			返回的id在当前文档内保持不变，可作为selector并指定by_type="ref"直接用于click_element、send_keys等工具"""
+			session = self.__ensureInstances(session_id)
+			try:
+				outline = session.reader.GetInteractiveElements(scope, limit, max_name, include_hidden)
+			except ValueError as e:
+				return f"error: {str(e)}"
+			if output == "json":
+				return json.dumps(outline, ensure_ascii=False)
+			return session.reader.FormatInteractiveElements(outline)
+		
+		@self.__tool()
+		@self.__driverTool
+		def get_page_changes(limit: int = 200, max_text: int = 200, reset: bool = False, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取自上次调用以来页面的变化，只返回新增(added)、删除(removed)和修改(modified，含before)的文本元素。
+			首次调用、导航后或reset=true时返回baseline=true并建立基线；页面未变化时unchanged=true。
+			适合在点击、滚动等操作后代替重新读取整页。表单输入值不在比较范围内"""
+			session = self.__ensureInstances(session_id)
+			changes = session.reader.GetPageChanges(limit, max_text, reset)
+			return json.dumps(changes, ensure_ascii=False)
 
 	def __registerUtilityTools(self):
 		"""注册实用工具"""
-		@self.mcp.tool()
-		async def get_page_source() -> str:
-			"""获取页面HTML源代码，并将源码保存到temp目录，返回文件绝对路径"""
-			self.__ensureInstances()
-			source = self.reader.GetPageSource()
-			title = self.reader.GetPageTitle() or "page"
-			timestamp = int(time.time())
-			filename = f"{title}_{timestamp}.html"
-			filename = SeleniumMCPUtils.SanitizeFilename(filename)
-			tempDir = SeleniumMCPUtils.EnsureTempDir()
-			filePath = os.path.join(tempDir, filename)
-			with open(filePath, "w", encoding="utf-8") as f:
-				f.write(source)
-			return filePath
-		
-		@self.mcp.tool()
-		async def get_rendered_html() -> str:
-			"""获取渲染后的页面HTML（包含JavaScript动态生成的内容），并将HTML保存到temp目录，返回文件绝对路径"""
-			self.__ensureInstances()
-			renderedHtml = self.manager.driver.execute_script("return document.documentElement.outerHTML;")
-			title = self.reader.GetPageTitle() or "rendered_page"
-			timestamp = int(time.time())
-			filename = f"{title}_rendered_{timestamp}.html"
-			filename = SeleniumMCPUtils.SanitizeFilename(filename)
-			tempDir = SeleniumMCPUtils.EnsureTempDir()
-			filePath = os.path.join(tempDir, filename)
-			with open(filePath, "w", encoding="utf-8") as f:
-				f.write(renderedHtml)
-			return filePath
-		
-		@self.mcp.tool()
-		async def wait_for_element(selector: str, by_type: str = "css", timeout: int = 10) -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_page_source(session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取页面HTML源代码，分块读取并保存到产物目录，返回产物ID、文件路径和字节数（内容相同时复用已有文件）"""
+			session = self.__ensureInstances(session_id)
+			artifact = self.artifacts.Write("source", session.reader.IterPageSource())
+			return json.dumps(artifact, ensure_ascii=False)
+		
+		@self.__tool()
+		@self.__driverTool
+		def get_rendered_html(session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""获取渲染后的页面HTML（包含JavaScript动态生成的内容），分块读取并保存到产物目录，返回产物ID、文件路径和字节数"""
+			session = self.__ensureInstances(session_id)
+			artifact = self.artifacts.Write("rendered", session.reader.IterRenderedHtml())
+			return json.dumps(artifact, ensure_ascii=False)
+		
+		@self.__driverTool
+		def captureScreenshot(mode: str, selector: Optional[str], by_type: str, region: Optional[List[float]], session_id: str = DEFAULT_SESSION_ID) -> Any:
+			"""在会话执行器线程上截取原始PNG"""
+			session = self.__ensureInstances(session_id)
+			try:
+				return session.reader.CaptureScreenshot(mode, selector, SeleniumMCPUtils.GetByType(by_type), region)
+			except (ValueError, CdpError, WebDriverException) as e:
+				return f"error: {str(e)}"
+		
+		@self.__tool()
+		async def take_screenshot(mode: str = "viewport", selector: Optional[str] = None, by_type: str = "css", region: Optional[List[float]] = None, image_format: str = "png", quality: int = 80, max_width: int = 0, skip_unchanged: bool = True, similarity_threshold: int = 0, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""截取页面画面并保存到产物目录，返回产物ID、路径、尺寸和字节数。
+			mode为viewport（当前视口）、full（整页）、element（selector指定的元素）或region（region=[x, y, width, height]，页面坐标）。
+			image_format为png/jpeg/webp，max_width>0时等比缩小。skip_unchanged为true、画面与同一会话同一目标的上一帧相同且image_format/quality/max_width也相同时，
+			不再保存新文件并返回unchanged=true和上一帧的信息。similarity_threshold默认为0，按像素精确比较；
+			大于0时改用感知哈希，汉明距离（0-64）不超过该值即视为未变化，细小的改动可能被忽略。
+			缩放、裁剪、jpeg/webp和相似度比较依赖Pillow，未安装时返回错误说明"""
+			capture = await captureScreenshot(mode, selector, by_type, region, session_id=session_id)
+			if isinstance(capture, str):
+				return capture
+			png, crop = capture
+			key = f"{session_id}:{mode}:{selector or ''}:{region or ''}"
+			try:
+				# 解码、缩放和编码在截图线程池中进行，不占用会话执行器和事件循环
+				result = await asyncio.wrap_future(self.screenshots.Submit(key, png, image_format, quality, max_width, crop, skip_unchanged, similarity_threshold))
+			except (ValueError, OSError) as e:
+				return f"error: {str(e)}"
+			return json.dumps(result, ensure_ascii=False)
+		
+		@self.__tool()
+		@self.__driverTool
+		def wait_for_element(selector: str, by_type: str = "css", timeout: int = 10, session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""等待元素出现"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			success = self.controller.WaitForElement(selector, byTypeObj, timeout)
+			success = session.controller.WaitForElement(selector, byTypeObj, timeout)
 			return "success: element appeared" if success else "error: element did not appear"
 		
-		@self.mcp.tool()
-		async def is_element_visible(selector: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def run_actions(steps: List[Dict[str, Any]], stop_on_error: bool = True, timeout: int = 120, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""在一次调用中按顺序执行多个步骤，返回每步结果和耗时。
+			每个步骤为 {"action": 名称, ...参数}，参数名与对应工具一致，例如
+			{"action": "navigate", "url": "..."}、{"action": "send_keys", "selector": "#user", "text": "..."}、{"action": "click", "selector": "button"}。
+			支持的action: navigate, back, forward, refresh, click, click_coordinates, send_keys, press_key, scroll, scroll_to, hover,
+			drag_and_drop, wait_for_element, wait_for_condition, wait_for_text, sleep, get_element_text, get_elements_text,
+			get_element_attribute, is_element_visible, get_page_title, get_page_url, get_page_text, get_all_links, get_all_images,
+			get_table_data, get_form_data, search_text_in_page, get_page_info, get_interactive_elements, get_page_changes。
+			timeout为整批步骤的截止时间（秒）：每步开始前检查，超时后不再执行剩余步骤，返回已完成步骤的结果并置timed_out为true"""
+			session = self.__ensureInstances(session_id)
+			runner = ActionRunner(session.controller, session.reader, SeleniumMCPUtils.GetByType)
+			return json.dumps(runner.Run(steps, stop_on_error, timeout), ensure_ascii=False, default=str)
+		
+		@self.__tool()
+		@self.__driverTool
+		def wait_for_condition(condition: str, selector: str = "", by_type: str = "css", text: str = "", attribute: str = "", value: Optional[str] = None, timeout: int = 10, session_id: str = DEFAULT_SESSION_ID) -> str:
+			"""等待条件满足: present/visible/clickable(元素)、text(页面或元素文本包含text)、attribute(元素属性等于value，value为空时仅要求属性存在)"""
+			session = self.__ensureInstances(session_id)
+			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
+			if condition == "text" and not selector:
+				success = session.reader.WaitForTextToAppear(text, timeout)
+			else:
+				success = session.controller.WaitForCondition(condition, selector or None, byTypeObj, timeout, text or None, attribute or None, value)
+			return f"success: condition {condition} met" if success else f"error: condition {condition} not met"
+		
+		@self.__tool()
+		@self.__driverTool
+		def is_element_visible(selector: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""检查元素是否可见"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			visible = self.reader.IsElementVisible(selector, byTypeObj)
+			visible = session.controller.IsElementVisible(selector, byTypeObj)
 			return "visible" if visible else "hidden"
 		
-		@self.mcp.tool()
-		async def get_element_center(selector: str, by_type: str = "css") -> str:
+		@self.__tool()
+		@self.__driverTool
+		def get_element_center(selector: str, by_type: str = "css", session_id: str = DEFAULT_SESSION_ID) -> str:
 			"""获取元素中心坐标"""
-			self.__ensureInstances()
+			session = self.__ensureInstances(session_id)
 			byTypeObj = SeleniumMCPUtils.GetByType(by_type)
-			center = self.reader.GetElementCenter(selector, byTypeObj)
+			center = session.reader.GetElementCenter(selector, byTypeObj)
 			if center:
 				return json.dumps({"x": center[0], "y": center[1]}, ensure_ascii=False)
 			else:
@@ -432,7 +868,14 @@ class SeleniumMCPApp:
 	
 	def Run(self):
 		"""运行MCP服务器"""
-		self.mcp.run(transport="stdio")
+		self.metrics.StartWriter(self.metricsFile, self.config.metricsInterval)
+		try:
+			self.mcp.run(transport="stdio")
+		finally:
+			self.manager.StopStandby()
+			self.metrics.StopWriter(self.metricsFile)
 
 if __name__ == "__main__":
+	# stdio传输使用标准输出承载协议消息，日志只能写到标准错误
+	logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 	SeleniumMCPApp().Run()
\ No newline at end of file
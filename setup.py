@@ -114,7 +114,41 @@ class SeleniumMCPSetup:
 				"chromedriverPath": chromeDriverPath,
 				"chromeBinPath": chromePath,
 				"debug": debugMode,
-				"headless": headlessMode
+				"headless": headlessMode,
+				"loadProfile": "default"
+			},
+			"server": {
+				"callTimeout": 60,
+				"callQueueSize": 32,
+				"maxSessions": 4,
+				"sessionIdleTimeout": 600,
+				"maxWarmDrivers": 1,
+				"snapshotCacheSize": 256,
+				"standbyDrivers": 0,
+				"standbyHeadless": None,
+				"cdpReads": False,
+				"artifactMaxBytes": 209715200,
+				"artifactMaxAge": 86400,
+				"artifactCompression": "none",
+				"httpCache": False,
+				"httpCacheMaxBytes": 268435456,
+				"httpCacheDefaultTtl": 0,
+				"httpCacheHosts": [],
+				"captureNavigationMetrics": False,
+				"navigationHistory": 50,
+				"metrics": True,
+				"metricsFile": "temp/metrics.prom",
+				"metricsInterval": 15,
+				"recordCommands": False,
+				"recordDir": "temp/recordings"
+			},
+			"profiles": {
+				"lean": {
+					"pageLoadStrategy": "eager",
+					"blockedUrls": [],
+					"blockedResourceTypes": ["image", "font", "media"],
+					"disableImages": True
+				}
 			}
 		}
 		
@@ -130,7 +164,41 @@ class SeleniumMCPSetup:
 				"chromedriverPath": "D:\\Chrome\\chromedriver-win64\\chromedriver.exe",
 				"chromeBinPath": "D:\\Chrome\\chrome-win64\\chrome.exe",
 				"debug": False,
-				"headless": False
+				"headless": False,
+				"loadProfile": "default"
+			},
+			"server": {
+				"callTimeout": 60,
+				"callQueueSize": 32,
+				"maxSessions": 4,
+				"sessionIdleTimeout": 600,
+				"maxWarmDrivers": 1,
+				"snapshotCacheSize": 256,
+				"standbyDrivers": 0,
+				"standbyHeadless": None,
+				"cdpReads": False,
+				"artifactMaxBytes": 209715200,
+				"artifactMaxAge": 86400,
+				"artifactCompression": "none",
+				"httpCache": False,
+				"httpCacheMaxBytes": 268435456,
+				"httpCacheDefaultTtl": 0,
+				"httpCacheHosts": [],
+				"captureNavigationMetrics": False,
+				"navigationHistory": 50,
+				"metrics": True,
+				"metricsFile": "temp/metrics.prom",
+				"metricsInterval": 15,
+				"recordCommands": False,
+				"recordDir": "temp/recordings"
+			},
+			"profiles": {
+				"lean": {
+					"pageLoadStrategy": "eager",
+					"blockedUrls": [],
+					"blockedResourceTypes": ["image", "font", "media"],
+					"disableImages": True
+				}
 			}
 		}
 		
@@ -0,0 +1,90 @@
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lib.artifacts import ArtifactStore
+
+class ArtifactStoreTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.store = ArtifactStore(self.directory, maxBytes=0, maxAge=0)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def testChunksAreWrittenInOrder(self):
+		artifact = self.store.Write("page", ["<html>", b"<body>", "", "中文</body></html>"])
+		with open(artifact["path"], "rb") as f:
+			self.assertEqual(f.read().decode("utf-8"), "<html><body>中文</body></html>")
+		self.assertEqual(artifact["raw_bytes"], artifact["bytes"])
+		self.assertTrue(artifact["id"].startswith("page-"))
+		self.assertTrue(artifact["path"].endswith(".html"))
+		self.assertEqual(self.store.Get(artifact["id"])["path"], artifact["path"])
+
+	def testIdenticalContentIsStoredOnce(self):
+		first = self.store.Write("page", ["same ", "content"])
+		second = self.store.Write("page", ["same content"])
+		self.assertFalse(first["deduplicated"])
+		self.assertTrue(second["deduplicated"])
+		self.assertEqual(first["id"], second["id"])
+		self.assertEqual(first["path"], second["path"])
+		third = self.store.Write("page", ["other content"])
+		self.assertNotEqual(third["id"], first["id"])
+		stats = self.store.GetStats()
+		self.assertEqual((stats["artifacts"], stats["writes"], stats["deduplicated"]), (2, 3, 1))
+		self.assertFalse([name for name in os.listdir(self.directory) if name.endswith(".tmp")])
+
+	def testGzipCompression(self):
+		store = ArtifactStore(self.directory, compression="gzip")
+		artifact = store.Write("page", ["x" * 10000])
+		self.assertEqual(artifact["compression"], "gzip")
+		self.assertTrue(artifact["path"].endswith(".html.gz"))
+		self.assertLess(artifact["bytes"], artifact["raw_bytes"])
+		with gzip.open(artifact["path"], "rb") as f:
+			self.assertEqual(f.read(), b"x" * 10000)
+
+	def testUnknownCompressionFallsBackToNone(self):
+		self.assertEqual(ArtifactStore(self.directory, compression="brotli").compression, "none")
+
+	def testFailedWriteLeavesNoFiles(self):
+		def chunks():
+			yield "partial"
+			raise IOError("browser disconnected")
+		with self.assertRaises(IOError):
+			self.store.Write("page", chunks())
+		self.assertEqual(os.listdir(self.directory), [])
+
+	def testOldestArtifactsAreEvictedOverSizeLimit(self):
+		store = ArtifactStore(self.directory, maxBytes=250, maxAge=0)
+		paths = []
+		for index in range(3):
+			paths.append(store.Write("page", [str(index) * 100])["path"])
+			# 按修改时间淘汰，写入间隔需要大于文件系统的时间精度
+			os.utime(paths[-1], (time.time() - 10 + index, time.time() - 10 + index))
+		self.assertFalse(os.path.exists(paths[0]))
+		self.assertTrue(os.path.exists(paths[1]))
+		self.assertTrue(os.path.exists(paths[2]))
+		self.assertEqual(store.GetStats()["evicted"], 1)
+
+	def testExpiredArtifactsAreEvicted(self):
+		store = ArtifactStore(self.directory, maxBytes=0, maxAge=60)
+		old = store.Write("page", ["old"])["path"]
+		os.utime(old, (time.time() - 120, time.time() - 120))
+		fresh = store.Write("page", ["fresh"])["path"]
+		self.assertFalse(os.path.exists(old))
+		self.assertTrue(os.path.exists(fresh))
+
+	def testRewrittenArtifactIsKeptEvenWhenOversized(self):
+		store = ArtifactStore(self.directory, maxBytes=10, maxAge=0)
+		artifact = store.Write("page", ["y" * 100])
+		self.assertTrue(os.path.exists(artifact["path"]))
+		self.assertTrue(store.Write("page", ["y" * 100])["deduplicated"])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,261 @@
+import base64
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lib.cdp import CdpClient, CdpError
+from Lib.manager import SeleniumManager
+
+TARGET_ID = "stub-target"
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+class StubDevToolsHandler(socketserver.BaseRequestHandler):
+	"""最小的DevTools端点：GET /json/list 返回一个页面目标，其余请求升级为WebSocket并按方法名应答"""
+	def handle(self):
+		head = b""
+		while b"\r\n\r\n" not in head:
+			data = self.request.recv(4096)
+			if not data:
+				return
+			head += data
+		lines = head.split(b"\r\n\r\n", 1)[0].decode("latin-1").split("\r\n")
+		path = lines[0].split(" ")[1]
+		headers = {name.strip().lower(): value.strip() for name, value in (line.split(":", 1) for line in lines[1:] if ":" in line)}
+		if path == "/json/list":
+			return self.__json([{"id": TARGET_ID, "type": "page", "webSocketDebuggerUrl": f"ws://127.0.0.1:{self.server.server_address[1]}/devtools/page/{TARGET_ID}"}])
+		accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _GUID).encode()).digest()).decode()
+		self.request.sendall(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+		self.server.connections.append(self.request)
+		self.sendLock = threading.Lock()
+		while True:
+			opcode, payload = self.__readFrame()
+			if opcode is None or opcode == 8:
+				return
+			if opcode == 1:
+				self.__dispatch(json.loads(payload))
+
+	def __json(self, value):
+		body = json.dumps(value).encode()
+		self.request.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+
+	def __recvExact(self, size: int) -> bytes:
+		data = b""
+		while len(data) < size:
+			chunk = self.request.recv(size - len(data))
+			if not chunk:
+				raise ConnectionError("closed")
+			data += chunk
+		return data
+
+	def __readFrame(self):
+		try:
+			first, second = self.__recvExact(2)
+			length = second & 0x7F
+			if length == 126:
+				length = struct.unpack(">H", self.__recvExact(2))[0]
+			elif length == 127:
+				length = struct.unpack(">Q", self.__recvExact(8))[0]
+			mask = self.__recvExact(4) if second & 0x80 else b"\0\0\0\0"
+			payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(self.__recvExact(length)))
+			return first & 0x0F, payload.decode("utf-8", "replace")
+		except (ConnectionError, OSError):
+			return None, None
+
+	def send(self, message: dict) -> None:
+		payload = json.dumps(message).encode()
+		header = bytes([0x81])
+		if len(payload) < 126:
+			header += bytes([len(payload)])
+		elif len(payload) < 65536:
+			header += bytes([126]) + struct.pack(">H", len(payload))
+		else:
+			header += bytes([127]) + struct.pack(">Q", len(payload))
+		with self.sendLock:
+			self.request.sendall(header + payload)
+
+	def __dispatch(self, message: dict) -> None:
+		method, params, messageId = message["method"], message.get("params", {}), message["id"]
+		if method == "Test.echo":
+			self.send({"id": messageId, "result": {"echo": params}})
+		elif method == "Test.fail":
+			self.send({"id": messageId, "error": {"code": -32000, "message": "stub failure"}})
+		elif method == "Test.emit":
+			self.send({"method": "Test.event", "params": params})
+			self.send({"id": messageId, "result": {}})
+		elif method == "Test.slow":
+			# 慢请求在独立线程中应答，验证流水线请求的总耗时约为一次往返
+			threading.Timer(params.get("delay", 0.2), lambda: self.send({"id": messageId, "result": {"index": params.get("index")}})).start()
+		elif method == "Runtime.evaluate":
+			if "throw" in params["expression"]:
+				self.send({"id": messageId, "result": {"result": {"type": "object"}, "exceptionDetails": {"text": "Uncaught", "exception": {"description": "Error: stub script error"}}}})
+			else:
+				self.send({"id": messageId, "result": {"result": {"type": "number", "value": 42}}})
+		elif method == "Test.silent":
+			pass
+		else:
+			self.send({"id": messageId, "error": {"code": -32601, "message": f"'{method}' wasn't found"}})
+
+class StubDevToolsServer(socketserver.ThreadingTCPServer):
+	daemon_threads = True
+	allow_reuse_address = True
+
+	def __init__(self):
+		super().__init__(("127.0.0.1", 0), StubDevToolsHandler)
+		self.connections = []
+		self.address = f"127.0.0.1:{self.server_address[1]}"
+		self.webSocketUrl = f"ws://{self.address}/devtools/page/{TARGET_ID}"
+		threading.Thread(target=self.serve_forever, daemon=True).start()
+
+	def DropAll(self) -> None:
+		"""从服务端断开所有WebSocket连接"""
+		for connection in self.connections:
+			try:
+				connection.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+
+	def Stop(self) -> None:
+		self.DropAll()
+		self.shutdown()
+		self.server_close()
+
+class StubDriver:
+	"""只提供CdpClient.ForDriver所需属性的驱动"""
+	def __init__(self, address: str):
+		self.capabilities = {"goog:chromeOptions": {"debuggerAddress": address}}
+		self.current_window_handle = TARGET_ID
+
+def WaitUntil(predicate, timeout: float = 2.0) -> bool:
+	deadline = time.time() + timeout
+	while time.time() < deadline:
+		if predicate():
+			return True
+		time.sleep(0.01)
+	return predicate()
+
+class CdpClientTest(unittest.TestCase):
+	def setUp(self):
+		self.server = StubDevToolsServer()
+		self.client = CdpClient(self.server.webSocketUrl, TARGET_ID, callTimeout=2)
+
+	def tearDown(self):
+		self.client.Close()
+		self.server.Stop()
+
+	def testCallReturnsResult(self):
+		self.assertEqual(self.client.Call("Test.echo", {"value": 1}), {"echo": {"value": 1}})
+		self.assertEqual(self.client.GetStats()["calls"], 1)
+
+	def testSendReturnsFuture(self):
+		future = self.client.Send("Test.echo", {"value": "a"})
+		self.assertEqual(future.result(2), {"echo": {"value": "a"}})
+
+	def testErrorResponseRaises(self):
+		with self.assertRaisesRegex(CdpError, "stub failure"):
+			self.client.Call("Test.fail")
+		with self.assertRaisesRegex(CdpError, "wasn't found"):
+			self.client.Call("Test.unknown")
+		self.assertEqual(self.client.GetStats()["errors"], 2)
+		self.assertEqual(self.client.Call("Test.echo"), {"echo": {}})
+
+	def testTimeoutRaises(self):
+		with self.assertRaisesRegex(CdpError, "超时"):
+			self.client.Call("Test.silent", timeout=0.2)
+		with self.assertRaises(CdpError):
+			self.client.CallMany([("Test.silent", None), ("Test.silent", None)], timeout=0.1)
+		self.assertEqual(self.client.GetStats()["pending"], 0)
+
+	def testEventsReachListeners(self):
+		events = []
+		self.client.On("Test.event", events.append)
+		self.client.Call("Test.emit", {"n": 3})
+		self.assertTrue(WaitUntil(lambda: events == [{"n": 3}]))
+
+	def testListenerErrorsDoNotStopReader(self):
+		def broken(params):
+			raise ValueError("listener failure")
+		self.client.On("Test.event", broken)
+		self.client.Call("Test.emit")
+		self.assertEqual(self.client.Call("Test.echo", {"after": True}), {"echo": {"after": True}})
+
+	def testCallManyPipelinesRequests(self):
+		started = time.perf_counter()
+		results = self.client.CallMany([("Test.slow", {"index": index, "delay": 0.3}) for index in range(5)])
+		elapsed = time.perf_counter() - started
+		self.assertEqual([result["index"] for result in results], list(range(5)))
+		self.assertLess(elapsed, 1.0)
+
+	def testEvaluate(self):
+		self.assertEqual(self.client.Evaluate("return arguments[0] + 1;", 41), 42)
+		with self.assertRaisesRegex(CdpError, "stub script error"):
+			self.client.Evaluate("throw new Error('x');")
+
+	def testDisconnectFailsPendingAndCloses(self):
+		future = self.client.Send("Test.silent")
+		self.server.DropAll()
+		with self.assertRaises(CdpError):
+			future.result(2)
+		self.assertTrue(WaitUntil(self.client.IsClosed))
+		with self.assertRaises(CdpError):
+			self.client.Send("Test.echo")
+
+	def testCloseFailsPending(self):
+		future = self.client.Send("Test.silent")
+		self.client.Close()
+		with self.assertRaises(CdpError):
+			future.result(2)
+		self.assertTrue(self.client.IsClosed())
+
+class CdpReconnectTest(unittest.TestCase):
+	def setUp(self):
+		self.server = StubDevToolsServer()
+		self.manager = SeleniumManager(debug=False, cdpReads=True)
+		self.manager.driver = StubDriver(self.server.address)
+
+	def tearDown(self):
+		self.manager.sessions.clear()
+		self.server.Stop()
+
+	def testForDriverFindsPageTarget(self):
+		client = CdpClient.ForDriver(StubDriver(self.server.address))
+		try:
+			self.assertEqual(client.targetId, TARGET_ID)
+			self.assertEqual(client.Call("Test.echo"), {"echo": {}})
+		finally:
+			client.Close()
+
+	def testClientIsReusedWhileOpen(self):
+		first = self.manager.GetCdpClient()
+		self.assertIs(self.manager.GetCdpClient(), first)
+
+	def testReconnectsAfterDisconnect(self):
+		first = self.manager.GetCdpClient()
+		self.assertEqual(first.Call("Test.echo"), {"echo": {}})
+		self.server.DropAll()
+		self.assertTrue(WaitUntil(first.IsClosed))
+		second = self.manager.GetCdpClient()
+		self.assertIsNotNone(second)
+		self.assertIsNot(second, first)
+		self.assertEqual(second.Call("Test.echo", {"again": True}), {"echo": {"again": True}})
+
+	def testDisabledReturnsNone(self):
+		self.manager.cdpReads = False
+		self.assertIsNone(self.manager.GetCdpClient())
+
+	def testUnavailableEndpointBacksOff(self):
+		self.manager.driver = StubDriver("127.0.0.1:1")
+		self.assertIsNone(self.manager.GetCdpClient())
+		self.manager.driver = StubDriver(self.server.address)
+		self.assertIsNone(self.manager.GetCdpClient())
+
+if __name__ == "__main__":
+	unittest.main()
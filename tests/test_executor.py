@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lib.executor import DriverExecutor, DriverCallTimeoutError, ExecutorBusyError, ExecutorClosedError
+
+def WaitUntil(predicate, timeout: float = 2.0) -> bool:
+	deadline = time.time() + timeout
+	while time.time() < deadline:
+		if predicate():
+			return True
+		time.sleep(0.01)
+	return predicate()
+
+class DriverExecutorTest(unittest.TestCase):
+	def setUp(self):
+		self.executor = DriverExecutor("test", maxQueueSize=4, defaultTimeout=5)
+		self.release = threading.Event()
+
+	def tearDown(self):
+		self.release.set()
+		self.executor.Shutdown(wait=True)
+
+	def __block(self) -> None:
+		"""让工作线程阻塞在一个调用上，直到release被设置"""
+		started = threading.Event()
+		def blocker():
+			started.set()
+			self.release.wait(5)
+		self.executor.Submit(blocker)
+		self.assertTrue(started.wait(2))
+
+	def testRunReturnsResultFromWorkerThread(self):
+		caller = threading.get_ident()
+		result = asyncio.run(self.executor.Run(lambda a, b=0: (a + b, threading.get_ident()), 1, b=2))
+		self.assertEqual(result[0], 3)
+		self.assertNotEqual(result[1], caller)
+		# 结果先于完成计数写入，等待计数更新
+		self.assertTrue(WaitUntil(lambda: self.executor.GetStats()["completed"] == 1))
+
+	def testRunPropagatesExceptions(self):
+		def fail():
+			raise ValueError("driver failure")
+		with self.assertRaisesRegex(ValueError, "driver failure"):
+			asyncio.run(self.executor.Run(fail))
+
+	def testCallsRunInSubmissionOrder(self):
+		order = []
+		futures = [self.executor.Submit(order.append, index) for index in range(4)]
+		for future in futures:
+			future.result(2)
+		self.assertEqual(order, [0, 1, 2, 3])
+
+	def testRunRaisesAfterDeadline(self):
+		started = time.perf_counter()
+		with self.assertRaises(DriverCallTimeoutError):
+			asyncio.run(self.executor.Run(self.release.wait, 5, timeout=0.1))
+		self.assertLess(time.perf_counter() - started, 1.0)
+		self.assertEqual(self.executor.GetStats()["timed_out"], 1)
+
+	def testQueuedCallPastDeadlineIsNotExecuted(self):
+		self.__block()
+		ran = threading.Event()
+		future = self.executor.Submit(ran.set, timeout=0.05)
+		time.sleep(0.1)
+		self.release.set()
+		with self.assertRaisesRegex(DriverCallTimeoutError, "队列"):
+			future.result(2)
+		self.assertFalse(ran.is_set())
+
+	def testTimedOutQueuedCallIsCancelled(self):
+		self.__block()
+		ran = threading.Event()
+		with self.assertRaises(DriverCallTimeoutError):
+			asyncio.run(self.executor.Run(ran.set, timeout=0.1))
+		self.release.set()
+		self.executor.Submit(lambda: None).result(2)
+		self.assertFalse(ran.is_set())
+
+	def testCancellingTaskSkipsQueuedCall(self):
+		self.__block()
+		ran = threading.Event()
+		async def scenario():
+			task = asyncio.ensure_future(self.executor.Run(ran.set))
+			await asyncio.sleep(0.05)
+			task.cancel()
+			with self.assertRaises(asyncio.CancelledError):
+				await task
+		asyncio.run(scenario())
+		self.release.set()
+		self.executor.Submit(lambda: None).result(2)
+		self.assertFalse(ran.is_set())
+		self.assertEqual(self.executor.GetStats()["cancelled"], 1)
+
+	def testFullQueueRaisesBusy(self):
+		self.__block()
+		for _ in range(self.executor.maxQueueSize):
+			self.executor.Submit(lambda: None)
+		with self.assertRaises(ExecutorBusyError):
+			self.executor.Submit(lambda: None)
+		self.assertEqual(self.executor.GetStats()["queued"], self.executor.maxQueueSize)
+
+	def testShutdownFailsQueuedCalls(self):
+		self.__block()
+		future = self.executor.Submit(lambda: None)
+		self.executor.Shutdown()
+		with self.assertRaises(ExecutorClosedError):
+			future.result(2)
+		with self.assertRaises(ExecutorClosedError):
+			self.executor.Submit(lambda: None)
+		self.assertTrue(self.executor.IsClosed())
+
+if __name__ == "__main__":
+	unittest.main()
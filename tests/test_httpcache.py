@@ -0,0 +1,127 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lib.httpcache import GetFreshness, HttpCache
+
+URL = "https://cdn.example.com/app.js"
+
+def Headers(**values) -> list:
+	"""把关键字参数转换为DevTools格式的响应头列表，下划线写作连字符"""
+	return [{"name": name.replace("_", "-").title(), "value": value} for name, value in values.items()]
+
+class HttpCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.cache = HttpCache(self.directory)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def testStoresAndServesFreshResponse(self):
+		headers = Headers(cache_control="max-age=60", content_type="text/javascript", content_encoding="gzip", content_length="3")
+		self.assertTrue(self.cache.Put(URL, 200, headers, b"abc"))
+		cached = self.cache.Get(URL)
+		self.assertEqual(cached["body"], b"abc")
+		self.assertEqual(cached["status"], 200)
+		# 回放的是解码后的内容，编码与长度头被去掉
+		self.assertEqual([header["name"] for header in cached["headers"]], ["Cache-Control", "Content-Type"])
+		self.assertEqual(self.cache.Get(URL + "#section")["body"], b"abc")
+		self.assertIsNone(self.cache.Get(URL + "?v=2"))
+		stats = self.cache.GetStats()
+		self.assertEqual((stats["hits"], stats["misses"], stats["bytes_served"]), (2, 1, 6))
+
+	def testVaryHeadersSelectVariant(self):
+		headers = Headers(cache_control="max-age=60", vary="Accept-Encoding, Accept-Language")
+		self.assertTrue(self.cache.Put(URL, 200, headers, b"en", {"Accept-Language": "en", "Accept-Encoding": "gzip"}))
+		self.assertTrue(self.cache.Put(URL, 200, headers, b"de", {"accept-language": "de", "accept-encoding": "gzip"}))
+		self.assertEqual(self.cache.Get(URL, {"accept-language": "en", "Accept-Encoding": "gzip"})["body"], b"en")
+		self.assertEqual(self.cache.Get(URL, {"Accept-Language": "de", "Accept-Encoding": "gzip"})["body"], b"de")
+		self.assertIsNone(self.cache.Get(URL, {"Accept-Language": "fr", "Accept-Encoding": "gzip"}))
+		self.assertIsNone(self.cache.Get(URL))
+		self.assertEqual(self.cache.GetStats()["entries"], 2)
+
+	def testChangedVaryDropsOldVariants(self):
+		self.cache.Put(URL, 200, Headers(cache_control="max-age=60", vary="Accept-Language"), b"en", {"Accept-Language": "en"})
+		self.cache.Put(URL, 200, Headers(cache_control="max-age=60"), b"plain")
+		self.assertEqual(self.cache.GetStats()["entries"], 1)
+		self.assertEqual(self.cache.Get(URL, {"Accept-Language": "en"})["body"], b"plain")
+
+	def testPartitionsAreIsolated(self):
+		headers = Headers(cache_control="max-age=60")
+		self.cache.Put(URL, 200, headers, b"default", partition="default")
+		self.cache.Put(URL, 200, headers, b"lean", partition="lean")
+		self.assertEqual(self.cache.Get(URL, partition="default")["body"], b"default")
+		self.assertEqual(self.cache.Get(URL, partition="lean")["body"], b"lean")
+		self.assertIsNone(self.cache.Get(URL))
+
+	def testUncacheableResponsesAreRejected(self):
+		cases = [
+			(200, Headers(cache_control="no-store, max-age=60")),
+			(200, Headers(cache_control="private, max-age=60")),
+			(200, Headers(cache_control="max-age=60", set_cookie="id=1")),
+			(200, Headers(cache_control="max-age=60", vary="*")),
+			(200, Headers(cache_control="max-age=60", vary="Cookie")),
+			(200, Headers(content_type="text/javascript")),
+			(404, Headers(cache_control="max-age=60"))
+		]
+		for status, headers in cases:
+			self.assertFalse(self.cache.Put(URL, status, headers, b"x"), headers)
+		self.assertEqual(self.cache.GetStats()["uncacheable"], len(cases))
+		self.assertEqual(self.cache.GetStats()["entries"], 0)
+
+	def testPrecomputedTtlSkipsHeaderCheck(self):
+		headers = Headers(cache_control="max-age=60")
+		ttl = self.cache.GetCacheableTtl(200, headers, 3)
+		self.assertEqual(ttl, 60)
+		self.assertTrue(self.cache.Put(URL, 200, headers, b"abc", ttl=ttl))
+		cache = HttpCache(self.directory, maxEntryBytes=2)
+		self.assertFalse(cache.Put(URL, 200, headers, b"abc", ttl=ttl))
+		self.assertEqual(cache.GetStats()["uncacheable"], 1)
+
+	def testExpiredEntryIsDropped(self):
+		self.cache.Put(URL, 200, Headers(cache_control="max-age=60"), b"abc", ttl=0.05)
+		time.sleep(0.1)
+		self.assertIsNone(self.cache.Get(URL))
+		stats = self.cache.GetStats()
+		self.assertEqual((stats["expired"], stats["entries"]), (1, 0))
+
+	def testIndexIsRestoredFromDisk(self):
+		headers = Headers(cache_control="max-age=60", vary="Accept-Language")
+		self.cache.Put(URL, 200, headers, b"en", {"Accept-Language": "en"}, partition="lean")
+		reloaded = HttpCache(self.directory)
+		self.assertEqual(reloaded.Get(URL, {"Accept-Language": "en"}, partition="lean")["body"], b"en")
+		self.assertIsNone(reloaded.Get(URL, {"Accept-Language": "de"}, partition="lean"))
+
+	def testLeastRecentlyUsedEntryIsEvicted(self):
+		cache = HttpCache(self.directory, maxBytes=10)
+		headers = Headers(cache_control="max-age=60")
+		cache.Put(URL + "?a", 200, headers, b"aaaa")
+		cache.Put(URL + "?b", 200, headers, b"bbbb")
+		cache.Get(URL + "?a")
+		cache.Put(URL + "?c", 200, headers, b"cccc")
+		self.assertIsNotNone(cache.Get(URL + "?a"))
+		self.assertIsNone(cache.Get(URL + "?b"))
+		self.assertEqual(cache.GetStats()["evicted"], 1)
+
+	def testAllowHosts(self):
+		cache = HttpCache(self.directory, allowHosts=["*.example.com"])
+		self.assertTrue(cache.IsAllowed(URL))
+		self.assertFalse(cache.IsAllowed("https://tracker.test/pixel.gif"))
+
+	def testFreshness(self):
+		now = 1700000000.0
+		self.assertEqual(GetFreshness({"cache-control": "public, max-age=300"}, now=now), 300)
+		self.assertEqual(GetFreshness({"cache-control": "no-cache"}, 100, now=now), 0)
+		self.assertEqual(GetFreshness({"date": "Tue, 14 Nov 2023 22:13:20 GMT", "expires": "Tue, 14 Nov 2023 22:23:20 GMT"}, now=now), 600)
+		self.assertEqual(GetFreshness({"date": "Tue, 14 Nov 2023 22:13:20 GMT", "last-modified": "Tue, 14 Nov 2023 21:13:20 GMT"}, now=now), 360)
+		self.assertEqual(GetFreshness({"expires": "invalid"}, now=now), 0)
+		self.assertEqual(GetFreshness({}, 30, now=now), 30)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lib.manager import SeleniumManager, SessionPoolFullError
+
+class StubPoolDriver:
+	"""记录复用清理、屏蔽设置与退出调用的驱动"""
+	def __init__(self, profile: str):
+		self.profile = profile
+		self.capabilities = {}
+		self.quitCalls = 0
+		self.resets = 0
+		self.cdpCommands = []
+
+	def delete_all_cookies(self):
+		self.resets += 1
+
+	def get(self, url: str):
+		pass
+
+	def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+		self.cdpCommands.append(cmd)
+		return {}
+
+	def quit(self):
+		self.quitCalls += 1
+
+class SessionPoolTest(unittest.TestCase):
+	def setUp(self):
+		self.manager = SeleniumManager(debug=False, maxSessions=2, idleTimeout=60, maxWarmDrivers=1)
+		self.launched = []
+		def launch(headless=None, profile=None):
+			driver = StubPoolDriver(profile)
+			self.launched.append(driver)
+			return driver
+		# 以桩驱动代替真实的浏览器启动
+		self.manager._SeleniumManager__launchDriver = launch
+		self.evicted = []
+		self.manager.AddEvictionListener(self.evicted.append)
+
+	def tearDown(self):
+		self.manager.QuitAll()
+
+	def __expire(self, sessionId: str) -> None:
+		"""把会话的最后使用时间推到空闲超时之前"""
+		self.manager.sessions[sessionId].lastUsed = time.time() - self.manager.idleTimeout - 1
+
+	def testLeaseReturnsSameSession(self):
+		first = self.manager.LeaseSession("a")
+		self.assertTrue(first.leased)
+		self.assertIs(self.manager.LeaseSession("a"), first)
+		self.assertEqual(len(self.launched), 1)
+		self.manager.ReleaseSession("a")
+		self.assertFalse(first.leased)
+		self.assertEqual(self.manager.GetPoolStats()["leased"], 0)
+
+	def testFullPoolRaisesWhileSessionsAreLeased(self):
+		self.manager.LeaseSession("a")
+		self.manager.LeaseSession("b")
+		with self.assertRaises(SessionPoolFullError):
+			self.manager.LeaseSession("c")
+		self.assertEqual(self.manager.GetPoolStats()["sessions"], 2)
+
+	def testFullPoolEvictsIdleSession(self):
+		self.manager.LeaseSession("a")
+		self.manager.LeaseSession("b")
+		self.manager.ReleaseSession("a")
+		self.__expire("a")
+		session = self.manager.LeaseSession("c")
+		self.assertIsNotNone(session)
+		self.assertEqual(sorted(self.manager.sessions), ["b", "c"])
+		self.assertEqual(self.evicted, ["a"])
+		self.assertEqual(self.launched[0].quitCalls, 1)
+
+	def testLeasedSessionIsNotEvicted(self):
+		self.manager.LeaseSession("a")
+		self.__expire("a")
+		self.assertEqual(self.manager.EvictIdleSessions(), [])
+		self.manager.ReleaseSession("a")
+		self.__expire("a")
+		self.assertEqual(self.manager.EvictIdleSessions(), ["a"])
+		self.assertFalse(self.manager.HasSession("a"))
+
+	def testClosedSessionDriverIsReusedWarm(self):
+		first = self.manager.LeaseSession("a")
+		self.assertTrue(self.manager.CloseSession("a"))
+		self.assertEqual(first.driver.resets, 1)
+		self.assertEqual(first.driver.quitCalls, 0)
+		self.assertEqual(self.manager.GetPoolStats()["warm"], 1)
+		second = self.manager.LeaseSession("b")
+		self.assertIs(second.driver, first.driver)
+		self.assertEqual(len(self.launched), 1)
+		# 预热实例复用时总是重新设置屏蔽列表
+		self.assertIn("Network.setBlockedURLs", second.driver.cdpCommands)
+
+	def testWarmDriverWithIncompatibleProfileIsNotReused(self):
+		first = self.manager.LeaseSession("a")
+		self.manager.CloseSession("a")
+		second = self.manager.LeaseSession("b", profile="lean")
+		self.assertIsNot(second.driver, first.driver)
+		self.assertEqual(second.driver.profile, "lean")
+		self.assertEqual(second.launchProfile, "lean")
+		self.assertEqual(self.manager.GetPoolStats()["warm"], 1)
+
+	def testWarmDriversBeyondLimitAreQuit(self):
+		first = self.manager.LeaseSession("a")
+		second = self.manager.LeaseSession("b")
+		self.manager.CloseSession("a")
+		self.manager.CloseSession("b")
+		self.assertEqual(self.manager.GetPoolStats()["warm"], 1)
+		self.assertEqual(first.driver.quitCalls, 0)
+		self.assertEqual(second.driver.quitCalls, 1)
+
+	def testIdleWarmDriverIsEvicted(self):
+		first = self.manager.LeaseSession("a")
+		self.manager.CloseSession("a")
+		self.manager.idleTimeout = 0
+		time.sleep(0.01)
+		self.manager.EvictIdleSessions()
+		self.assertEqual(self.manager.GetPoolStats()["warm"], 0)
+		self.assertEqual(first.driver.quitCalls, 1)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,130 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lib import screenshot
+from Lib.artifacts import ArtifactStore
+from Lib.screenshot import HammingDistance, PerceptualHash, ScreenshotPipeline
+
+# 类似页面布局的色块 (x, y, 宽, 高, 灰度)，坐标按32x32的网格给出
+LAYOUT = [(2, 2, 28, 4, 40), (2, 8, 12, 10, 120), (16, 8, 14, 3, 60), (16, 13, 10, 2, 60), (4, 22, 24, 6, 200), (2, 29, 8, 2, 0)]
+
+def Layout(scale: int = 1) -> list:
+	"""按LAYOUT绘制白底的灰度像素，边长为32*scale"""
+	size = 32 * scale
+	pixels = [240] * (size * size)
+	for left, top, width, height, value in LAYOUT:
+		for y in range(top * scale, (top + height) * scale):
+			for x in range(left * scale, (left + width) * scale):
+				pixels[y * size + x] = value
+	return pixels
+
+def Png(pixel: tuple = None) -> bytes:
+	"""生成64x64的页面布局截图，pixel为 (x, y, 灰度) 时改动单个像素"""
+	image = screenshot.Image.new("L", (64, 64))
+	image.putdata(Layout(2))
+	if pixel:
+		image.putpixel(pixel[:2], pixel[2])
+	buffer = io.BytesIO()
+	image.convert("RGB").save(buffer, format="PNG")
+	return buffer.getvalue()
+
+class PerceptualHashTest(unittest.TestCase):
+	def testIdenticalImagesHashEqual(self):
+		self.assertEqual(PerceptualHash(Layout()), PerceptualHash(Layout()))
+
+	def testSmallChangeKeepsHashClose(self):
+		pixels = Layout()
+		pixels[5 * 32 + 20] = 180
+		self.assertLessEqual(HammingDistance(PerceptualHash(Layout()), PerceptualHash(pixels)), 2)
+
+	def testDifferentImagesHashFar(self):
+		stripes = [255 if (x // 4) % 2 else 0 for y in range(32) for x in range(32)]
+		self.assertGreater(HammingDistance(PerceptualHash(Layout()), PerceptualHash(stripes)), 10)
+
+	def testHammingDistance(self):
+		self.assertEqual(HammingDistance(0b1011, 0b0010), 2)
+		self.assertEqual(HammingDistance(2 ** 63, 2 ** 63), 0)
+
+class ScreenshotPipelineTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.pipeline = ScreenshotPipeline(ArtifactStore(self.directory))
+
+	def tearDown(self):
+		self.pipeline.Shutdown()
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def testPngPassthroughWithoutPillow(self):
+		with mock.patch.object(screenshot, "Image", None):
+			first = self.pipeline.Process("s", b"\x89PNG first")
+			again = self.pipeline.Process("s", b"\x89PNG first")
+			changed = self.pipeline.Process("s", b"\x89PNG second")
+			self.assertFalse(first["unchanged"])
+			self.assertTrue(again["unchanged"])
+			self.assertEqual(again["path"], first["path"])
+			self.assertFalse(changed["unchanged"])
+			with self.assertRaisesRegex(ValueError, "Pillow is not installed"):
+				self.pipeline.Process("s", b"\x89PNG first", imageFormat="jpeg")
+			with self.assertRaisesRegex(ValueError, "Pillow is not installed"):
+				self.pipeline.Process("s", b"\x89PNG first", threshold=4)
+
+	def testRejectsUnknownFormat(self):
+		with self.assertRaisesRegex(ValueError, "unsupported image format"):
+			self.pipeline.Process("s", b"", imageFormat="gif")
+
+	@unittest.skipUnless(ScreenshotPipeline.IsImagingAvailable(), "Pillow is not installed")
+	def testExactModeDetectsSinglePixelChange(self):
+		first = self.pipeline.Process("s", Png())
+		again = self.pipeline.Process("s", Png())
+		changed = self.pipeline.Process("s", Png(pixel=(40, 10, 180)))
+		self.assertFalse(first["unchanged"])
+		self.assertTrue(again["unchanged"])
+		self.assertEqual(again["distance"], 0)
+		self.assertFalse(changed["unchanged"])
+		self.assertNotEqual(changed["fingerprint"], first["fingerprint"])
+		stats = self.pipeline.GetStats()
+		self.assertEqual((stats["captured"], stats["skipped_unchanged"]), (2, 1))
+
+	@unittest.skipUnless(ScreenshotPipeline.IsImagingAvailable(), "Pillow is not installed")
+	def testThresholdToleratesSmallChange(self):
+		self.pipeline.Process("s", Png(), threshold=6)
+		result = self.pipeline.Process("s", Png(pixel=(40, 10, 180)), threshold=6)
+		self.assertTrue(result["unchanged"])
+		self.assertLessEqual(result["distance"], 6)
+
+	@unittest.skipUnless(ScreenshotPipeline.IsImagingAvailable(), "Pillow is not installed")
+	def testChangedOutputIsEncodedAgain(self):
+		png = Png()
+		first = self.pipeline.Process("s", png)
+		resized = self.pipeline.Process("s", png, maxWidth=32)
+		jpeg = self.pipeline.Process("s", png, imageFormat="jpeg", quality=60, maxWidth=32)
+		requality = self.pipeline.Process("s", png, imageFormat="jpeg", quality=90, maxWidth=32)
+		same = self.pipeline.Process("s", png, imageFormat="jpeg", quality=90, maxWidth=32)
+		self.assertEqual([result["unchanged"] for result in (first, resized, jpeg, requality, same)], [False, False, False, False, True])
+		self.assertEqual((resized["width"], resized["height"]), (32, 32))
+		self.assertEqual(jpeg["format"], "jpg")
+		self.assertNotEqual(jpeg["path"], requality["path"])
+
+	@unittest.skipUnless(ScreenshotPipeline.IsImagingAvailable(), "Pillow is not installed")
+	def testCropAndBaselinesPerKey(self):
+		cropped = self.pipeline.Process("a", Png(), crop=(8, 8, 16, 10))
+		self.assertEqual((cropped["width"], cropped["height"]), (16, 10))
+		self.assertFalse(self.pipeline.Process("b", Png())["unchanged"])
+		self.assertTrue(self.pipeline.Process("b", Png())["unchanged"])
+		self.pipeline.Forget("b")
+		self.assertFalse(self.pipeline.Process("b", Png())["unchanged"])
+		self.assertEqual(self.pipeline.GetStats()["baselines"], 2)
+
+	@unittest.skipUnless(ScreenshotPipeline.IsImagingAvailable(), "Pillow is not installed")
+	def testSubmitRunsInPool(self):
+		self.assertFalse(self.pipeline.Submit("s", Png()).result(5)["unchanged"])
+
+if __name__ == "__main__":
+	unittest.main()
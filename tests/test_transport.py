@@ -0,0 +1,135 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.remote.command import Command
+from Lib.transport import CommandLog, RecordingConnection, ReplayConnection, ReplayDriver, ReplayError
+
+SESSION_ID = "stub-session"
+SCRIPT = "return document.title;"
+
+class StubConnection:
+	"""按命令名返回固定响应的命令通道，记录收到的命令"""
+	def __init__(self):
+		self.commands = []
+		self.title = "Stub Page"
+
+	def execute(self, command: str, params: dict):
+		self.commands.append(command)
+		if command == Command.GET_TITLE:
+			return {"value": self.title}
+		if command == Command.W3C_EXECUTE_SCRIPT:
+			return {"value": len(params.get("args", []))}
+		if command == Command.GET_CURRENT_URL:
+			return {"value": "https://example.com/"}
+		raise ConnectionError(f"stub transport failure: {command}")
+
+class StubDriver:
+	"""只提供RecordingConnection.Start所需属性的驱动"""
+	def __init__(self):
+		self.command_executor = StubConnection()
+		self.session_id = SESSION_ID
+		self.capabilities = {"browserName": "chrome"}
+
+	def execute(self, command: str, params: dict = None):
+		# 与WebDriver.execute一致，命令参数中带上会话ID
+		return self.command_executor.execute(command, dict(params or {}, sessionId=self.session_id))
+
+class TransportTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __record(self, name: str = "session.jsonl.gz") -> str:
+		"""录制一段包含重复脚本与传输错误的会话"""
+		path = os.path.join(self.directory, name)
+		driver = StubDriver()
+		RecordingConnection.Start(driver, path)
+		driver.execute(Command.GET_TITLE)
+		driver.execute(Command.W3C_EXECUTE_SCRIPT, {"script": SCRIPT, "args": []})
+		driver.execute(Command.W3C_EXECUTE_SCRIPT, {"script": SCRIPT, "args": [1, 2]})
+		with self.assertRaises(ConnectionError):
+			driver.execute(Command.DELETE_ALL_COOKIES)
+		driver.execute(Command.GET_CURRENT_URL)
+		stats = RecordingConnection.GetLog(driver).GetStats()
+		self.assertEqual(stats["commands"], 6)
+		self.assertEqual(stats["scripts"], 1)
+		RecordingConnection.Stop(driver)
+		self.assertIsNone(RecordingConnection.GetLog(driver))
+		self.assertEqual(driver.execute(Command.GET_TITLE), {"value": "Stub Page"})
+		return path
+
+	def testRecordedSessionReplaysThroughDriver(self):
+		path = self.__record()
+		driver = ReplayDriver(path, strict=True, matchParams=True)
+		self.assertEqual(driver.session_id, SESSION_ID)
+		self.assertEqual(driver.title, "Stub Page")
+		self.assertEqual(driver.execute_script(SCRIPT), 0)
+		self.assertEqual(driver.execute_script(SCRIPT, 1, 2), 2)
+		with self.assertRaisesRegex(ReplayError, "stub transport failure"):
+			driver.delete_all_cookies()
+		self.assertEqual(driver.current_url, "https://example.com/")
+		stats = driver.replay.GetStats()
+		self.assertEqual(stats["replayed"], 6)
+		self.assertEqual(stats["skipped"], 0)
+		driver.quit()
+
+	def testScriptTextIsStoredOnce(self):
+		path = self.__record("session.jsonl")
+		with open(path, encoding="utf-8") as f:
+			records = [json.loads(line) for line in f]
+		self.assertEqual(records[0]["format"], "selenium-mcp-commands")
+		self.assertEqual(sum(1 for record in records if record.get("text") == SCRIPT), 1)
+		self.assertEqual(len({record["s"] for record in records if "s" in record}), 1)
+
+	def testStrictReplayRejectsUnexpectedCommand(self):
+		driver = ReplayDriver(self.__record(), strict=True)
+		with self.assertRaisesRegex(ReplayError, "driver sent getCurrentUrl, log has getTitle"):
+			driver.current_url
+
+	def testMatchParamsRejectsDifferentArguments(self):
+		driver = ReplayDriver(self.__record(), strict=True, matchParams=True)
+		driver.title
+		with self.assertRaisesRegex(ReplayError, "mismatch"):
+			driver.execute_script("return 1;")
+
+	def testLenientReplaySkipsExtraRecords(self):
+		connection = ReplayConnection(self.__record())
+		connection.execute(Command.NEW_SESSION, {})
+		self.assertEqual(connection.execute(Command.GET_CURRENT_URL, {}), {"value": "https://example.com/"})
+		self.assertEqual(connection.GetStats()["skipped"], 4)
+		connection.Rewind()
+		self.assertEqual(connection.execute(Command.GET_TITLE, {}), {"value": "Stub Page"})
+
+	def testResponsesAreNotShared(self):
+		connection = ReplayConnection(self.__record())
+		connection.execute(Command.NEW_SESSION, {})
+		connection.execute(Command.GET_TITLE, {})["value"] = "changed"
+		connection.Rewind()
+		self.assertEqual(connection.execute(Command.GET_TITLE, {}), {"value": "Stub Page"})
+
+	def testRejectsForeignFile(self):
+		path = os.path.join(self.directory, "other.jsonl.gz")
+		with gzip.open(path, "wt", encoding="utf-8") as f:
+			f.write(json.dumps({"format": "something-else"}) + "\n")
+		with self.assertRaisesRegex(ReplayError, "not a command log"):
+			ReplayConnection(path)
+
+	def testClosedLogIgnoresAppends(self):
+		log = CommandLog(os.path.join(self.directory, "closed.jsonl"))
+		log.Append("getTitle", {}, {"value": "a"})
+		log.Close()
+		log.Append("getTitle", {}, {"value": "b"})
+		self.assertEqual(log.GetStats()["commands"], 1)
+		self.assertTrue(log.GetStats()["closed"])
+
+if __name__ == "__main__":
+	unittest.main()